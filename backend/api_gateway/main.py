@@ -1,16 +1,55 @@
 from fastapi import FastAPI
-from .routes import auth_proxy
+from fastapi.responses import PlainTextResponse
+from contextlib import asynccontextmanager
+from .routes import auth_proxy, inventory_proxy
+from .middleware.rate_limit import RateLimitMiddleware, create_bucket_store
+from .middleware.load_shedding import LoadSheddingMiddleware
+from .middleware.compression import CompressionMiddleware
+from .utils.invalidation_bus import invalidation_bus
+from common.telemetry import TelemetryMiddleware, render_metrics, setup_tracing
+
+bucket_store = create_bucket_store()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_tracing("api_gateway")
+    # Startup: Join the other workers' invalidation channel (multi-worker mode)
+    await invalidation_bus.start()
+    yield
+    # Shutdown: Close upstream connection pools, the rate limiter's store and the bus
+    await invalidation_bus.close()
+    await auth_proxy.auth_upstream.close()
+    await inventory_proxy.inventory_upstream.close()
+    await bucket_store.close()
+
 
 app = FastAPI(
     title="Travel Guru API",
     description="An API for managing travel-related data and services.",
     version="0.1.0",
     contact={"name": "Vikas Bhapri", "email": "vikasbhapri@gmail.com"},
+    lifespan=lifespan,
 )
 
+# Middleware added last runs first: reject over-limit clients before they
+# take a concurrency slot. Compression sits innermost so its CPU time counts
+# towards the latency the load shedder reacts to
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(LoadSheddingMiddleware)
+app.add_middleware(RateLimitMiddleware, store=bucket_store)
+# Outermost, so rejected requests still get a request ID and are measured
+app.add_middleware(TelemetryMiddleware)
+
 app.include_router(auth_proxy.router)
+app.include_router(inventory_proxy.router)
 
 
 @app.get("/")
 async def hello_world():
     return {"message": "Welcome to the Travel Guru API Gateway!"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return render_metrics()
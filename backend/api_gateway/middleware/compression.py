@@ -0,0 +1,285 @@
+import hashlib
+import os
+import zlib
+from collections import OrderedDict
+from typing import NamedTuple
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "True").lower() in ("true", "1", "t")
+# Below this a compressed body barely shrinks and isn't worth the CPU
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 5))
+ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3))
+# Compressed copies of recently sent ETagged bodies (gateway cache hits),
+# keyed by content digest, so the same bytes aren't compressed twice
+COMPRESSION_CACHE_ENTRIES = int(os.getenv("COMPRESSION_CACHE_ENTRIES", 2048))
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "application/vnd.apache.arrow.stream",
+    "image/svg+xml",
+}
+
+
+class CompressionPolicy(NamedTuple):
+    min_size: int = COMPRESSION_MIN_SIZE
+    # Lowest levels: for large bodies where CPU matters more than ratio
+    fast: bool = False
+
+
+DEFAULT_POLICY = CompressionPolicy()
+# Longest matching path prefix wins; None turns compression off
+ROUTE_COMPRESSION: dict[str, CompressionPolicy | None] = {
+    # Tokens next to reflected input are what BREACH recovers from
+    # compressed responses, so auth replies go out as-is
+    "/api/v1/auth": None,
+    # Relayed chunk by chunk by the inventory proxy (its STREAMED_PATHS) and
+    # compressed the same way, at the fastest levels to keep up with the
+    # stream; the first chunk says nothing about the total, hence min_size 0
+    "/api/v1/inventory/export": CompressionPolicy(min_size=0, fast=True),
+    "/api/v1/inventory/changes": CompressionPolicy(min_size=0, fast=True),
+}
+
+
+def route_policy(path: str) -> CompressionPolicy | None:
+    for prefix in sorted(ROUTE_COMPRESSION, key=len, reverse=True):
+        if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+            return ROUTE_COMPRESSION[prefix]
+    return DEFAULT_POLICY
+
+
+class _Gzip:
+    def __init__(self, fast: bool):
+        # wbits=31 writes a gzip header with mtime 0, so output is reproducible
+        self._obj = zlib.compressobj(1 if fast else GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        out = self._obj.compress(data)
+        return out + self._obj.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _Brotli:
+    def __init__(self, fast: bool):
+        import brotli
+
+        self._obj = brotli.Compressor(quality=1 if fast else BROTLI_QUALITY)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        out = self._obj.process(data)
+        return out + self._obj.flush() if flush else out
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _Zstd:
+    def __init__(self, fast: bool):
+        import zstandard
+
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._obj = zstandard.ZstdCompressor(level=1 if fast else ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        out = self._obj.compress(data)
+        return out + self._obj.flush(self._flush_block) if flush else out
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def _available_encoders() -> dict:
+    # Server preference order; brotli and zstd only when installed
+    # (pip install brotli zstandard)
+    encoders = {}
+    for name, encoder, module in (("zstd", _Zstd, "zstandard"), ("br", _Brotli, "brotli")):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        encoders[name] = encoder
+    encoders["gzip"] = _Gzip
+    return encoders
+
+
+ENCODERS = _available_encoders()
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Our preferred encoding among those the client accepts, or None for identity."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, *params = (piece.strip() for piece in part.split(";"))
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    candidates = [
+        (accepted.get(name, wildcard), -rank, name)
+        for rank, name in enumerate(ENCODERS)
+    ]
+    quality, _, name = max(candidates)
+    return name if quality > 0 else None
+
+
+def compress(body: bytes, encoding: str, fast: bool = False) -> bytes:
+    encoder = ENCODERS[encoding](fast)
+    return encoder.compress(body) + encoder.finish()
+
+
+def _compressible(headers: dict[bytes, bytes]) -> bool:
+    media_type = headers.get(b"content-type", b"").split(b";")[0].strip().decode("latin-1").lower()
+    return (
+        media_type.startswith("text/")
+        or media_type.endswith("+json")
+        or media_type in COMPRESSIBLE_TYPES
+    )
+
+
+def _add_vary(headers: list[tuple[bytes, bytes]]) -> list[tuple[bytes, bytes]]:
+    for i, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            if b"accept-encoding" not in value.lower():
+                headers[i] = (name, value + b", Accept-Encoding")
+            return headers
+    return headers + [(b"vary", b"Accept-Encoding")]
+
+
+class CompressionMiddleware:
+    """Compresses responses with the best encoding the client accepts.
+
+    Bodies that already carry a Content-Encoding, or whose media type is
+    compressed in its own right (Parquet, images, archives), pass through
+    untouched. Streaming responses (the inventory export and change feed)
+    are compressed chunk by chunk with a flush after each, so clients still
+    see data as it is produced and no body is ever held whole.
+    """
+
+    def __init__(self, app, cache_entries: int = COMPRESSION_CACHE_ENTRIES):
+        self.app = app
+        self.cache_entries = cache_entries
+        self._cache: OrderedDict[tuple, bytes] = OrderedDict()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        policy = route_policy(scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+        responder = _CompressingResponder(self, send, negotiate(accept_encoding), policy)
+        await self.app(scope, receive, responder.send)
+
+    def cached(self, body: bytes, encoding: str, fast: bool) -> bytes:
+        key = (hashlib.blake2b(body, digest_size=16).digest(), encoding, fast)
+        compressed = self._cache.get(key)
+        if compressed is not None:
+            self._cache.move_to_end(key)
+            return compressed
+        compressed = compress(body, encoding, fast)
+        self._cache[key] = compressed
+        if len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+        return compressed
+
+
+class _CompressingResponder:
+    def __init__(self, middleware: CompressionMiddleware, send, encoding: str | None, policy: CompressionPolicy):
+        self.middleware = middleware
+        self._send = send
+        self.encoding = encoding
+        self.policy = policy
+        self.start = None
+        self.encoder = None
+        self.passthrough = False
+
+    async def send(self, message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows how large it is
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.passthrough:
+            await self._send(message)
+            return
+        if self.encoder is not None:
+            await self._stream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = list(self.start["headers"])
+        lookup = {name.lower(): value for name, value in headers}
+        compressible = (
+            _compressible(lookup)
+            and b"content-encoding" not in lookup
+            and b"no-transform" not in lookup.get(b"cache-control", b"").lower()
+            and self.start["status"] not in (204, 206, 304)
+        )
+        if compressible:
+            headers = _add_vary(headers)
+        if (
+            not compressible
+            or self.encoding is None
+            or (not more_body and len(body) < self.policy.min_size)
+        ):
+            self.passthrough = True
+            await self._send({**self.start, "headers": headers})
+            await self._send(message)
+            return
+
+        headers = [
+            (name, value) for name, value in headers
+            if name.lower() not in (b"content-length", b"etag")
+        ]
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        etag = lookup.get(b"etag")
+        if etag is not None:
+            # A different byte sequence from the identity body; weak keeps
+            # If-None-Match working across encodings
+            headers.append((b"etag", etag if etag.startswith(b"W/") else b"W/" + etag))
+
+        if not more_body:
+            if etag is not None:
+                compressed = self.middleware.cached(body, self.encoding, self.policy.fast)
+            else:
+                compressed = compress(body, self.encoding, self.policy.fast)
+            headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+            await self._send({**self.start, "headers": headers})
+            await self._send({"type": "http.response.body", "body": compressed})
+            return
+
+        self.encoder = ENCODERS[self.encoding](self.policy.fast)
+        await self._send({**self.start, "headers": headers})
+        await self._stream(message)
+
+    async def _stream(self, message) -> None:
+        more_body = message.get("more_body", False)
+        chunk = self.encoder.compress(message.get("body", b""), flush=more_body)
+        if not more_body:
+            chunk += self.encoder.finish()
+        if chunk or not more_body:
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
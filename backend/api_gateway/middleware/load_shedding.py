@@ -0,0 +1,107 @@
+import os
+import time
+
+from starlette.responses import JSONResponse
+
+from .rate_limit import EXEMPT_PATHS, route_cost
+
+LOAD_SHEDDING_ENABLED = os.getenv("LOAD_SHEDDING_ENABLED", "True").lower() in ("true", "1", "t")
+LOAD_SHED_TARGET_LATENCY = float(os.getenv("LOAD_SHED_TARGET_LATENCY_MS", 500)) / 1000
+LOAD_SHED_MIN_LIMIT = int(os.getenv("LOAD_SHED_MIN_LIMIT", 8))
+LOAD_SHED_MAX_LIMIT = int(os.getenv("LOAD_SHED_MAX_LIMIT", 256))
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit driven by observed request latency.
+
+    While the smoothed latency stays under the target the limit grows by
+    roughly one per round of requests; when it climbs above the target the
+    limit is cut by `backoff`. Requests arriving over the limit are rejected
+    straight away instead of queueing behind a slow upstream.
+    """
+
+    def __init__(
+        self,
+        target_latency: float = LOAD_SHED_TARGET_LATENCY,
+        min_limit: int = LOAD_SHED_MIN_LIMIT,
+        max_limit: int = LOAD_SHED_MAX_LIMIT,
+        backoff: float = 0.9,
+        smoothing: float = 0.2,
+    ):
+        self.target_latency = target_latency
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.smoothing = smoothing
+
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.latency = 0.0
+
+    def try_acquire(self, cost: int = 1) -> bool:
+        # Expensive routes need more headroom, so they are shed first
+        if self.in_flight + cost > self.limit:
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+    def record(self, latency: float) -> None:
+        self.latency += self.smoothing * (latency - self.latency)
+
+        if self.latency > self.target_latency:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    @property
+    def overloaded(self) -> bool:
+        return self.latency > self.target_latency
+
+
+class LoadSheddingMiddleware:
+    def __init__(self, app, limiter: AdaptiveConcurrencyLimiter | None = None):
+        self.app = app
+        self.limiter = limiter or AdaptiveConcurrencyLimiter()
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not LOAD_SHEDDING_ENABLED
+            or scope["path"] in EXEMPT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if not self.limiter.try_acquire(route_cost(scope["path"])):
+            # 503 while upstreams are slow, 429 when we're merely at capacity
+            status_code = 503 if self.limiter.overloaded else 429
+            response = JSONResponse(
+                {"detail": "Service is overloaded, please retry shortly"},
+                status_code=status_code,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        recorded = False
+
+        async def send_wrapper(message):
+            nonlocal recorded
+            # Latency is time to the response head: a long /export or /changes
+            # stream says nothing about how loaded the upstreams are
+            if message["type"] == "http.response.start" and not recorded:
+                recorded = True
+                self.limiter.record(time.perf_counter() - start)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not recorded:
+                self.limiter.record(time.perf_counter() - start)
+            # The slot stays taken until the body is done
+            self.limiter.release()
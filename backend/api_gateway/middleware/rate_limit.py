@@ -0,0 +1,232 @@
+import hashlib
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "True").lower() in ("true", "1", "t")
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+TRUST_PROXY_HEADERS = os.getenv("TRUST_PROXY_HEADERS", "False").lower() in ("true", "1", "t")
+
+# In-memory buckets are per process. With several workers sharing the
+# traffic, each refills at its share of the rate so the sustained limit
+# holds in aggregate; bursts stay whole so expensive routes still fit.
+WORKER_SHARE = 1 / int(os.getenv("WEB_CONCURRENCY", 1)) if RATE_LIMIT_BACKEND == "memory" else 1
+
+# Bucket sizes (burst) and refill rates (tokens per second)
+IP_BUCKET_CAPACITY = float(os.getenv("RATE_LIMIT_IP_CAPACITY", 100))
+IP_REFILL_RATE = float(os.getenv("RATE_LIMIT_IP_REFILL", 20)) * WORKER_SHARE
+USER_BUCKET_CAPACITY = float(os.getenv("RATE_LIMIT_USER_CAPACITY", 30))
+USER_REFILL_RATE = float(os.getenv("RATE_LIMIT_USER_REFILL", 1)) * WORKER_SHARE
+
+# Routes backed by bcrypt in the auth service cost more than a plain read
+ROUTE_COSTS = {
+    "/api/v1/auth/login": 5,
+    "/api/v1/auth/register": 5,
+    "/api/v1/auth/password-update": 5,
+    "/api/v1/auth/reset-password": 5,
+    "/api/v1/auth/password-reset-request": 3,
+}
+DEFAULT_ROUTE_COST = 1
+EXEMPT_PATHS = {"/", "/docs", "/openapi.json", "/metrics"}
+
+
+def route_cost(path: str) -> int:
+    return ROUTE_COSTS.get(path.rstrip("/") or "/", DEFAULT_ROUTE_COST)
+
+
+class InMemoryBucketStore:
+    """Token buckets held in this process, evicting the least recently used
+    keys once max_keys is reached."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def consume(
+        self, key: str, cost: float, capacity: float, refill_rate: float
+    ) -> tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        retry_after = 0.0 if allowed else (cost - tokens) / refill_rate
+        return allowed, retry_after
+
+    async def close(self) -> None:
+        self._buckets.clear()
+
+
+# Refill and take tokens atomically on the server so every gateway replica
+# shares the same buckets
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * refill_rate)
+
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill_rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBucketStore:
+    """Token buckets kept in any server speaking the Redis protocol."""
+
+    def __init__(self, url: str = RATE_LIMIT_REDIS_URL, prefix: str = "ratelimit:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "RATE_LIMIT_BACKEND=redis requires the 'redis' package"
+            ) from e
+
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def consume(
+        self, key: str, cost: float, capacity: float, refill_rate: float
+    ) -> tuple[bool, float]:
+        try:
+            allowed, tokens = await self._script(
+                keys=[self.prefix + key], args=[capacity, refill_rate, cost]
+            )
+        except Exception as e:
+            # Fail open: an unavailable limiter shouldn't take the gateway down
+            logger.warning("Rate limit store unavailable: %s", e)
+            return True, 0.0
+
+        if allowed:
+            return True, 0.0
+        return False, (cost - float(tokens)) / refill_rate
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_bucket_store():
+    if RATE_LIMIT_BACKEND == "redis":
+        return RedisBucketStore()
+    return InMemoryBucketStore()
+
+
+def client_ip(scope) -> str:
+    if TRUST_PROXY_HEADERS:
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _header(scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class RateLimitMiddleware:
+    """Token-bucket admission control keyed by client IP and by user.
+
+    The user key is the login form's username on /login, and a digest of the
+    bearer token elsewhere. The gateway can't verify tokens, so keying on the
+    unverified `sub` claim would let anyone drain another user's bucket.
+    """
+
+    def __init__(self, app, store=None):
+        self.app = app
+        self.store = store if store is not None else create_bucket_store()
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not RATE_LIMIT_ENABLED
+            or scope["path"] in EXEMPT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        cost = route_cost(path)
+
+        user_key = None
+        authorization = _header(scope, b"authorization")
+        if authorization:
+            user_key = "token:" + hashlib.sha256(authorization.encode()).hexdigest()[:32]
+        elif path.rstrip("/") == "/api/v1/auth/login":
+            receive, username = await self._read_login_username(receive)
+            if username:
+                user_key = "login:" + username
+
+        allowed, retry_after = await self.store.consume(
+            "ip:" + client_ip(scope), cost, IP_BUCKET_CAPACITY, IP_REFILL_RATE
+        )
+        if allowed and user_key:
+            allowed, retry_after = await self.store.consume(
+                user_key, cost, USER_BUCKET_CAPACITY, USER_REFILL_RATE
+            )
+
+        if not allowed:
+            response = JSONResponse(
+                {"detail": "Too many requests"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    async def _read_login_username(self, receive):
+        # Buffer the (small) form body so it can be replayed to the route
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        username = parse_qs(body.decode("utf-8", "ignore")).get("username", [None])[0]
+        return replay, username
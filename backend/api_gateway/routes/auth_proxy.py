@@ -1,24 +1,23 @@
-from fastapi import APIRouter, status, Response, Depends, Header, HTTPException
+from fastapi import APIRouter, status, Request, Response, Depends, Header, HTTPException
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 import httpx
+import os
 from ..schemas import auth_schema
+from ..utils.upstream import Upstream
 
 router = APIRouter(prefix="/api/v1/auth", tags=["Authentication Proxy"])
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-REQUEST_TIMEOUT = httpx.Timeout(10.0, read=10.0)
+AUTH_SERVICE_URL = os.getenv("AUTH_SERVICE_URL", "http://localhost:8001")
 
+auth_upstream = Upstream("Auth service", AUTH_SERVICE_URL)
 
-async def _request_with_timeout(method: str, url: str, **kwargs) -> httpx.Response:
-    async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-        try:
-            return await client.request(method, url, **kwargs)
-        except httpx.ReadTimeout:
-            raise HTTPException(
-                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-                detail="Auth service did not respond in time",
-            )
+
+async def _request_with_timeout(
+    method: str, path: str, *, hedge: bool = False, **kwargs
+) -> httpx.Response:
+    return await auth_upstream.request(method, path, hedge=hedge, **kwargs)
 
 
 @router.post("/login", status_code=status.HTTP_200_OK)
@@ -27,7 +26,7 @@ async def login_user(form_data: OAuth2PasswordRequestForm = Depends()):
 
     response = await _request_with_timeout(
         "POST",
-        "http://localhost:8001/auth/login",
+        "/auth/login",
         data=payload,
         headers={
             "Content-Type": "application/x-www-form-urlencoded",
@@ -66,7 +65,7 @@ async def login_user(form_data: OAuth2PasswordRequestForm = Depends()):
 async def register_user(user: auth_schema.UserCreate):
     response = await _request_with_timeout(
         "POST",
-        "http://localhost:8001/auth/register",
+        "/auth/register",
         json=user.model_dump(),
         headers={
             "Content-Type": "application/json",
@@ -96,8 +95,9 @@ async def validate_user(Authorization: str = Header(...)):
 
     response = await _request_with_timeout(
         "GET",
-        "http://localhost:8001/auth/validate-user",
+        "/auth/validate-user",
         headers={"Authorization": bearer_token, "Accept": "application/json"},
+        hedge=True,
     )
 
     if response.status_code != 200:
@@ -113,17 +113,38 @@ async def validate_user(Authorization: str = Header(...)):
         headers={"Content-Type": "application/json"},
     )
 
+@router.post("/validate-tokens", status_code=status.HTTP_200_OK)
+async def validate_tokens(request: auth_schema.ValidateTokens):
+    # Read-only, so safe to retry and hedge even though it's a POST
+    response = await _request_with_timeout(
+        "POST",
+        "/auth/validate-tokens",
+        json=request.model_dump(),
+        headers={"Content-Type": "application/json", "Accept": "application/json"},
+        idempotent=True,
+        hedge=True,
+    )
+
+    return Response(
+        content=response.content,
+        status_code=response.status_code,
+        headers={"Content-Type": "application/json"},
+    )
+
 @router.post("/refresh-token", status_code=status.HTTP_200_OK)
-async def refresh_token(Authorization: str = Header(...)):
-    bearer_token = Authorization
+async def refresh_token(request: Request, Authorization: str | None = Header(None)):
+    # Prefer the refresh cookie set at login; API clients send it as the bearer
+    cookie = request.cookies.get("refresh_token")
+    bearer_token = f"Bearer {cookie}" if cookie else Authorization
 
     if not bearer_token:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing access token")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing refresh token")
 
     response = await _request_with_timeout(
         "GET",
-        "http://localhost:8001/auth/refresh-token",
+        "/auth/refresh-token",
         headers={"Authorization": bearer_token, "Accept": "application/json"},
+        hedge=True,
     )
 
     if response.status_code != 200:
@@ -145,10 +166,9 @@ async def update_user(user: auth_schema.UpdateUser, Authorization: str = Header(
 
     if not bearer_token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing access token")
-    print("Received update user request with data:", user.model_dump())
     response = await _request_with_timeout(
         "PATCH",
-        "http://localhost:8001/auth/update-user",
+        "/auth/update-user",
         json=user.model_dump(exclude_unset=True),
         headers={
             "Authorization": bearer_token,
@@ -179,7 +199,7 @@ async def delete_user(user: auth_schema.DeleteUser, Authorization: str = Header(
 
     response = await _request_with_timeout(
         "POST",
-        "http://localhost:8001/auth/delete-user",
+        "/auth/delete-user",
         json=user.model_dump(),
         headers={
             "Authorization": bearer_token,
@@ -205,7 +225,7 @@ async def delete_user(user: auth_schema.DeleteUser, Authorization: str = Header(
 async def password_reset_request(email: dict):
     response = await _request_with_timeout(
         "POST",
-        "http://localhost:8001/auth/password-reset-request",
+        "/auth/password-reset-request",
         json=email,
         headers={"Content-Type": "application/json", "Accept": "application/json"},
     )
@@ -227,7 +247,7 @@ async def password_reset_request(email: dict):
 async def password_reset(password: dict):
     response = await _request_with_timeout(
         "POST",
-        "http://localhost:8001/auth/reset-password",
+        "/auth/reset-password",
         json=password,
         headers={"Content-Type": "application/json", "Accept": "application/json"},
     )
@@ -252,7 +272,7 @@ async def update_password(data: auth_schema.UpdatePassword, Authorization: str =
     if not bearer_token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing access token")
     
-    response = await _request_with_timeout("POST", "http://localhost:8001/auth/password-update", json=data.model_dump(), headers={"Authorization": bearer_token, "Content-Type": "application/json", "Accept": "application/json"})
+    response = await _request_with_timeout("POST", "/auth/password-update", json=data.model_dump(), headers={"Authorization": bearer_token, "Content-Type": "application/json", "Accept": "application/json"})
 
     if response.status_code != 200:
         return Response(content=response.content, status_code=response.status_code, headers={"Content-Type": "application/json"})
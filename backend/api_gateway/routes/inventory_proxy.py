@@ -0,0 +1,314 @@
+from fastapi import APIRouter, status, Request, Response, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+import hmac
+import json
+import logging
+import os
+from uuid import UUID
+import httpx
+from ..utils.upstream import Upstream
+from .auth_proxy import auth_upstream
+from ..utils.invalidation_bus import invalidation_bus
+from ..utils.http_cache import (
+    CachedResponse,
+    cache_key,
+    etag_matches,
+    response_cache,
+    shared_cache_ttl,
+    strong_etag,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/inventory", tags=["Inventory Proxy"])
+
+INVENTORY_SERVICE_URL = os.getenv("INVENTORY_SERVICE_URL", "http://localhost:8002")
+# Shared with the inventory service; the purge route is refused without it
+CACHE_PURGE_TOKEN = os.getenv("CACHE_PURGE_TOKEN")
+if not CACHE_PURGE_TOKEN:
+    logger.warning("CACHE_PURGE_TOKEN is not set; cache purges are refused and entries only expire")
+# Keep in step with the inventory service's BATCH_MAX_IDS; larger batches are
+# passed through untouched so the service reports the error
+INVENTORY_BATCH_MAX_IDS = int(os.getenv("INVENTORY_BATCH_MAX_IDS", 100))
+
+# Batch lookups assembled from the per-item cache: resource -> (ID field,
+# Cache-Tag values of one item, matching what the item's own GET sends)
+BATCH_RESOURCES = {
+    "hotels": (
+        "hotel_id",
+        lambda item: [f"hotel:{item['hotel_id']}", f"destination:{item['destination_id']}"],
+    ),
+    "destinations": ("destination_id", lambda item: [f"destination:{item['destination_id']}"]),
+}
+
+# Relayed chunk by chunk and never cached: bodies can be any size
+STREAMED_PATHS = ("export", "changes")
+# Longest wait for the next chunk of a relayed body; an export pauses for a
+# whole batch fetch and encode (a Parquet row group) between chunks
+STREAM_READ_TIMEOUT = float(os.getenv("UPSTREAM_STREAM_READ_TIMEOUT", 120.0))
+# Not forwarded from a relayed response: they describe the upstream hop, or
+# the server sets its own
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+    "date",
+    "server",
+}
+
+inventory_upstream = Upstream("Inventory service", INVENTORY_SERVICE_URL)
+
+# A purge lands on one worker; the others drop their copies when it's relayed
+invalidation_bus.subscribe("cache.purge", lambda payload: response_cache.purge_tags(payload["tags"]))
+
+
+async def require_user(authorization: str | None = Header(None)) -> None:
+    # The inventory service trusts whatever reaches it, so writes and bulk
+    # reads only go through with a token the auth service accepts
+    if not authorization:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing access token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    response = await auth_upstream.request(
+        "GET",
+        "/auth/validate-user",
+        headers={"Authorization": authorization, "Accept": "application/json"},
+        hedge=True,
+    )
+    if response.status_code >= 500:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Auth service unavailable")
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid access token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+def _cached_response(request: Request, entry: CachedResponse, cache_status: str) -> Response:
+    headers = {"X-Cache": cache_status}
+    if entry.etag:
+        headers["ETag"] = entry.etag
+    if entry.cache_control:
+        headers["Cache-Control"] = entry.cache_control
+
+    if entry.status_code == 200 and entry.etag and etag_matches(
+        request.headers.get("if-none-match"), entry.etag
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(
+        content=entry.body,
+        status_code=entry.status_code,
+        media_type=entry.media_type,
+        headers=headers,
+    )
+
+
+@router.post("/_cache/purge", status_code=status.HTTP_200_OK)
+async def purge_cache(payload: dict, x_internal_token: str | None = Header(None)):
+    # Called by the inventory service whenever the entities behind a tag change
+    if not CACHE_PURGE_TOKEN:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Cache purging is not configured")
+    if not x_internal_token or not hmac.compare_digest(x_internal_token.encode(), CACHE_PURGE_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+    tags = payload.get("tags", [])
+    purged = response_cache.purge_tags(tags)
+    invalidation_bus.publish("cache.purge", {"tags": tags})
+    return {"status": "success", "purged": purged}
+
+
+def _json_body(content: dict) -> bytes:
+    # Same encoding as the service's JSONResponse, so entries stored from a
+    # batch are byte-identical to the item's own GET
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+@router.get("/{resource}/batch")
+async def get_inventory_batch(resource: str, request: Request):
+    ids = request.query_params.getlist("ids")
+    if (
+        resource not in BATCH_RESOURCES
+        or not ids
+        or len(ids) > INVENTORY_BATCH_MAX_IDS
+        or set(request.query_params) != {"ids"}
+    ):
+        return await get_inventory(f"{resource}/batch", request)
+    try:
+        ids = list(dict.fromkeys(str(UUID(i)) for i in ids))
+    except ValueError:
+        return await get_inventory(f"{resource}/batch", request)
+
+    id_field, item_tags = BATCH_RESOURCES[resource]
+    items = {}
+    cache_control = None
+    misses = ids
+    if "no-cache" not in request.headers.get("cache-control", ""):
+        # Serve what single-item GETs (or earlier batches) already cached
+        misses = []
+        for item_id in ids:
+            entry = response_cache.get(cache_key(f"{resource}/{item_id}", ""))
+            if entry is not None and entry.status_code == 200:
+                items[item_id] = json.loads(entry.body)["data"]
+                cache_control = entry.cache_control
+            else:
+                misses.append(item_id)
+
+    missing = []
+    if misses:
+        # One upstream call for everything not cached, instead of one per item
+        response = await inventory_upstream.request(
+            "GET",
+            f"/{resource}/batch",
+            params=[("ids", item_id) for item_id in misses],
+            headers={"Accept": "application/json"},
+            hedge=True,
+        )
+        if response.status_code != 200:
+            return Response(
+                content=response.content,
+                status_code=response.status_code,
+                media_type=response.headers.get("content-type", "application/json"),
+            )
+
+        payload = response.json()
+        missing = payload.get("missing", [])
+        cache_control = response.headers.get("cache-control")
+        ttl = shared_cache_ttl(cache_control)
+        for item in payload["data"]:
+            item_id = str(item[id_field])
+            items[item_id] = item
+            if ttl:
+                body = _json_body({"status": "success", "data": item})
+                response_cache.set(
+                    cache_key(f"{resource}/{item_id}", ""),
+                    CachedResponse(
+                        body=body,
+                        status_code=200,
+                        media_type="application/json",
+                        etag=strong_etag(body),
+                        cache_control=cache_control,
+                        tags=frozenset(item_tags(item)),
+                    ),
+                    ttl,
+                )
+
+    body = _json_body(
+        {"status": "success", "data": [items[i] for i in ids if i in items], "missing": missing}
+    )
+    entry = CachedResponse(
+        body=body,
+        status_code=200,
+        media_type="application/json",
+        etag=strong_etag(body),
+        cache_control=cache_control,
+    )
+    cache_status = "MISS" if len(misses) == len(ids) else "PARTIAL" if misses else "HIT"
+    return _cached_response(request, entry, cache_status)
+
+
+def _streamed(path: str) -> bool:
+    path = path.strip("/")
+    return any(path == prefix or path.startswith(prefix + "/") for prefix in STREAMED_PATHS)
+
+
+async def _relay(response: httpx.Response):
+    # Raw bytes: any Content-Encoding the upstream applied is passed through as is
+    try:
+        async for chunk in response.aiter_raw():
+            yield chunk
+    finally:
+        await response.aclose()
+
+
+async def _stream_inventory(path: str, request: Request) -> StreamingResponse:
+    response = await inventory_upstream.request(
+        "GET",
+        f"/{path}",
+        params=request.query_params,
+        headers={"Accept": request.headers.get("accept", "*/*")},
+        timeout=httpx.Timeout(STREAM_READ_TIMEOUT, connect=inventory_upstream.timeout.connect),
+        stream=True,
+    )
+    headers = {
+        name: value for name, value in response.headers.items() if name.lower() not in HOP_BY_HOP_HEADERS
+    }
+    headers["X-Cache"] = "BYPASS"
+    return StreamingResponse(_relay(response), status_code=response.status_code, headers=headers)
+
+
+@router.get("/{path:path}")
+async def get_inventory(path: str, request: Request):
+    if _streamed(path):
+        await require_user(request.headers.get("authorization"))
+        return await _stream_inventory(path, request)
+
+    key = cache_key(path, request.url.query)
+    client_cache_control = request.headers.get("cache-control", "")
+
+    entry = response_cache.get(key)
+    if entry is not None and "no-cache" not in client_cache_control:
+        return _cached_response(request, entry, "HIT")
+
+    response = await inventory_upstream.request(
+        "GET",
+        f"/{path}",
+        params=request.query_params,
+        headers={"Accept": "application/json"},
+        hedge=True,
+    )
+
+    entry = CachedResponse(
+        body=response.content,
+        status_code=response.status_code,
+        media_type=response.headers.get("content-type", "application/json"),
+        # Only a 200 is a representation worth revalidating
+        etag=response.headers.get("etag")
+        or (strong_etag(response.content) if response.status_code == 200 else None),
+        cache_control=response.headers.get("cache-control"),
+        tags=frozenset(
+            tag.strip()
+            for tag in response.headers.get("cache-tag", "").split(",")
+            if tag.strip()
+        ),
+    )
+
+    ttl = shared_cache_ttl(entry.cache_control)
+    if response.status_code == 200 and ttl:
+        response_cache.set(key, entry, ttl)
+
+    return _cached_response(request, entry, "MISS")
+
+
+@router.api_route(
+    "/{path:path}", methods=["POST", "PUT", "PATCH", "DELETE"], dependencies=[Depends(require_user)]
+)
+async def write_inventory(path: str, request: Request):
+    headers = {"Accept": "application/json"}
+    if "content-type" in request.headers:
+        headers["Content-Type"] = request.headers["content-type"]
+    if "authorization" in request.headers:
+        headers["Authorization"] = request.headers["authorization"]
+
+    response = await inventory_upstream.request(
+        request.method,
+        f"/{path}",
+        params=request.query_params,
+        content=await request.body(),
+        headers=headers,
+    )
+
+    return Response(
+        content=response.content,
+        status_code=response.status_code,
+        headers={"Content-Type": response.headers.get("content-type", "application/json")},
+    )
@@ -55,3 +55,7 @@ class UpdatePassword(BaseModel):
     old_password: str
     new_password: str
     confirm_new_password: str
+
+
+class ValidateTokens(BaseModel):
+    tokens: list[str]
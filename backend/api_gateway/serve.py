@@ -0,0 +1,31 @@
+"""Run the gateway with several uvicorn worker processes.
+
+    python -m api_gateway.serve
+
+WEB_CONCURRENCY sets the worker count (default: one per CPU) and is exported
+to the workers, which size their per-process limits from it. The workers
+share an invalidation bus directory so a cache purge reaches all of them.
+"""
+import os
+import tempfile
+
+import uvicorn
+
+
+def main() -> None:
+    workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    if workers > 1:
+        os.environ.setdefault("INVALIDATION_BUS_DIR", tempfile.mkdtemp(prefix="api-gateway-bus-"))
+
+    uvicorn.run(
+        "api_gateway.main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", 8000)),
+        workers=workers,
+        log_level=os.getenv("LOG_LEVEL", "info"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 10_000))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    status_code: int
+    media_type: str
+    etag: str | None
+    cache_control: str | None = None
+    tags: frozenset[str] = field(default_factory=frozenset)
+    expires_at: float = 0.0
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+
+def parse_cache_control(value: str | None) -> dict[str, str | None]:
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+    return directives
+
+
+def shared_cache_ttl(cache_control: str | None) -> float | None:
+    """How long a shared cache may keep a response, or None if it mustn't."""
+    directives = parse_cache_control(cache_control)
+    if {"no-store", "no-cache", "private"} & directives.keys():
+        return None
+    for name in ("s-maxage", "max-age"):
+        if directives.get(name):
+            try:
+                ttl = float(directives[name])
+            except ValueError:
+                return None
+            return ttl if ttl > 0 else None
+    return None
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def cache_key(path: str, query: str) -> str:
+    # Order-insensitive query so ?a=1&b=2 and ?b=2&a=1 share an entry
+    return path + "?" + "&".join(sorted(query.split("&"))) if query else path
+
+
+class ResponseCache:
+    """In-process LRU of upstream responses with a tag index for purging."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not entry.fresh:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CachedResponse, ttl: float) -> None:
+        if len(entry.body) > self.max_bytes:
+            return
+        self._remove(key)
+        entry.expires_at = time.monotonic() + ttl
+        self._entries[key] = entry
+        self.size += len(entry.body)
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def purge_tags(self, tags) -> int:
+        purged = 0
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+                purged += 1
+        return purged
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+        self.size = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.size -= len(entry.body)
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Set by the multi-worker entry point; every worker of one server shares it
+INVALIDATION_BUS_DIR = os.getenv("INVALIDATION_BUS_DIR")
+MAX_MESSAGE_BYTES = 64 * 1024
+
+
+class InvalidationBus:
+    """Fan-out of invalidation messages between worker processes on one host.
+
+    Each worker binds a unix datagram socket in a shared directory; publishing
+    sends the message to every other socket there. Delivery is best effort:
+    a peer whose receive buffer is full misses the message, so anything sent
+    here must also expire on its own (cache TTLs do).
+
+    Only the gateway's HTTP response cache is relayed. The services' own
+    in-process caches stay per worker: the inventory indexes and FX snapshot
+    refresh themselves from the database or their index files, and a stale
+    auth existence index only costs a lookup, since the unique constraints
+    decide.
+    """
+
+    def __init__(self, directory: str | None = INVALIDATION_BUS_DIR):
+        self.directory = Path(directory) if directory else None
+        self.path: Path | None = None
+        self._sock: socket.socket | None = None
+        self._subscribers: dict[str, list[Callable[[dict], None]]] = {}
+
+    def subscribe(self, channel: str, callback: Callable[[dict], None]) -> None:
+        self._subscribers.setdefault(channel, []).append(callback)
+
+    async def start(self) -> None:
+        if self.directory is None or self._sock is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"{os.getpid()}.sock"
+        self.path.unlink(missing_ok=True)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(str(self.path))
+        sock.setblocking(False)
+        self._sock = sock
+        asyncio.get_running_loop().add_reader(sock.fileno(), self._on_readable)
+        logger.info("Invalidation bus listening on %s", self.path)
+
+    async def close(self) -> None:
+        if self._sock is None:
+            return
+        asyncio.get_running_loop().remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        self.path.unlink(missing_ok=True)
+
+    def publish(self, channel: str, payload: dict) -> None:
+        """Send to the other workers; the caller applies the change locally."""
+        if self._sock is None:
+            return
+        data = json.dumps({"channel": channel, "payload": payload}).encode("utf-8")
+        if len(data) > MAX_MESSAGE_BYTES:
+            logger.warning("Invalidation on %s dropped: %d bytes is over the limit", channel, len(data))
+            return
+
+        for peer in self.directory.glob("*.sock"):
+            if peer == self.path:
+                continue
+            try:
+                self._sock.sendto(data, str(peer))
+            except (ConnectionRefusedError, FileNotFoundError):
+                # The worker behind it exited without cleaning up
+                peer.unlink(missing_ok=True)
+            except BlockingIOError:
+                logger.warning("Invalidation on %s dropped: %s is not keeping up", channel, peer.name)
+
+    def _on_readable(self) -> None:
+        while True:
+            try:
+                data = self._sock.recv(MAX_MESSAGE_BYTES)
+            except BlockingIOError:
+                return
+            try:
+                message = json.loads(data)
+                callbacks = self._subscribers.get(message["channel"], [])
+                for callback in callbacks:
+                    callback(message["payload"])
+            except Exception:
+                logger.exception("Failed to apply invalidation message")
+
+
+invalidation_bus = InvalidationBus()
@@ -0,0 +1,306 @@
+import asyncio
+import os
+import random
+import time
+from collections import deque
+
+import httpx
+from fastapi import HTTPException, status
+
+from common.telemetry import inject_trace_headers, stage_timer
+
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", 10.0))
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", 2.0))
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", 100))
+UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", 2))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", 5))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", 10.0))
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", 0.1))
+HEDGING_ENABLED = os.getenv("HEDGING_ENABLED", "True").lower() in ("true", "1", "t")
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRYABLE_STATUSES = {502, 503, 504}
+
+
+class CircuitBreaker:
+    """Stops sending traffic to an upstream after consecutive failures.
+
+    After `reset_timeout` seconds open, a single probe request is let through
+    (half-open); its outcome closes the breaker or re-opens it. A probe that
+    ends without an outcome (cancelled, or an unexpected error) must still be
+    released, or the breaker would stay half-open and refuse everything.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_owner = None
+
+    def allow_request(self, owner: object = None) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = "half_open"
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        self._probe_owner = owner
+        return True
+
+    def release(self, owner: object) -> None:
+        """Counts `owner`'s probe as failed if it is still outstanding."""
+        if self._probe_in_flight and self._probe_owner is owner:
+            self.record_failure()
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class RetryBudget:
+    """Caps retries (and hedges) to a fraction of recent request volume, so a
+    struggling upstream doesn't get multiplied load on top of its traffic."""
+
+    def __init__(self, ratio: float = RETRY_BUDGET_RATIO, min_per_second: float = 5.0, ttl: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.ttl = ttl
+        self._requests: deque[float] = deque()
+        self._retries: deque[float] = deque()
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.ttl
+        while self._requests and self._requests[0] < cutoff:
+            self._requests.popleft()
+        while self._retries and self._retries[0] < cutoff:
+            self._retries.popleft()
+
+    def record_request(self) -> None:
+        self._requests.append(time.monotonic())
+
+    def try_withdraw(self) -> bool:
+        now = time.monotonic()
+        self._expire(now)
+        allowed = self.min_per_second * self.ttl + self.ratio * len(self._requests)
+        if len(self._retries) >= allowed:
+            return False
+        self._retries.append(now)
+        return True
+
+
+class LatencyTracker:
+    def __init__(self, size: int = 500, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def percentile(self, pct: float) -> float | None:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class Upstream:
+    """Shared connection pool plus failure handling for one backend service."""
+
+    def __init__(self, name: str, base_url: str, timeout: float = UPSTREAM_TIMEOUT):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = httpx.Timeout(timeout, connect=UPSTREAM_CONNECT_TIMEOUT)
+        self.breaker = CircuitBreaker()
+        self.retry_budget = RetryBudget()
+        self.latency = LatencyTracker()
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=UPSTREAM_MAX_CONNECTIONS,
+                    max_keepalive_connections=UPSTREAM_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def hedge_delay(self) -> float | None:
+        p95 = self.latency.percentile(0.95)
+        if p95 is None:
+            return None
+        return min(max(p95, 0.01), self.timeout.read / 2)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        idempotent: bool | None = None,
+        hedge: bool = False,
+        stream: bool = False,
+        **kwargs,
+    ) -> httpx.Response:
+        """Sends a request with retries, breaker accounting and optional hedging.
+
+        With stream=True the response is returned once its headers arrive and
+        the body is left unread; the caller must aclose() it. Streamed
+        requests are never hedged: a duplicate would repeat the whole body.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        # Identifies this request's probe, if the breaker lets it through as one
+        owner = object()
+        if not self.breaker.allow_request(owner):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"{self.name} is unavailable",
+                headers={"Retry-After": str(int(self.breaker.reset_timeout))},
+            )
+
+        self.retry_budget.record_request()
+        try:
+            return await self._attempts(method, path, idempotent, hedge and not stream, stream, owner, **kwargs)
+        finally:
+            # Cancelled mid-flight (client went away, or the losing hedge) or
+            # failed in a way that recorded nothing
+            self.breaker.release(owner)
+
+    async def _attempts(
+        self, method: str, path: str, idempotent: bool, hedge: bool, stream: bool, owner: object, **kwargs
+    ) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                if hedge and idempotent and HEDGING_ENABLED:
+                    response = await self._send_hedged(method, path, **kwargs)
+                else:
+                    response = await self._send(method, path, stream=stream, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                # Nothing reached the upstream, so this is safe to retry for
+                # any method
+                self.breaker.record_failure()
+                if self._can_retry(attempt, owner):
+                    attempt += 1
+                    await self._backoff(attempt)
+                    continue
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"{self.name} is unavailable",
+                )
+            except httpx.TimeoutException:
+                self.breaker.record_failure()
+                if idempotent and self._can_retry(attempt, owner):
+                    attempt += 1
+                    continue
+                raise HTTPException(
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                    detail=f"{self.name} did not respond in time",
+                )
+            except httpx.TransportError:
+                self.breaker.record_failure()
+                if idempotent and self._can_retry(attempt, owner):
+                    attempt += 1
+                    await self._backoff(attempt)
+                    continue
+                raise HTTPException(
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail=f"{self.name} returned an invalid response",
+                )
+            except httpx.HTTPError:
+                # Undecodable body, redirect loop: retrying won't change it
+                self.breaker.record_failure()
+                raise HTTPException(
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail=f"{self.name} returned an invalid response",
+                )
+
+            if response.status_code in RETRYABLE_STATUSES:
+                self.breaker.record_failure()
+                if idempotent and self._can_retry(attempt, owner):
+                    await response.aclose()
+                    attempt += 1
+                    await self._backoff(attempt)
+                    continue
+                return response
+
+            self.breaker.record_success()
+            return response
+
+    def _can_retry(self, attempt: int, owner: object) -> bool:
+        return (
+            attempt < UPSTREAM_MAX_RETRIES
+            and self.breaker.allow_request(owner)
+            and self.retry_budget.try_withdraw()
+        )
+
+    async def _backoff(self, attempt: int) -> None:
+        # Full jitter keeps retries from a burst of clients from lining up
+        await asyncio.sleep(random.uniform(0, 0.05 * 2**attempt))
+
+    async def _send(self, method: str, path: str, stream: bool = False, **kwargs) -> httpx.Response:
+        headers = inject_trace_headers(dict(kwargs.pop("headers", None) or {}))
+        start = time.perf_counter()
+        with stage_timer("proxy_hop"):
+            request = self.client.build_request(method, path, headers=headers, **kwargs)
+            response = await self.client.send(request, stream=stream)
+        if not stream:
+            # Time to headers says nothing about how long a streamed body takes,
+            # so only full responses feed the hedging percentile
+            self.latency.record(time.perf_counter() - start)
+        return response
+
+    async def _send_hedged(self, method: str, path: str, **kwargs) -> httpx.Response:
+        # Fire a second copy if the first is slower than the recent p95;
+        # whichever answers first wins
+        delay = self.hedge_delay()
+        primary = asyncio.create_task(self._send(method, path, **kwargs))
+        if delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not self.retry_budget.try_withdraw():
+            return await primary
+
+        pending = {primary, asyncio.create_task(self._send(method, path, **kwargs))}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,26 @@
+"""Settings shared across the auth service.
+
+Import this before anything that reads os.environ at import time: it loads
+.env exactly once for the whole process.
+"""
+import os
+
+from dotenv import load_dotenv
+
+from common.settings import env_flag, split_connections
+
+load_dotenv()
+
+DEBUG = env_flag("DEBUG")
+# Production applies migrations instead; set False to skip create_all on startup
+AUTO_CREATE_SCHEMA = env_flag("AUTO_CREATE_SCHEMA", "True")
+
+# Worker processes serving this service (exported by the serve entry point)
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", 1)))
+# Connections the service may hold across all of its workers
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", 15))
+
+
+def pool_limits() -> tuple[int, int]:
+    """Split this worker's share of DB_MAX_CONNECTIONS into (pool_size, max_overflow)."""
+    return split_connections(DB_MAX_CONNECTIONS, WEB_CONCURRENCY)
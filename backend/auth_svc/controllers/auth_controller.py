@@ -1,28 +1,29 @@
+from .. import config  # noqa: F401  (loads .env before the getenv calls below)
 from ..models import auth_model
 from ..schemas import auth_schema
-from ..database.database import get_db
-from .password_reset import send_email
-from bcrypt import hashpw, gensalt, checkpw
-from fastapi import status, HTTPException, Depends
+from ..database.database import SessionLocal, get_db
+from .email_dispatcher import dispatcher, enqueue_email
+from ..utils.keys import TokenError, TokenExpired, key_ring
+from ..utils.existence_index import existence_index
+from ..utils.passwords import hash_password, needs_rehash, verify_password
+from fastapi import BackgroundTasks, status, HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-import email_validator
-from jose import jwt, JWTError
 from datetime import datetime, timedelta, timezone
 import time
 import os
-from dotenv import load_dotenv
 import hashlib, secrets
+import uuid
 
-load_dotenv()
-
-JWT_SECRET_KEY = os.getenv("JWT_SECRET", "kasldjflasdjflaksjdflkasjf")
+# Most tokens a caller may validate in one request
+VALIDATE_BATCH_MAX = int(os.getenv("VALIDATE_BATCH_MAX", 100))
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
-
-
-def hash_password(password: str):
-    return hashpw(password.encode("utf-8"), gensalt(rounds=10)).decode("utf-8")
+# Concurrent refresh sessions per user; logging in past the limit evicts the oldest
+MAX_SESSIONS_PER_USER = max(1, int(os.getenv("MAX_SESSIONS_PER_USER", 1)))
+REFRESH_TOKEN_TTL = timedelta(days=7)
 
 
 def validate_registration_data(user: auth_schema.UserCreate):
@@ -33,11 +34,6 @@ def validate_registration_data(user: auth_schema.UserCreate):
     if len(user.password) < 8:
         errors["password"] = "Password must be at least 8 characters long"
 
-    try:
-        email_validator.validate_email(user.email, check_deliverability=False)
-    except email_validator.EmailNotValidError as e:
-        errors["email"] = str(e)
-
     if len(user.phone) != 10 or not user.phone.isdigit():
         errors["phone"] = "Phone number must be 10 digits long"
 
@@ -48,55 +44,113 @@ def validate_registration_data(user: auth_schema.UserCreate):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=errors)
 
 
+def _registration_conflict(user: auth_schema.UserCreate, db: Session) -> HTTPException | None:
+    # One indexed lookup covering both unique columns
+    taken = db.execute(
+        select(auth_model.Users.user_name, auth_model.Users.email)
+        .where(
+            (auth_model.Users.email == user.email)
+            | (auth_model.Users.user_name == user.user_name)
+        )
+        .limit(2)
+    ).all()
+    if any(email == user.email for _, email in taken):
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
+    if taken:
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already taken")
+    return None
+
+
 def register_user(user: auth_schema.UserCreate, db: Session):
     # Validate data first before hitting the database
     validate_registration_data(user)
 
-    # Check if the user already exists
-    existing_user = (
-        db.query(auth_model.Users).filter(auth_model.Users.email == user.email).first()
-    )
-
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
-        )
+    # Only names the existence index can't rule out cost a lookup, and known
+    # duplicates are turned away before paying for the password hash
+    if existence_index.might_exist(user.user_name, user.email):
+        conflict = _registration_conflict(user, db)
+        if conflict is not None:
+            raise conflict
 
-    # Hash the password
     password_hash = hash_password(user.password)
 
-    # Create a new user instance
-    new_user = auth_model.Users(
-        email=user.email,
-        user_name=user.user_name,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        password_hash=password_hash,
-        phone=user.phone,
-    )
-
-    # Add the new user to the database
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    # The unique constraints stay authoritative: a signup that raced past the
+    # checks above fails the INSERT and is reported the same way
+    try:
+        db.execute(
+            insert(auth_model.Users).values(
+                email=user.email,
+                user_name=user.user_name,
+                first_name=user.first_name,
+                last_name=user.last_name,
+                password_hash=password_hash,
+                phone=user.phone,
+            )
+        )
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        # Most likely registered through another worker; remember it here too
+        existence_index.add(user.user_name, user.email)
+        raise _registration_conflict(user, db) or HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="User already registered"
+        )
 
-    return new_user
+    existence_index.add(user.user_name, user.email)
+    return auth_schema.ViewUser(**user.model_dump())
 
 
 def generate_token(data: dict, expires_delta: timedelta):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + expires_delta
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm="HS256")
+    encoded_jwt = key_ring.encode(to_encode)
     return encoded_jwt
 
 
-def login_user(credentials: auth_schema.UserLogin, db: Session):
-    user = (
-        db.query(auth_model.Users)
-        .filter(auth_model.Users.user_name == credentials.user_name)
-        .first()
+def _evict_sessions_statement(user_name: str, keep: int, now: datetime):
+    """Delete all of the user's sessions except the `keep` newest live ones."""
+    sessions = auth_model.UserSessions
+    statement = delete(sessions).where(sessions.user_name == user_name)
+    if keep == 0:
+        return statement
+    newest = (
+        select(sessions.session_id)
+        .where(sessions.user_name == user_name, sessions.expires_at > now)
+        .order_by(sessions.expires_at.desc())
+        .limit(keep)
     )
+    return statement.where(sessions.session_id.not_in(newest))
+
+
+def rehash_password(user_name: str, password: str, old_hash: str) -> None:
+    """Upgrade a stored hash to the current policy; runs after the response."""
+    new_hash = hash_password(password)
+    with SessionLocal() as db:
+        # Only replace the hash we verified, not one from a concurrent password change
+        db.execute(
+            update(auth_model.Users)
+            .where(
+                auth_model.Users.user_name == user_name,
+                auth_model.Users.password_hash == old_hash,
+            )
+            .values(password_hash=new_hash)
+        )
+        db.commit()
+
+
+def login_user(
+    credentials: auth_schema.UserLogin,
+    db: Session,
+    background_tasks: BackgroundTasks | None = None,
+):
+    user = db.execute(
+        select(
+            auth_model.Users.user_name,
+            auth_model.Users.role,
+            auth_model.Users.password_hash,
+        ).where(auth_model.Users.user_name == credentials.user_name)
+    ).first()
 
     if not user:
         raise HTTPException(
@@ -104,36 +158,36 @@ def login_user(credentials: auth_schema.UserLogin, db: Session):
             detail="Invalid username or password",
         )
 
-    if not checkpw(
-        credentials.password.encode("utf-8"), user.password_hash.encode("utf-8")
-    ):
+    if not verify_password(credentials.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
         )
 
+    if background_tasks is not None and needs_rehash(user.password_hash):
+        background_tasks.add_task(
+            rehash_password, user.user_name, credentials.password, user.password_hash
+        )
+
     data = {"sub": user.user_name, "role": user.role}
 
     access_token = generate_token(data, expires_delta=timedelta(minutes=15))
-    refresh_token = generate_token(data, expires_delta=timedelta(days=7))
-
-    existing_sessions = (
-        db.query(auth_model.UserSessions)
-        .filter(auth_model.UserSessions.user_name == user.user_name)
-        .all()
-    )
-    for session in existing_sessions:
-        db.delete(session)
-
-    new_session = auth_model.UserSessions(
-        user_name=user.user_name,
-        refresh_token=refresh_token,
-        expires_at=datetime.now(timezone.utc) + timedelta(days=7),
+    # A jti keeps two logins in the same second from sharing a refresh token
+    refresh_token = generate_token({**data, "jti": uuid.uuid4().hex}, expires_delta=REFRESH_TOKEN_TTL)
+
+    # One set-wise DELETE makes room for the new session (and drops expired
+    # ones), then a plain INSERT: two statements whatever the session count
+    now = datetime.now(timezone.utc)
+    db.execute(_evict_sessions_statement(user.user_name, MAX_SESSIONS_PER_USER - 1, now))
+    db.execute(
+        insert(auth_model.UserSessions).values(
+            session_id=uuid.uuid4(),
+            user_name=user.user_name,
+            refresh_token=refresh_token,
+            expires_at=now + REFRESH_TOKEN_TTL,
+        )
     )
-
-    db.add(new_session)
     db.commit()
-    db.refresh(new_session)
 
     return {"access_token": access_token, "refresh_token": refresh_token}
 
@@ -142,14 +196,14 @@ def get_current_user(
     token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
 ):
     try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=["HS256"])
+        payload = key_ring.decode(token)
         user_name = payload.get("sub")
         role = payload.get("role")
         if user_name is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
             )
-    except JWTError:
+    except TokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
@@ -157,6 +211,42 @@ def get_current_user(
     return {"user_name": user_name, "role": role}
 
 
+def validate_tokens(tokens: list[str]) -> list[dict]:
+    if len(tokens) > VALIDATE_BATCH_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {VALIDATE_BATCH_MAX} tokens per request",
+        )
+
+    # Fan-out callers often repeat the same token; verify each one once
+    verified: dict[str, dict] = {}
+    for token in tokens:
+        if token in verified:
+            continue
+        try:
+            payload = key_ring.decode(token)
+        except TokenExpired:
+            verified[token] = {"valid": False, "error": "expired"}
+            continue
+        except TokenError:
+            verified[token] = {"valid": False, "error": "invalid"}
+            continue
+
+        if payload.get("sub") is None:
+            verified[token] = {"valid": False, "error": "invalid"}
+        else:
+            verified[token] = {
+                "valid": True,
+                "claims": {
+                    "user_name": payload["sub"],
+                    "role": payload.get("role"),
+                    "exp": payload.get("exp"),
+                },
+            }
+
+    return [verified[token] for token in tokens]
+
+
 def update_user(user: auth_schema.UpdateUser, db: Session):
     existing_user = (
         db.query(auth_model.Users)
@@ -222,8 +312,6 @@ async def password_reset_request(email: str, db: Session) -> dict:
     )
 
     db.add(new_reset_token)
-    db.commit()
-    db.refresh(new_reset_token)
 
     reset_link = f"{FRONTEND_URL}/reset-password?token={reset_token}"
 
@@ -234,9 +322,13 @@ async def password_reset_request(email: str, db: Session) -> dict:
         body_html=f"<p>Click the link to reset your password: <a href='{reset_link}'>Reset Password</a></p>",
     )
 
-    await send_email(email_request)
+    # The email is written to the outbox in the same transaction as the token
+    # and delivered in the background, so the request doesn't wait on SMTP
+    outbox_entry = enqueue_email(email_request, db)
+    db.commit()
+    dispatcher.enqueue(outbox_entry.email_id)
 
-    return {"message": "Password reset email sent"}
+    return {"message": "Password reset email queued"}
 
 
 def password_reset(password_data: dict[str, str], db: Session):
@@ -313,9 +405,7 @@ def update_password(password_data: auth_schema.UpdatePassword, db: Session):
     if not user:
         raise HTTPException(status.HTTP_404_NOT_FOUND, {"message": "User not found"})
 
-    if not checkpw(
-        password_data.old_password.encode("utf-8"), user.password_hash.encode("utf-8")
-    ):
+    if not verify_password(password_data.old_password, user.password_hash):
         raise HTTPException(
             status.HTTP_401_UNAUTHORIZED, {"message": "Old password is incorrect"}
         )
@@ -337,10 +427,14 @@ def update_password(password_data: auth_schema.UpdatePassword, db: Session):
     return {"message": "Password updated successfully"}
 
 
-def refresh_token(current_user: dict, db: Session):
+def refresh_token(current_user: dict, presented_token: str, db: Session):
+    # A user may hold several sessions; only the one this token belongs to counts
     current_session = (
         db.query(auth_model.UserSessions)
-        .filter(auth_model.UserSessions.user_name == current_user["user_name"])
+        .filter(
+            auth_model.UserSessions.user_name == current_user["user_name"],
+            auth_model.UserSessions.refresh_token == presented_token,
+        )
         .first()
     )
 
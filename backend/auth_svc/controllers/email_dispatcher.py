@@ -0,0 +1,348 @@
+import asyncio
+import logging
+import os
+import ssl
+import uuid
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import Session
+
+from ..database.database import SessionLocal
+from ..models import auth_model
+from ..schemas.auth_schema import EmailRequest
+from common.telemetry import stage_timer
+from .password_reset import (
+    SMTP_HOST,
+    SMTP_PORT,
+    SMTP_USER,
+    SMTP_PASSWORD,
+    build_message,
+)
+
+if TYPE_CHECKING:
+    # Imported on first delivery so it stays off the startup path
+    import aiosmtplib
+
+logger = logging.getLogger(__name__)
+
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", 2))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 20))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+EMAIL_RETRY_BACKOFF = float(os.getenv("EMAIL_RETRY_BACKOFF", 2.0))
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", 60))
+# How long a claimed batch stays owned by its dispatcher; a row whose owner
+# died mid-batch can be claimed again after this
+EMAIL_CLAIM_SECONDS = float(os.getenv("EMAIL_CLAIM_SECONDS", 300))
+
+
+class EmailDispatcher:
+    """Delivers rows from the email_outbox table in the background.
+
+    Each worker keeps its own SMTP connection open between messages, so the
+    TLS handshake and login are paid once per connection rather than once per
+    email. Rows are committed to the outbox by the request handler before they
+    are queued here, so anything still pending is picked up again on restart.
+
+    Every worker process runs a dispatcher and all of them queue the pending
+    rows at startup, so a row is only sent after an atomic pending -> sending
+    claim; whichever dispatcher loses the claim skips it.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        hostname: str | None = SMTP_HOST,
+        port: int = SMTP_PORT,
+        username: str | None = SMTP_USER,
+        password: str | None = SMTP_PASSWORD,
+        pool_size: int = SMTP_POOL_SIZE,
+        batch_size: int = EMAIL_BATCH_SIZE,
+        max_attempts: int = EMAIL_MAX_ATTEMPTS,
+        retry_backoff: float = EMAIL_RETRY_BACKOFF,
+        idle_timeout: float = SMTP_IDLE_TIMEOUT,
+        claim_seconds: float = EMAIL_CLAIM_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.idle_timeout = idle_timeout
+        self.claim_seconds = claim_seconds
+
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._retry_handles: set[asyncio.TimerHandle] = set()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"email-dispatcher-{i}")
+            for i in range(self.pool_size)
+        ]
+        # Re-queue anything left over from a previous run
+        for email_id, next_attempt_at in await asyncio.to_thread(self._load_pending):
+            delay = (next_attempt_at - datetime.utcnow()).total_seconds()
+            self.enqueue(email_id, delay=max(delay, 0))
+
+    async def stop(self) -> None:
+        for handle in self._retry_handles:
+            handle.cancel()
+        self._retry_handles.clear()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def enqueue(self, email_id: uuid.UUID, delay: float = 0) -> None:
+        if self._queue is None:
+            # Not started; the row stays pending in the outbox until start()
+            return
+        if delay <= 0:
+            self._queue.put_nowait(email_id)
+            return
+
+        loop = asyncio.get_running_loop()
+        handle = None
+
+        def _requeue():
+            self._retry_handles.discard(handle)
+            if self._queue is not None:
+                self._queue.put_nowait(email_id)
+
+        handle = loop.call_later(delay, _requeue)
+        self._retry_handles.add(handle)
+
+    async def _worker(self) -> None:
+        smtp = None
+        try:
+            while True:
+                try:
+                    email_id = await asyncio.wait_for(
+                        self._queue.get(), timeout=self.idle_timeout
+                    )
+                except asyncio.TimeoutError:
+                    # Don't hold an idle connection open forever
+                    smtp = await self._close(smtp)
+                    continue
+
+                batch = [email_id]
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+
+                try:
+                    smtp = await self._deliver_batch(batch, smtp)
+                except Exception:
+                    # Rows stay pending in the outbox and are retried on restart
+                    logger.exception("Email dispatcher failed to process batch")
+        finally:
+            await self._close(smtp)
+
+    async def _connect(self) -> "aiosmtplib.SMTP":
+        import aiosmtplib
+
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            start_tls=self.port == 587,
+            use_tls=self.port == 465,
+            username=self.username,
+            password=self.password,
+            tls_context=ssl.create_default_context(),
+            timeout=20,
+        )
+        await smtp.connect()
+        return smtp
+
+    async def _close(self, smtp: "aiosmtplib.SMTP | None") -> None:
+        if smtp is not None and smtp.is_connected:
+            import aiosmtplib
+
+            try:
+                await smtp.quit()
+            except aiosmtplib.SMTPException:
+                smtp.close()
+        return None
+
+    async def _deliver_batch(
+        self, batch: list[uuid.UUID], smtp: "aiosmtplib.SMTP | None"
+    ) -> "aiosmtplib.SMTP | None":
+        claim_id = uuid.uuid4().hex
+        emails = await asyncio.to_thread(self._claim_batch, batch, claim_id)
+        results: dict[uuid.UUID, str | None] = {}
+        try:
+            smtp = await self._send_claimed(emails, smtp, results)
+        finally:
+            # Also releases rows an unexpected error left without a result
+            retries = await asyncio.to_thread(
+                self._record_results, results, claim_id, [email["email_id"] for email in emails]
+            )
+            for email_id, delay in retries:
+                self.enqueue(email_id, delay=delay)
+        return smtp
+
+    async def _send_claimed(
+        self, emails: list[dict], smtp: "aiosmtplib.SMTP | None", results: dict[uuid.UUID, str | None]
+    ) -> "aiosmtplib.SMTP | None":
+        import aiosmtplib
+
+        for email in emails:
+            message = build_message(
+                EmailRequest(
+                    to=email["to_address"],
+                    subject=email["subject"],
+                    body_text=email["body_text"],
+                    body_html=email["body_html"],
+                )
+            )
+            try:
+                if smtp is None or not smtp.is_connected:
+                    smtp = await self._connect()
+                with stage_timer("smtp"):
+                    await smtp.send_message(message)
+                results[email["email_id"]] = None
+            except (aiosmtplib.SMTPException, OSError) as e:
+                logger.warning("Email %s delivery failed: %s", email["email_id"], e)
+                results[email["email_id"]] = str(e)
+                # Drop the connection so the next message gets a fresh one
+                if smtp is not None:
+                    smtp.close()
+                smtp = None
+        return smtp
+
+    @staticmethod
+    def _claimable(now: datetime):
+        outbox = auth_model.EmailOutbox
+        return or_(
+            outbox.status == "pending",
+            and_(outbox.status == "sending", outbox.claimed_until < now),
+        )
+
+    def _load_pending(self) -> list[tuple[uuid.UUID, datetime]]:
+        db: Session = self.session_factory()
+        try:
+            return [
+                (row.email_id, row.next_attempt_at)
+                for row in db.query(
+                    auth_model.EmailOutbox.email_id,
+                    auth_model.EmailOutbox.next_attempt_at,
+                ).filter(self._claimable(datetime.utcnow()))
+            ]
+        finally:
+            db.close()
+
+    def _claim_batch(self, batch: list[uuid.UUID], claim_id: str) -> list[dict]:
+        """Marks the still-claimable rows of `batch` as ours and returns them.
+
+        One UPDATE ... RETURNING, so two dispatchers racing for a row can't
+        both get it back.
+        """
+        outbox = auth_model.EmailOutbox
+        now = datetime.utcnow()
+        db: Session = self.session_factory()
+        try:
+            rows = db.execute(
+                update(outbox)
+                .where(outbox.email_id.in_(batch), self._claimable(now))
+                .values(
+                    status="sending",
+                    claim_id=claim_id,
+                    claimed_until=now + timedelta(seconds=self.claim_seconds),
+                )
+                .returning(
+                    outbox.email_id,
+                    outbox.to_address,
+                    outbox.subject,
+                    outbox.body_text,
+                    outbox.body_html,
+                )
+                .execution_options(synchronize_session=False)
+            ).all()
+            db.commit()
+            return [row._asdict() for row in rows]
+        finally:
+            db.close()
+
+    def _record_results(
+        self,
+        results: dict[uuid.UUID, str | None],
+        claim_id: str,
+        claimed: list[uuid.UUID],
+    ) -> list[tuple[uuid.UUID, float]]:
+        if not claimed:
+            return []
+
+        retries = []
+        now = datetime.utcnow()
+        db: Session = self.session_factory()
+        try:
+            # Only rows this claim still owns; one whose claim lapsed belongs
+            # to whichever dispatcher picked it up since
+            rows = (
+                db.query(auth_model.EmailOutbox)
+                .filter(
+                    auth_model.EmailOutbox.email_id.in_(claimed),
+                    auth_model.EmailOutbox.status == "sending",
+                    auth_model.EmailOutbox.claim_id == claim_id,
+                )
+                .with_for_update()
+                .all()
+            )
+            for row in rows:
+                row.claim_id = None
+                row.claimed_until = None
+                if row.email_id not in results:
+                    # Left for the next restart rather than retried in a hot loop
+                    row.status = "pending"
+                    continue
+
+                error = results[row.email_id]
+                row.attempts += 1
+                if error is None:
+                    row.status = "sent"
+                    row.sent_at = now
+                    row.last_error = None
+                    continue
+
+                row.last_error = error
+                if row.attempts >= self.max_attempts:
+                    row.status = "failed"
+                    continue
+
+                delay = self.retry_backoff**row.attempts
+                row.status = "pending"
+                row.next_attempt_at = now + timedelta(seconds=delay)
+                retries.append((row.email_id, delay))
+            db.commit()
+        finally:
+            db.close()
+        return retries
+
+
+dispatcher = EmailDispatcher()
+
+
+def enqueue_email(email_request: EmailRequest, db: Session) -> auth_model.EmailOutbox:
+    # Only adds the row; it is queued for delivery once the caller commits
+    outbox_entry = auth_model.EmailOutbox(
+        email_id=uuid.uuid4(),
+        to_address=email_request.to,
+        subject=email_request.subject,
+        body_text=email_request.body_text,
+        body_html=email_request.body_html,
+    )
+    db.add(outbox_entry)
+    return outbox_entry
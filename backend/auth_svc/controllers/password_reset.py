@@ -1,10 +1,8 @@
-import os, aiosmtplib, ssl
+import os, ssl
 from email.message import EmailMessage
 from fastapi import HTTPException, status
+from .. import config  # noqa: F401  (loads .env before the getenv calls below)
 from ..schemas.auth_schema import EmailRequest
-from dotenv import load_dotenv
-
-load_dotenv()
 
 SMTP_HOST = os.getenv("SMTP_HOST")
 SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
@@ -13,7 +11,7 @@ SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
 FROM_ADDR = os.getenv("FROM_ADDR", SMTP_USER)
 
 
-async def send_email(email_request: EmailRequest):
+def build_message(email_request: EmailRequest) -> EmailMessage:
     message = EmailMessage()
     message["from"] = FROM_ADDR
     message["to"] = email_request.to
@@ -24,6 +22,15 @@ async def send_email(email_request: EmailRequest):
         message.set_content(email_request.body_text)
     else:
         raise ValueError("Email must have either body_text or body_html")
+    return message
+
+
+async def send_email(email_request: EmailRequest):
+    # One-off delivery on a fresh connection. Request handlers should go
+    # through email_dispatcher.enqueue_email instead.
+    import aiosmtplib
+
+    message = build_message(email_request)
 
     context = ssl.create_default_context()
 
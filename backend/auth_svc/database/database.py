@@ -1,24 +1,44 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import logging
 import os
 from pathlib import Path
-from dotenv import load_dotenv
+from ..config import pool_limits
+from common.telemetry import instrument_engine
 
 # Get the directory where this file is located
 BASE_DIR = Path(__file__).resolve().parent
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 AUTH_DATABASE_URL = os.getenv("AUTH_DATABASE_URL", f"sqlite:///{BASE_DIR}/auth_db.db")
 # Only use check_same_thread for SQLite
 connect_args = {"check_same_thread": False} if "sqlite" in AUTH_DATABASE_URL else {}
-engine = create_engine(AUTH_DATABASE_URL, connect_args=connect_args)
+POOL_SIZE, MAX_OVERFLOW = pool_limits()
+engine = create_engine(
+    AUTH_DATABASE_URL,
+    connect_args=connect_args,
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 if AUTH_DATABASE_URL.startswith("postgres"):
-    print("Using PostgreSQL database for authentication service.")
+    logger.info("Using PostgreSQL database for authentication service.")
+
+
+def init_db() -> None:
+    # Import the models so their tables are registered on Base
+    from ..models import auth_model
+    from .migrations import upgrade
+
+    auth_model.Base.metadata.create_all(bind=engine)
+    # create_all leaves existing tables alone
+    with engine.begin() as connection:
+        upgrade(connection)
 
 def get_db():
     db = SessionLocal()
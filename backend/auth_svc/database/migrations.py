@@ -0,0 +1,28 @@
+"""Brings an existing auth database up to the current models.
+
+Runs after create_all when AUTO_CREATE_SCHEMA is on. Deployments that manage
+the schema themselves run it once per release:
+
+    cd backend
+    python -m auth_svc.database.migrations
+"""
+from sqlalchemy.engine import Connection
+
+from common.migrations import add_enum_values, add_missing_columns, lock_upgrades
+
+from ..models import auth_model
+
+
+def upgrade(connection: Connection) -> None:
+    lock_upgrades(connection)
+    outbox = auth_model.EmailOutbox.__table__
+    # Dispatchers claim rows before sending them (status "sending")
+    add_enum_values(connection, outbox.c.status.type, "sending")
+    add_missing_columns(connection, outbox, "claim_id", "claimed_until")
+
+
+if __name__ == "__main__":
+    from .database import engine
+
+    with engine.begin() as connection:
+        upgrade(connection)
@@ -1,7 +1,39 @@
 from fastapi import FastAPI
-from .database.database import engine
-from .models import auth_model
+from fastapi.responses import PlainTextResponse
+from contextlib import asynccontextmanager
+import asyncio
+from .config import AUTO_CREATE_SCHEMA, DEBUG
+from .database.database import SessionLocal, init_db
 from .routes import auth_routes
+from .controllers.email_dispatcher import dispatcher
+from .models.auth_model import Users
+from .utils.existence_index import existence_index
+from common.profiler import QueryProfilerMiddleware
+from common.telemetry import (
+    TelemetryMiddleware,
+    TimedJSONResponse,
+    render_metrics,
+    setup_tracing,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_tracing("auth_service")
+    # Startup: Create missing tables unless migrations own the schema
+    if AUTO_CREATE_SCHEMA:
+        await asyncio.to_thread(init_db)
+    # Begin delivering queued emails from the outbox
+    await dispatcher.start()
+    # Load usernames/emails for the registration pre-check off the startup
+    # path; until it finishes every signup falls back to a lookup
+    warm_task = asyncio.create_task(
+        asyncio.to_thread(existence_index.warm, SessionLocal, Users.__table__)
+    )
+    yield
+    warm_task.cancel()
+    # Shutdown: Stop the workers and close their SMTP connections
+    await dispatcher.stop()
 
 
 app = FastAPI(
@@ -9,8 +41,12 @@ app = FastAPI(
     description="Authentication service for Travel Guru application.",
     version="0.1.0",
     contact={"name": "Vikas Bhapri", "email": "vikasbhapri@gmail.com"},
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse,
 )
 
+app.add_middleware(QueryProfilerMiddleware, expose_header=DEBUG)
+app.add_middleware(TelemetryMiddleware)
 app.include_router(auth_routes.router)
 
 
@@ -19,4 +55,7 @@ async def hello_world():
     return {"message": "Welcome to the Travel Guru Auth Service!"}
 
 
-auth_model.Base.metadata.create_all(bind=engine)
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return render_metrics()
+
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, TIMESTAMP, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, ForeignKey, Enum, Boolean
 from sqlalchemy.orm import relationship
 from ..database.database import Base
 from sqlalchemy.dialects.postgresql import UUID
@@ -37,7 +37,7 @@ class UserSessions(Base):
     __tablename__ = "user_sessions"
 
     session_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_name = Column(String, ForeignKey("users.user_name"), nullable=False)
+    user_name = Column(String, ForeignKey("users.user_name"), nullable=False, index=True)
     refresh_token = Column(String, nullable=False)
     expires_at = Column(TIMESTAMP, nullable=False)
 
@@ -54,3 +54,30 @@ class ResetPasswordTokens(Base):
     used = Column(Boolean, default=False, nullable=False)
 
     user = relationship("Users", back_populates="reset_tokens")
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    email_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    to_address = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body_text = Column(Text, nullable=True)
+    body_html = Column(Text, nullable=True)
+    # pending -> sending (claimed by one dispatcher) -> sent, failed, or back
+    # to pending for a retry
+    status = Column(
+        Enum("pending", "sending", "sent", "failed", name="email_status"),
+        default="pending",
+        nullable=False,
+        index=True,
+    )
+    # The claim that owns a sending row, and when it lapses if that
+    # dispatcher died mid-batch
+    claim_id = Column(String(32), nullable=True)
+    claimed_until = Column(TIMESTAMP, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
+    created_at = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
+    sent_at = Column(TIMESTAMP, nullable=True)
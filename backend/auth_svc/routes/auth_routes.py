@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, status, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from ..database.database import get_db
 from ..models import auth_model
 from ..schemas import auth_schema
 from ..controllers import auth_controller
+from ..utils.keys import key_ring
+import hmac
+import os
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+# Shared secret other services present to fetch HS256 verification keys
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+
 
 @router.post(
     "/register",
@@ -21,12 +27,14 @@ def register_user(user: auth_schema.UserCreate, db: Session = Depends(get_db)):
 
 @router.post("/login", response_model=auth_schema.Token, status_code=status.HTTP_200_OK)
 def login_user(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
 ):
     credentials = auth_schema.UserLogin(
         user_name=form_data.username, password=form_data.password
     )
-    tokens = auth_controller.login_user(credentials, db)
+    tokens = auth_controller.login_user(credentials, db, background_tasks)
     return tokens
 
 
@@ -90,12 +98,36 @@ def update_password(
     "/refresh-token", response_model=auth_schema.Token, status_code=status.HTTP_200_OK
 )
 def refresh_token(
+    token: str = Depends(auth_controller.oauth2_scheme),
     current_user=Depends(auth_controller.get_current_user),
     db: Session = Depends(get_db),
 ):
-    new_tokens = auth_controller.refresh_token(current_user, db)
+    # The bearer here is the refresh token issued at login
+    new_tokens = auth_controller.refresh_token(current_user, token, db)
     return new_tokens
 
 @router.get("/validate-user", status_code=status.HTTP_200_OK)
 def validate_user(current_user=Depends(auth_controller.get_current_user)):
     return {"message": "User is valid", "user": current_user}
+
+
+@router.post(
+    "/validate-tokens",
+    response_model=auth_schema.TokenValidations,
+    response_model_exclude_none=True,
+    status_code=status.HTTP_200_OK,
+)
+def validate_tokens(request: auth_schema.ValidateTokens):
+    return {"results": auth_controller.validate_tokens(request.tokens)}
+
+
+@router.get("/jwks", status_code=status.HTTP_200_OK, include_in_schema=False)
+def jwks(response: Response, x_internal_token: str | None = Header(None)):
+    # Public keys are for anyone; HS256 keys are shared secrets and only go
+    # to services holding the internal token
+    internal = bool(INTERNAL_API_TOKEN and x_internal_token) and hmac.compare_digest(
+        x_internal_token.encode(), INTERNAL_API_TOKEN.encode()
+    )
+    cache_scope = "private" if internal and key_ring.has_shared_secrets else "public"
+    response.headers["Cache-Control"] = f"{cache_scope}, max-age=300"
+    return key_ring.jwks(include_secrets=internal)
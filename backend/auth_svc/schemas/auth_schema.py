@@ -55,3 +55,23 @@ class UpdatePassword(BaseModel):
     old_password: str
     new_password: str
     confirm_new_password: str
+
+
+class ValidateTokens(BaseModel):
+    tokens: list[str]
+
+
+class TokenClaims(BaseModel):
+    user_name: str
+    role: str | None = None
+    exp: int | None = None
+
+
+class TokenValidation(BaseModel):
+    valid: bool
+    claims: TokenClaims | None = None
+    error: str | None = None
+
+
+class TokenValidations(BaseModel):
+    results: list[TokenValidation]
@@ -0,0 +1,92 @@
+"""Pick password-hash parameters that hit a target verify latency on this host.
+
+Run it on the node type the service will be deployed to, then set the
+printed variables. Existing users are rehashed at their next login.
+
+    cd backend
+    python -m auth_svc.scripts.calibrate_password_hash --target-ms 250
+    python -m auth_svc.scripts.calibrate_password_hash --scheme argon2id --memory-kib 65536
+"""
+import argparse
+import statistics
+import time
+
+from ..utils.passwords import HashPolicy, hash_password, verify_password
+
+PASSWORD = "calibration-password"
+
+
+def verify_ms(policy: HashPolicy, samples: int) -> float:
+    password_hash = hash_password(PASSWORD, policy)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        verify_password(PASSWORD, password_hash)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_bcrypt(target_ms: float, samples: int) -> HashPolicy:
+    # Each extra round doubles the work; stop at the last one under target
+    chosen = HashPolicy(scheme="bcrypt", bcrypt_rounds=4)
+    for rounds in range(4, 18):
+        candidate = HashPolicy(scheme="bcrypt", bcrypt_rounds=rounds)
+        elapsed = verify_ms(candidate, samples)
+        print(f"  bcrypt rounds={rounds:<2} {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        chosen = candidate
+    return chosen
+
+
+def calibrate_argon2(target_ms: float, samples: int, memory_kib: int, parallelism: int) -> HashPolicy:
+    # Keep the memory cost (the main defence against GPUs) and raise the time
+    # cost; give memory back only when a single pass is already too slow
+    while True:
+        chosen = None
+        for time_cost in range(1, 11):
+            candidate = HashPolicy(
+                scheme="argon2id",
+                argon2_time_cost=time_cost,
+                argon2_memory_cost=memory_kib,
+                argon2_parallelism=parallelism,
+            )
+            elapsed = verify_ms(candidate, samples)
+            print(f"  argon2id m={memory_kib} t={time_cost:<2} p={parallelism} {elapsed:8.1f} ms")
+            if elapsed > target_ms:
+                break
+            chosen = candidate
+        if chosen is not None or memory_kib <= 8192:
+            return chosen or candidate
+        memory_kib //= 2
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2id"], default="bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Median verify latency to stay under")
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--memory-kib", type=int, default=65536, help="argon2id starting memory cost")
+    parser.add_argument("--parallelism", type=int, default=4, help="argon2id lanes")
+    args = parser.parse_args()
+
+    print(f"Calibrating {args.scheme} for a {args.target_ms:.0f} ms verify target...")
+    if args.scheme == "bcrypt":
+        policy = calibrate_bcrypt(args.target_ms, args.samples)
+        settings = {"PASSWORD_HASH_SCHEME": "bcrypt", "BCRYPT_ROUNDS": policy.bcrypt_rounds}
+    else:
+        policy = calibrate_argon2(args.target_ms, args.samples, args.memory_kib, args.parallelism)
+        settings = {
+            "PASSWORD_HASH_SCHEME": "argon2id",
+            "ARGON2_TIME_COST": policy.argon2_time_cost,
+            "ARGON2_MEMORY_COST": policy.argon2_memory_cost,
+            "ARGON2_PARALLELISM": policy.argon2_parallelism,
+        }
+
+    print(f"\nMeasured {verify_ms(policy, args.samples):.1f} ms per verify with:")
+    for name, value in settings.items():
+        print(f"{name}={value}")
+
+
+if __name__ == "__main__":
+    main()
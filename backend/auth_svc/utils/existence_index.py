@@ -0,0 +1,78 @@
+import hashlib
+import logging
+import math
+import os
+import threading
+
+from sqlalchemy import select
+
+logger = logging.getLogger(__name__)
+
+EXISTENCE_INDEX_CAPACITY = int(os.getenv("EXISTENCE_INDEX_CAPACITY", 1_000_000))
+EXISTENCE_INDEX_ERROR_RATE = float(os.getenv("EXISTENCE_INDEX_ERROR_RATE", 0.01))
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str):
+        # Double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class ExistenceIndex:
+    """Answers "is this username or email definitely unused?" without a query.
+
+    A miss is authoritative; a hit may be a false positive (or a deleted
+    user) and has to be confirmed against the database. Until the index has
+    been warmed every lookup counts as a hit, so correctness never depends
+    on it. Each worker process keeps its own copy.
+    """
+
+    def __init__(self, capacity: int = EXISTENCE_INDEX_CAPACITY, error_rate: float = EXISTENCE_INDEX_ERROR_RATE):
+        self.filter = BloomFilter(capacity, error_rate)
+        self.ready = False
+        self._lock = threading.Lock()
+
+    def add(self, user_name: str, email: str) -> None:
+        with self._lock:
+            self.filter.add("u:" + user_name)
+            self.filter.add("e:" + email)
+
+    def might_exist(self, user_name: str, email: str) -> bool:
+        if not self.ready:
+            return True
+        return ("u:" + user_name) in self.filter or ("e:" + email) in self.filter
+
+    def warm(self, session_factory, users_table) -> None:
+        count = 0
+        try:
+            with session_factory() as db:
+                rows = db.execute(
+                    select(users_table.c.user_name, users_table.c.email).execution_options(yield_per=10_000)
+                )
+                for user_name, email in rows:
+                    self.add(user_name, email)
+                    count += 1
+        except Exception:
+            # Stay unready: registration keeps doing the lookup every time
+            logger.exception("Failed to warm the existence index")
+            return
+        self.ready = True
+        logger.info("Existence index warmed with %d users", count)
+
+
+existence_index = ExistenceIndex()
@@ -0,0 +1,262 @@
+import base64
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from ..config import DEBUG, WEB_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+# "kid:secret" pairs (HS256), comma separated
+JWT_SECRETS = os.getenv("JWT_SECRETS", "")
+# "kid:/path/to/private.pem" pairs; Ed25519 keys sign EdDSA, P-256 keys ES256
+JWT_KEY_FILES = os.getenv("JWT_KEY_FILES", "")
+# Rotate by adding the new key, making it active, and dropping the old one
+# once its tokens have expired
+JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID")
+# Single-secret setups from before key rotation; tokens it signed carry no kid
+JWT_SECRET = os.getenv("JWT_SECRET")
+LEGACY_KID = "legacy"
+# auto uses python-jose, which is the faster of the two for HS256/ES256 in
+# benchmarks/jwt_bench.py, and PyJWT when the ring holds EdDSA keys
+JWT_BACKEND = os.getenv("JWT_BACKEND", "auto")
+# Verified tokens remembered per process, so a token presented on every
+# request is only checked cryptographically once
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10_000))
+
+
+class TokenError(Exception):
+    pass
+
+
+class TokenExpired(TokenError):
+    pass
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _pairs(value: str, variable: str) -> list[tuple[str, str]]:
+    pairs = []
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        kid, sep, rest = entry.partition(":")
+        if not sep or not kid or not rest:
+            raise RuntimeError(f"{variable} entries must look like kid:value")
+        pairs.append((kid, rest))
+    return pairs
+
+
+def load_private_key(path: str):
+    """Return (algorithm, private key object) for a PEM file."""
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+    except ImportError:
+        raise RuntimeError("JWT_KEY_FILES needs the cryptography package") from None
+
+    private_key = serialization.load_pem_private_key(Path(path).read_bytes(), password=None)
+    if isinstance(private_key, ed25519.Ed25519PrivateKey):
+        return "EdDSA", private_key
+    if isinstance(private_key, ec.EllipticCurvePrivateKey) and private_key.curve.name == "secp256r1":
+        return "ES256", private_key
+    raise RuntimeError(f"{path}: only Ed25519 and P-256 private keys are supported")
+
+
+def public_jwk(kid: str, algorithm: str, key) -> dict:
+    jwk = {"kid": kid, "alg": algorithm, "use": "sig"}
+    if algorithm == "HS256":
+        return {**jwk, "kty": "oct", "k": _b64(key.encode("utf-8"))}
+
+    from cryptography.hazmat.primitives import serialization
+
+    public_key = key.public_key()
+    if algorithm == "EdDSA":
+        raw = public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+        return {**jwk, "kty": "OKP", "crv": "Ed25519", "x": _b64(raw)}
+    numbers = public_key.public_numbers()
+    return {
+        **jwk,
+        "kty": "EC",
+        "crv": "P-256",
+        "x": _b64(numbers.x.to_bytes(32, "big")),
+        "y": _b64(numbers.y.to_bytes(32, "big")),
+    }
+
+
+class PyJWTBackend:
+    name = "pyjwt"
+
+    def __init__(self):
+        import jwt
+
+        self.jwt = jwt
+
+    def prepare(self, algorithm: str, key):
+        """Parse a secret or private key once into (signing, verifying) objects."""
+        if algorithm == "HS256":
+            secret = key.encode("utf-8")
+            return secret, secret
+        return key, key.public_key()
+
+    def encode(self, claims: dict, key, algorithm: str, kid: str) -> str:
+        return self.jwt.encode(claims, key, algorithm=algorithm, headers={"kid": kid})
+
+    def unverified_kid(self, token: str) -> str | None:
+        try:
+            return self.jwt.get_unverified_header(token).get("kid")
+        except self.jwt.InvalidTokenError as e:
+            raise TokenError(str(e)) from e
+
+    def decode(self, token: str, key, algorithm: str) -> dict:
+        try:
+            return self.jwt.decode(token, key, algorithms=[algorithm])
+        except self.jwt.ExpiredSignatureError as e:
+            raise TokenExpired(str(e)) from e
+        except self.jwt.InvalidTokenError as e:
+            raise TokenError(str(e)) from e
+
+
+class JoseBackend:
+    name = "jose"
+
+    def __init__(self):
+        from jose import jwk, jwt
+        from jose.exceptions import ExpiredSignatureError, JWTError
+
+        self.jwk, self.jwt = jwk, jwt
+        self.expired_error, self.error = ExpiredSignatureError, JWTError
+
+    def prepare(self, algorithm: str, key):
+        if algorithm == "EdDSA":
+            raise RuntimeError("EdDSA tokens need PyJWT (pip install 'pyjwt[crypto]')")
+        signing_key = self.jwk.construct(key, algorithm)
+        if algorithm == "HS256":
+            return signing_key, signing_key
+        return signing_key, signing_key.public_key()
+
+    def encode(self, claims: dict, key, algorithm: str, kid: str) -> str:
+        return self.jwt.encode(claims, key, algorithm=algorithm, headers={"kid": kid})
+
+    def unverified_kid(self, token: str) -> str | None:
+        try:
+            return self.jwt.get_unverified_header(token).get("kid")
+        except self.error as e:
+            raise TokenError(str(e)) from e
+
+    def decode(self, token: str, key, algorithm: str) -> dict:
+        try:
+            return self.jwt.decode(token, key, algorithms=[algorithm])
+        except self.expired_error as e:
+            raise TokenExpired(str(e)) from e
+        except self.error as e:
+            raise TokenError(str(e)) from e
+
+
+def create_backend(name: str = JWT_BACKEND, algorithms: set[str] = frozenset()):
+    if name == "pyjwt" or (name == "auto" and "EdDSA" in algorithms):
+        return PyJWTBackend()
+    return JoseBackend()
+
+
+class SigningKey:
+    """A ring entry whose key material is parsed once, up front."""
+
+    def __init__(self, kid: str, algorithm: str, key, backend):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.shared_secret = algorithm == "HS256"
+        self.jwk = public_jwk(kid, algorithm, key)
+        self.signing_key, self.verifying_key = backend.prepare(algorithm, key)
+
+
+class KeyRing:
+    """The keys tokens may be verified with, one of which signs new tokens."""
+
+    def __init__(
+        self,
+        keys: list[tuple[str, str, object]],
+        active_kid: str,
+        backend=None,
+        cache_size: int = TOKEN_CACHE_SIZE,
+    ):
+        self.backend = backend or create_backend(algorithms={algorithm for _, algorithm, _ in keys})
+        self.cache_size = cache_size
+        self._verified: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.keys = {kid: SigningKey(kid, algorithm, key, self.backend) for kid, algorithm, key in keys}
+        if active_kid not in self.keys:
+            raise RuntimeError(f"JWT_ACTIVE_KID {active_kid!r} is not a configured key")
+        self.active = self.keys[active_kid]
+
+    @classmethod
+    def from_env(cls) -> "KeyRing":
+        keys = [(kid, "HS256", secret) for kid, secret in _pairs(JWT_SECRETS, "JWT_SECRETS")]
+        keys += [(kid, *load_private_key(path)) for kid, path in _pairs(JWT_KEY_FILES, "JWT_KEY_FILES")]
+        if JWT_SECRET:
+            keys.append((LEGACY_KID, "HS256", JWT_SECRET))
+
+        if not keys:
+            if not DEBUG:
+                raise RuntimeError("Set JWT_SECRETS or JWT_KEY_FILES to sign access tokens")
+            if WEB_CONCURRENCY > 1:
+                # Each worker would sign with its own key and reject the others' tokens
+                raise RuntimeError("Set JWT_SECRETS or JWT_KEY_FILES to run more than one worker")
+            # Tokens won't survive a restart
+            logger.warning("No JWT keys configured; using a random key for this process")
+            keys.append(("dev", "HS256", secrets.token_urlsafe(32)))
+
+        ring = cls(keys, JWT_ACTIVE_KID or keys[0][0])
+        logger.info("Signing tokens with %s key %r via %s", ring.active.algorithm, ring.active.kid, ring.backend.name)
+        return ring
+
+    @property
+    def has_shared_secrets(self) -> bool:
+        return any(key.shared_secret for key in self.keys.values())
+
+    def encode(self, claims: dict) -> str:
+        key = self.active
+        return self.backend.encode(claims, key.signing_key, key.algorithm, key.kid)
+
+    def decode(self, token: str) -> dict:
+        """Verify `token` with the key named in its header; raises TokenError."""
+        with self._lock:
+            claims = self._verified.get(token)
+            if claims is not None:
+                self._verified.move_to_end(token)
+        if claims is not None:
+            if claims.get("exp", float("inf")) <= time.time():
+                raise TokenExpired("Signature has expired")
+            return claims
+
+        kid = self.backend.unverified_kid(token)
+        if kid is not None and not isinstance(kid, str):
+            # The header is attacker-controlled; a list or object can't be a dict key
+            raise TokenError("Malformed signing key id")
+        if kid is None and LEGACY_KID in self.keys:
+            kid = LEGACY_KID
+        key = self.keys.get(kid)
+        if key is None:
+            raise TokenError(f"Unknown signing key {kid!r}")
+        claims = self.backend.decode(token, key.verifying_key, key.algorithm)
+
+        if self.cache_size > 0:
+            with self._lock:
+                self._verified[token] = claims
+                if len(self._verified) > self.cache_size:
+                    self._verified.popitem(last=False)
+        return claims
+
+    def jwks(self, include_secrets: bool = False) -> dict:
+        return {
+            "keys": [
+                key.jwk for key in self.keys.values() if include_secrets or not key.shared_secret
+            ]
+        }
+
+
+key_ring = KeyRing.from_env()
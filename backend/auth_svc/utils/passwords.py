@@ -0,0 +1,93 @@
+import os
+from dataclasses import dataclass
+
+from bcrypt import checkpw, gensalt, hashpw
+
+from common.telemetry import stage_timer
+
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+ARGON2_PREFIX = "$argon2id$"
+
+
+@dataclass(frozen=True)
+class HashPolicy:
+    """Which scheme and cost new password hashes are created with.
+
+    Stored hashes carry their own scheme and parameters, so verifying works
+    for any policy; hashes that don't match the current one get rehashed at
+    the holder's next login.
+    """
+
+    scheme: str = "bcrypt"
+    bcrypt_rounds: int = 10
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536  # KiB
+    argon2_parallelism: int = 4
+
+    @classmethod
+    def from_env(cls) -> "HashPolicy":
+        policy = cls(
+            scheme=os.getenv("PASSWORD_HASH_SCHEME", "bcrypt"),
+            bcrypt_rounds=int(os.getenv("BCRYPT_ROUNDS", 10)),
+            argon2_time_cost=int(os.getenv("ARGON2_TIME_COST", 3)),
+            argon2_memory_cost=int(os.getenv("ARGON2_MEMORY_COST", 65536)),
+            argon2_parallelism=int(os.getenv("ARGON2_PARALLELISM", 4)),
+        )
+        if policy.scheme not in ("bcrypt", "argon2id"):
+            raise RuntimeError("PASSWORD_HASH_SCHEME must be bcrypt or argon2id")
+        return policy
+
+    def argon2_hasher(self):
+        try:
+            from argon2 import PasswordHasher
+        except ImportError:
+            raise RuntimeError("argon2id password hashes need argon2-cffi (pip install argon2-cffi)") from None
+        return PasswordHasher(
+            time_cost=self.argon2_time_cost,
+            memory_cost=self.argon2_memory_cost,
+            parallelism=self.argon2_parallelism,
+        )
+
+
+policy = HashPolicy.from_env()
+# Built on first use so bcrypt-only deployments never import argon2
+_argon2_hasher = None
+
+
+def _argon2():
+    global _argon2_hasher
+    if _argon2_hasher is None:
+        _argon2_hasher = policy.argon2_hasher()
+    return _argon2_hasher
+
+
+def hash_password(password: str, hash_policy: HashPolicy | None = None) -> str:
+    hash_policy = hash_policy or policy
+    with stage_timer(hash_policy.scheme):
+        if hash_policy.scheme == "argon2id":
+            hasher = _argon2() if hash_policy is policy else hash_policy.argon2_hasher()
+            return hasher.hash(password)
+        return hashpw(password.encode("utf-8"), gensalt(rounds=hash_policy.bcrypt_rounds)).decode("utf-8")
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    if password_hash.startswith(ARGON2_PREFIX):
+        from argon2.exceptions import VerificationError
+
+        with stage_timer("argon2id"):
+            try:
+                return _argon2().verify(password_hash, password)
+            except VerificationError:
+                return False
+
+    with stage_timer("bcrypt"):
+        return checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+
+
+def needs_rehash(password_hash: str) -> bool:
+    if policy.scheme == "argon2id":
+        return not password_hash.startswith(ARGON2_PREFIX) or _argon2().check_needs_rehash(password_hash)
+    if not password_hash.startswith(BCRYPT_PREFIXES):
+        return True
+    # $2b$<rounds>$<salt+hash>
+    return int(password_hash[4:6]) != policy.bcrypt_rounds
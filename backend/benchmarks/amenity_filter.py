@@ -0,0 +1,163 @@
+"""Amenity filtering: hotel_amenity join vs the in-memory bitset index.
+
+Loads --hotels hotels spread over --amenities amenities (each hotel gets a
+random --per-hotel of them, with matching hotel_amenity rows and
+Hotel.amenity_bits), then times "hotels having all of these k amenities" both
+as the GROUP BY/HAVING join the relational model implies and as an
+AmenityIndex.search over the bitsets:
+
+    cd backend
+    python -m benchmarks.amenity_filter
+    python -m benchmarks.amenity_filter --hotels 50000 --database-url postgresql+asyncpg://...
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from inventory_svc.app.v1.models.inventory_model import Amenity, Base, Destination, Hotel, hotel_amenities
+from inventory_svc.app.v1.utils.amenity_index import AmenityIndex, encode_amenity_bits
+
+LOAD_BATCH = 20_000
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    # SQLite gives the dialect UUID columns NUMERIC affinity, so a hex like
+    # "8536...e006..." is stored as a float and collides with others; a
+    # leading letter keeps every ID text
+    return uuid.UUID(int=rng.getrandbits(124) | (0xA << 124))
+
+
+async def load(engine, hotels: int, amenities: int, per_hotel: int, destinations: int, seed: int) -> list[uuid.UUID]:
+    rng = random.Random(seed)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+        destination_ids = [_uuid(rng) for _ in range(destinations)]
+        await conn.execute(insert(Destination), [
+            {
+                "destination_id": d, "name": f"Destination {i}", "country": "Benchland", "region": "Bench",
+                "description": "", "image_url": "", "tags": [],
+            }
+            for i, d in enumerate(destination_ids)
+        ])
+        amenity_ids = [_uuid(rng) for _ in range(amenities)]
+        await conn.execute(insert(Amenity), [
+            {"amenity_id": a, "name": f"Amenity {i}", "category": "bench", "icon_url": "", "bit_index": i} for i, a in enumerate(amenity_ids)
+        ])
+
+        for start in range(0, hotels, LOAD_BATCH):
+            hotel_rows, link_rows = [], []
+            for i in range(start, min(start + LOAD_BATCH, hotels)):
+                hotel_id = _uuid(rng)
+                indexes = rng.sample(range(amenities), per_hotel)
+                hotel_rows.append({
+                    "hotel_id": hotel_id,
+                    "destination_id": destination_ids[i % destinations],
+                    "name": f"Hotel {i}",
+                    "address": f"{i} Bench Street",
+                    "price_per_night": 100.0,
+                    "latitude": 0.0,
+                    "longitude": 0.0,
+                    "amenity_bits": encode_amenity_bits(indexes),
+                })
+                link_rows.extend({"hotel_id": hotel_id, "amenity_id": amenity_ids[j]} for j in indexes)
+            await conn.execute(insert(Hotel), hotel_rows)
+            await conn.execute(insert(hotel_amenities), link_rows)
+    return amenity_ids
+
+
+def join_query(amenity_ids: list[uuid.UUID], limit: int):
+    return (
+        select(hotel_amenities.c.hotel_id)
+        .where(hotel_amenities.c.amenity_id.in_(amenity_ids))
+        .group_by(hotel_amenities.c.hotel_id)
+        .having(func.count() == len(amenity_ids))
+        .order_by(hotel_amenities.c.hotel_id)
+        .limit(limit)
+    )
+
+
+async def bench(args) -> dict:
+    database_url = args.database_url or f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/amenities.db"
+    engine = create_async_engine(database_url)
+    started = time.perf_counter()
+    amenity_ids = await load(engine, args.hotels, args.amenities, args.per_hotel, args.destinations, args.seed)
+    print(f"Loaded {args.hotels:,} hotels in {time.perf_counter() - started:.1f}s")
+
+    index = AmenityIndex()
+    async with AsyncSession(engine) as db:
+        started = time.perf_counter()
+        await index.refresh(db)
+        build_s = time.perf_counter() - started
+    tracemalloc.start()
+    async with AsyncSession(engine) as db:
+        await AmenityIndex().refresh(db)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    resident = index.ids.nbytes + index.bits.nbytes + index.destinations.nbytes
+    results = {"build_s": round(build_s, 2), "index_mb": round(resident / 1e6, 1), "build_peak_mb": round(peak / 1e6, 1)}
+    print(f"Index build {build_s:.2f}s, {resident / 1e6:.1f} MB resident, {peak / 1e6:.1f} MB peak while building")
+
+    rng = random.Random(args.seed + 1)
+    print(f"{'k':>3} {'matches':>9} {'join ms':>9} {'bitset ms':>10} {'speedup':>8}")
+    async with engine.connect() as conn:
+        for k in args.k:
+            join_times, bitset_times, matched = [], [], []
+            for _ in range(args.queries):
+                chosen = rng.sample(range(args.amenities), k)
+                started = time.perf_counter()
+                expected = (await conn.execute(join_query([amenity_ids[i] for i in chosen], args.limit))).scalars().all()
+                join_times.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                found, total = index.search(chosen, limit=args.limit)
+                bitset_times.append(time.perf_counter() - started)
+                if found != list(expected):
+                    raise AssertionError(f"bitset and join results differ for amenities {chosen}")
+                matched.append(total)
+
+            join_ms = statistics.median(join_times) * 1000
+            bitset_ms = statistics.median(bitset_times) * 1000
+            results[f"k={k}"] = {
+                "median_matches": statistics.median(matched),
+                "join_ms": round(join_ms, 2),
+                "bitset_ms": round(bitset_ms, 3),
+            }
+            print(f"{k:>3} {statistics.median(matched):>9,.0f} {join_ms:>9.2f} {bitset_ms:>10.3f} {join_ms / bitset_ms:>7.0f}x")
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hotels", type=int, default=500_000)
+    parser.add_argument("--amenities", type=int, default=100)
+    parser.add_argument("--per-hotel", type=int, default=12, help="Amenities given to each hotel")
+    parser.add_argument("--destinations", type=int, default=500)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 2, 3, 5], help="Amenities per query")
+    parser.add_argument("--queries", type=int, default=20, help="Queries timed per k")
+    parser.add_argument("--limit", type=int, default=20, help="Page size, as the search endpoint returns")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="Scratch async database whose inventory tables are dropped and reloaded; defaults to a throwaway SQLite file")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(bench(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Diff two benchmark baselines written by benchmarks.run.
+
+    python -m benchmarks.compare old.json new.json --fail-over 10
+
+Exits non-zero when any scenario's p95 or throughput regressed by more than
+--fail-over percent.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+METRICS = [
+    # name, higher is better
+    ("throughput_rps", True),
+    ("p50_ms", False),
+    ("p95_ms", False),
+    ("p99_ms", False),
+    ("error_rate", False),
+]
+GATED_METRICS = {"throughput_rps", "p95_ms"}
+
+
+def change_pct(old: float, new: float) -> float | None:
+    if old == 0:
+        return None
+    return (new - old) / old * 100
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--fail-over", type=float, default=None, help="Regression threshold in percent")
+    args = parser.parse_args()
+
+    old = json.loads(Path(args.baseline).read_text())
+    new = json.loads(Path(args.candidate).read_text())
+    print(f"baseline {old['meta'].get('commit')}  ->  candidate {new['meta'].get('commit')}\n")
+
+    regressions = []
+    header = f"{'scenario':<20} {'metric':<15} {'baseline':>12} {'candidate':>12} {'change':>9}"
+    print(header)
+    print("-" * len(header))
+    for scenario in sorted(set(old["scenarios"]) | set(new["scenarios"])):
+        before = old["scenarios"].get(scenario)
+        after = new["scenarios"].get(scenario)
+        if before is None or after is None:
+            print(f"{scenario:<20} {'(only in ' + ('candidate' if before is None else 'baseline') + ')'}")
+            continue
+
+        for metric, higher_is_better in METRICS:
+            pct = change_pct(before[metric], after[metric])
+            pct_text = "n/a" if pct is None else f"{pct:+.1f}%"
+            print(f"{scenario:<20} {metric:<15} {before[metric]:>12} {after[metric]:>12} {pct_text:>9}")
+
+            if pct is None or args.fail_over is None or metric not in GATED_METRICS:
+                continue
+            regressed = -pct if higher_is_better else pct
+            if regressed > args.fail_over:
+                regressions.append(f"{scenario} {metric} {pct_text}")
+
+    if regressions:
+        print("\nRegressions over threshold:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""CPU cost vs bytes saved for the gateway's response compression.
+
+Builds inventory-shaped payloads from the deterministic generator (a single
+hotel, list pages of 20 and 100 hotels, a room-rate NDJSON export chunk),
+compresses each with every available encoding at the fast and default
+levels, and reports the ratio, the CPU time per response and how long the
+saved bytes would have taken on --link-kbps. Compression pays off wherever
+the last column is larger than the CPU column:
+
+    cd backend
+    python -m benchmarks.compression_bench
+    python -m benchmarks.compression_bench --link-kbps 400 --output compression.json
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+from api_gateway.middleware.compression import ENCODERS, compress
+from inventory_svc.app.v1.controllers.export_controller import create_encoder, stream_export
+from inventory_svc.app.v1.scripts.generate_data import GeneratorConfig, generate
+
+
+async def _ndjson(database_url: str, table: str, limit_bytes: int) -> list[bytes]:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(database_url)
+    encoder = create_encoder(table, "ndjson")
+    lines, size = [], 0
+    async for chunk in stream_export(engine, table, encoder):
+        for line in chunk.splitlines():
+            lines.append(line)
+            size += len(line) + 1
+            if size >= limit_bytes:
+                break
+        if size >= limit_bytes:
+            break
+    await engine.dispose()
+    return lines
+
+
+def build_payloads(export_bytes: int) -> dict[str, bytes]:
+    database_url = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/compression.db"
+    config = GeneratorConfig(
+        destinations=10, hotels_per_destination=20, rooms_per_hotel=3, days=60,
+        packages_per_destination=0, flights=0,
+    )
+    generate(database_url, config, processes=1)
+    hotels = [json.loads(line) for line in asyncio.run(_ndjson(database_url, "hotels", 1 << 20))]
+    rates = asyncio.run(_ndjson(database_url, "rates", export_bytes))
+
+    def page(items) -> bytes:
+        # Same encoding as the services' JSON responses
+        return json.dumps({"status": "success", "data": items}, separators=(",", ":")).encode("utf-8")
+
+    return {
+        "hotel": page(hotels[0]),
+        "hotels x20": page(hotels[:20]),
+        "hotels x100": page(hotels[:100]),
+        "rates export": b"\n".join(rates) + b"\n",
+    }
+
+
+def bench(body: bytes, encoding: str, fast: bool, min_seconds: float) -> tuple[int, float]:
+    compressed = compress(body, encoding, fast)
+    runs = 0
+    started = time.perf_counter()
+    while True:
+        compress(body, encoding, fast)
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return len(compressed), elapsed / runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--link-kbps", type=float, default=1000, help="Client link speed the savings are priced at")
+    parser.add_argument("--export-bytes", type=int, default=4 << 20, help="Size of the NDJSON export payload")
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="Time spent per measurement")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    payloads = build_payloads(args.export_bytes)
+    link_bytes_per_ms = args.link_kbps * 1000 / 8 / 1000
+    results = {}
+    print(f"Encodings: {', '.join(ENCODERS)}; link {args.link_kbps:g} kbit/s")
+    print(f"{'payload':<13} {'encoding':<10} {'bytes':>10} {'out':>9} {'ratio':>6} {'cpu ms':>8} {'MB/s':>7} {'saved ms':>9}")
+    for payload_name, body in payloads.items():
+        for encoding in ENCODERS:
+            for fast in (True, False):
+                size, seconds = bench(body, encoding, fast, args.min_seconds)
+                label = f"{encoding}{' fast' if fast else ''}"
+                saved_ms = (len(body) - size) / link_bytes_per_ms
+                results[f"{payload_name} {label}"] = {
+                    "bytes": len(body),
+                    "compressed_bytes": size,
+                    "ratio": round(len(body) / size, 2),
+                    "cpu_ms": round(seconds * 1000, 3),
+                    "mb_per_s": round(len(body) / 1e6 / seconds, 1),
+                    "transfer_ms_saved": round(saved_ms, 1),
+                }
+                print(
+                    f"{payload_name:<13} {label:<10} {len(body):>10,} {size:>9,} {len(body) / size:>6.1f} "
+                    f"{seconds * 1000:>8.3f} {len(body) / 1e6 / seconds:>7.1f} {saved_ms:>9.1f}"
+                )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
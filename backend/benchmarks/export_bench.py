@@ -0,0 +1,114 @@
+"""Throughput and peak memory of the streaming inventory export.
+
+Generates a data set with the deterministic generator at each --days value,
+then exports the room-rate table in every format and reports rows/s, MB/s
+and the peak Python memory (tracemalloc) of the export. Peak memory should
+track --batch-size, not the table size:
+
+    cd backend
+    python -m benchmarks.export_bench --days 30 180
+    python -m benchmarks.export_bench --database-url postgresql+asyncpg://... --days 365
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from inventory_svc.app.v1.controllers.export_controller import EXPORT_TABLES, create_encoder, stream_export
+from inventory_svc.app.v1.scripts.generate_data import GeneratorConfig, generate
+from inventory_svc.app.v1.utils.export_formats import ENCODERS
+
+
+async def _export(database_url: str, table: str, format: str, batch_size: int, trace_memory: bool):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(database_url)
+    encoder = create_encoder(table, format)
+    written = peak = 0
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    async for chunk in stream_export(engine, table, encoder, batch_size=batch_size):
+        written += len(chunk)
+    elapsed = time.perf_counter() - started
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    await engine.dispose()
+    return encoder, written, elapsed, peak
+
+
+async def bench_export(database_url: str, table: str, format: str, batch_size: int) -> dict:
+    # tracemalloc slows allocation-heavy code several times over, so time an
+    # untraced run and measure memory on a second one
+    encoder, written, elapsed, _ = await _export(database_url, table, format, batch_size, trace_memory=False)
+    _, _, _, peak = await _export(database_url, table, format, batch_size, trace_memory=True)
+    return {
+        "rows": encoder.rows,
+        "rows_per_s": round(encoder.rows / elapsed),
+        "mb_per_s": round(written / 1e6 / elapsed, 1),
+        "output_mb": round(written / 1e6, 1),
+        "peak_mem_mb": round(peak / 1e6, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 180], help="Data set sizes to compare")
+    parser.add_argument("--destinations", type=int, default=20)
+    parser.add_argument("--hotels-per-destination", type=int, default=10)
+    parser.add_argument("--rooms-per-hotel", type=int, default=3)
+    parser.add_argument("--table", default="rates", choices=list(EXPORT_TABLES))
+    parser.add_argument("--formats", nargs="+", default=list(ENCODERS), choices=list(ENCODERS))
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--database-url", help="Scratch async database whose inventory tables are dropped and reloaded; defaults to throwaway SQLite files")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'days':>5} {'format':<8} {'rows':>10} {'rows/s':>10} {'MB/s':>7} {'out MB':>8} {'peak MB':>8}")
+    for days in args.days:
+        database_url = args.database_url or f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/export.db"
+        config = GeneratorConfig(
+            destinations=args.destinations,
+            hotels_per_destination=args.hotels_per_destination,
+            rooms_per_hotel=args.rooms_per_hotel,
+            days=days,
+            packages_per_destination=0,
+            flights=0,
+        )
+        if args.database_url:
+            # Reusing one database: wipe the previous size's rows first
+            from sqlalchemy import create_engine
+
+            from inventory_svc.app.v1.models.inventory_model import Base
+            from inventory_svc.app.v1.scripts.generate_data import sync_database_url
+
+            engine = create_engine(sync_database_url(database_url))
+            Base.metadata.drop_all(engine)
+            engine.dispose()
+        generate(database_url, config, processes=os.cpu_count() or 1)
+
+        for format in args.formats:
+            try:
+                result = asyncio.run(bench_export(database_url, args.table, format, args.batch_size))
+            except RuntimeError as e:
+                print(f"skipping {format}: {e}")
+                continue
+            results[f"{days}d {format}"] = result
+            print(
+                f"{days:>5} {format:<8} {result['rows']:>10,} {result['rows_per_s']:>10,} "
+                f"{result['mb_per_s']:>7} {result['output_mb']:>8} {result['peak_mem_mb']:>8}"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Cost of converting a result page of prices into a display currency.
+
+Times three ways of converting --pages pages of mixed-currency prices: the
+FxSnapshot's vectorized convert (what search and quote responses use), a
+per-price Python loop over the same in-memory rates, and a per-price lookup
+in the FxRate table, which is what the snapshot saves:
+
+    cd backend
+    python -m benchmarks.fx_convert --sizes 20 100 1000
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from inventory_svc.app.v1.models.inventory_model import Base, FxRate
+from inventory_svc.app.v1.scripts.generate_data import FX_RATES
+from inventory_svc.app.v1.utils.fx import FxSnapshot
+
+
+def _page(rng: random.Random, size: int, currencies: list[str]) -> tuple[list[float], list[str]]:
+    return [round(rng.uniform(1500, 25000), 2) for _ in range(size)], [rng.choice(currencies) for _ in range(size)]
+
+
+def _loop_convert(rates: dict[str, float], amounts, currencies, to: str) -> list[float]:
+    return [round(amount * rates[to] / rates[currency], 2) for amount, currency in zip(amounts, currencies)]
+
+
+async def _database_convert(db: AsyncSession, amounts, currencies, to: str) -> list[float]:
+    target = (await db.execute(select(FxRate.rate).where(FxRate.currency == to))).scalar_one()
+    converted = []
+    for amount, currency in zip(amounts, currencies):
+        rate = (await db.execute(select(FxRate.rate).where(FxRate.currency == currency))).scalar_one()
+        converted.append(round(amount * target / rate, 2))
+    return converted
+
+
+def _per_page_us(fn, pages) -> float:
+    started = time.perf_counter()
+    for amounts, currencies in pages:
+        fn(amounts, currencies)
+    return (time.perf_counter() - started) / len(pages) * 1e6
+
+
+async def bench(args) -> dict:
+    rates = {**FX_RATES, "INR": 1.0}
+    currencies = sorted(rates)
+    snapshot = FxSnapshot(FX_RATES)
+
+    engine = create_async_engine(args.database_url or f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/fx.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(FxRate.__table__.drop, checkfirst=True)
+        await conn.run_sync(Base.metadata.create_all, tables=[FxRate.__table__])
+        await conn.execute(insert(FxRate), [{"currency": c, "rate": r} for c, r in rates.items()])
+
+    rng = random.Random(args.seed)
+    results = {}
+    print(f"{'page':>6} {'vectorized us':>14} {'python loop us':>15} {'db lookup us':>13}")
+    for size in args.sizes:
+        pages = [_page(rng, size, currencies) for _ in range(args.pages)]
+        vectorized = _per_page_us(lambda a, c: snapshot.convert(a, c, args.to), pages)
+        loop = _per_page_us(lambda a, c: _loop_convert(rates, a, c, args.to), pages)
+
+        db_pages = pages[: max(1, args.pages // 100)]
+        async with AsyncSession(engine) as db:
+            started = time.perf_counter()
+            for amounts, page_currencies in db_pages:
+                await _database_convert(db, amounts, page_currencies, args.to)
+            database = (time.perf_counter() - started) / len(db_pages) * 1e6
+
+        results[str(size)] = {
+            "vectorized_us": round(vectorized, 1),
+            "python_loop_us": round(loop, 1),
+            "db_lookup_us": round(database, 1),
+        }
+        print(f"{size:>6} {vectorized:>14.1f} {loop:>15.1f} {database:>13.1f}")
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 1000], help="Prices per page")
+    parser.add_argument("--pages", type=int, default=2000, help="Pages converted per size")
+    parser.add_argument("--to", default="USD")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="Async database for the per-price lookup; defaults to a throwaway SQLite file")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(bench(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
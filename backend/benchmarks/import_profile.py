@@ -0,0 +1,88 @@
+"""Import-time profile of each service's ASGI app module.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter per
+service, so nothing is already cached in sys.modules, and reports the total
+import time plus the slowest top-level packages:
+
+    cd backend
+    python -m benchmarks.import_profile --top 15 --repeat 5
+    python -m benchmarks.import_profile --service auth_svc.main --output imports.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SERVICES = ["api_gateway.main", "auth_svc.main", "inventory_svc.app.v1.main"]
+
+
+def profile_imports(module: str) -> dict:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        tail = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"import {module} failed:\n" + "\n".join(tail[-10:]))
+
+    # Lines look like "import time:  self [us] | cumulative | <indent>name";
+    # the indent gives nesting depth, so depth-0 entries add up to the total
+    packages: dict[str, int] = {}
+    modules: dict[str, int] = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        self_us, cumulative_us, raw_name = int(fields[0]), int(fields[1]), fields[2]
+        name = raw_name.strip()
+        depth = (len(raw_name) - len(raw_name.lstrip())) // 2
+        modules[name] = cumulative_us
+        top_level = name.split(".")[0]
+        packages[top_level] = packages.get(top_level, 0) + self_us
+        if depth == 0:
+            total_us += cumulative_us
+
+    return {
+        "module": module,
+        "import_ms": round(total_us / 1000, 1),
+        "interpreter_wall_ms": round(wall * 1000, 1),
+        "packages_ms": {k: round(v / 1000, 1) for k, v in sorted(packages.items(), key=lambda kv: -kv[1])},
+        "modules_ms": {k: round(v / 1000, 1) for k, v in sorted(modules.items(), key=lambda kv: -kv[1])},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--service", action="append", help="Module to profile (repeatable)")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module; the median run is reported")
+    parser.add_argument("--output", help="Write the full report as JSON")
+    args = parser.parse_args()
+
+    reports = []
+    for module in args.service or SERVICES:
+        runs = sorted((profile_imports(module) for _ in range(args.repeat)), key=lambda r: r["import_ms"])
+        reports.append(runs[len(runs) // 2])
+    for report in reports:
+        print(f"{report['module']}: {report['import_ms']} ms imports, "
+              f"{report['interpreter_wall_ms']} ms interpreter wall time")
+        print(f"  {'package (self time)':<40} {'ms':>8}")
+        for name, ms in list(report["packages_ms"].items())[: args.top]:
+            print(f"  {name:<40} {ms:>8}")
+        print()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(reports, indent=2) + "\n")
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
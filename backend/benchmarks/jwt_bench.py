@@ -0,0 +1,111 @@
+"""Sign/verify throughput of the auth service's token backends.
+
+Compares each backend (PyJWT, python-jose) and algorithm (HS256, ES256,
+EdDSA) with key objects prepared once, the old per-call path where
+python-jose re-parses the raw secret on every encode/decode, and a verify
+served from the key ring's verified-token cache:
+
+    cd backend
+    python -m benchmarks.jwt_bench --iterations 20000
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+# The key ring is built at import; give it something to load
+os.environ.setdefault("JWT_SECRETS", "bench:benchmark-secret")
+
+from auth_svc.utils.keys import JoseBackend, KeyRing, PyJWTBackend  # noqa: E402
+
+SECRET = "benchmark-secret-" + "x" * 32
+
+
+def _claims() -> dict:
+    return {"sub": "bench_user", "role": "user", "exp": datetime.now(timezone.utc) + timedelta(minutes=15)}
+
+
+def _ops_per_second(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - started)
+
+
+def _generate_key(algorithm: str):
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    return ec.generate_private_key(ec.SECP256R1())
+
+
+def bench_ring(backend, algorithm: str, iterations: int) -> dict:
+    key = SECRET if algorithm == "HS256" else _generate_key(algorithm)
+    # No verified-token cache, so every decode does the signature check
+    ring = KeyRing([("bench", algorithm, key)], "bench", backend=backend, cache_size=0)
+    claims = _claims()
+    token = ring.encode(claims)
+    return {
+        "sign_per_s": round(_ops_per_second(lambda: ring.encode(claims), iterations)),
+        "verify_per_s": round(_ops_per_second(lambda: ring.decode(token), iterations)),
+    }
+
+
+def bench_cached_verify(iterations: int) -> dict:
+    ring = KeyRing([("bench", "HS256", SECRET)], "bench", backend=JoseBackend())
+    token = ring.encode(_claims())
+    return {
+        "sign_per_s": None,
+        "verify_per_s": round(_ops_per_second(lambda: ring.decode(token), iterations)),
+    }
+
+
+def bench_uncached_jose(iterations: int) -> dict:
+    from jose import jwt
+
+    claims = _claims()
+    token = jwt.encode(claims, SECRET, algorithm="HS256")
+    return {
+        "sign_per_s": round(_ops_per_second(lambda: jwt.encode(claims, SECRET, algorithm="HS256"), iterations)),
+        "verify_per_s": round(
+            _ops_per_second(lambda: jwt.decode(token, SECRET, algorithms=["HS256"]), iterations)
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10_000)
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = {"jose HS256 (raw secret per call)": bench_uncached_jose(args.iterations)}
+    for backend_cls in (JoseBackend, PyJWTBackend):
+        try:
+            backend = backend_cls()
+        except ImportError:
+            print(f"skipping {backend_cls.name}: not installed")
+            continue
+        for algorithm in ("HS256", "ES256", "EdDSA"):
+            label = f"{backend.name} {algorithm}"
+            try:
+                results[label] = bench_ring(backend, algorithm, args.iterations)
+            except (ImportError, RuntimeError) as e:
+                print(f"skipping {label}: {e}")
+
+    results["jose HS256 (verified-token cache hit)"] = bench_cached_verify(args.iterations)
+
+    print(f"\n{'backend':<40} {'sign/s':>10} {'verify/s':>10}")
+    for label, result in results.items():
+        print(f"{label:<40} {result['sign_per_s'] or '-':>10} {result['verify_per_s']:>10}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
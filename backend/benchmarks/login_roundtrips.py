@@ -0,0 +1,121 @@
+"""Database round-trips per successful login.
+
+Calls auth_controller.login_user against a scratch database and counts the
+statements and commits each login sends, for users with few or many existing
+sessions, under the configured MAX_SESSIONS_PER_USER:
+
+    cd backend
+    python -m benchmarks.login_roundtrips --logins 50
+    MAX_SESSIONS_PER_USER=5 python -m benchmarks.login_roundtrips
+    python -m benchmarks.login_roundtrips --database-url postgresql://...
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+PASSWORD = "benchmark-password"
+
+
+class RoundTripCounter:
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.statements = self.commits = 0
+        self.seconds = 0.0
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+        event.listen(engine, "commit", self._on_commit)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        context._bench_started_at = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+        self.seconds += time.perf_counter() - context._bench_started_at
+
+    def _on_commit(self, conn):
+        self.commits += 1
+
+    def reset(self) -> None:
+        self.statements = self.commits = 0
+        self.seconds = 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--preexisting-sessions", type=int, nargs="*", default=[0, 10, 100])
+    parser.add_argument("--database-url", help="Defaults to a throwaway SQLite file")
+    args = parser.parse_args()
+
+    # The auth modules read their settings at import time
+    os.environ["AUTH_DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/auth.db"
+    os.environ.setdefault("JWT_SECRETS", "bench:benchmark-secret")
+    os.environ.setdefault("SQL_PROFILER_ENABLED", "False")
+
+    from sqlalchemy import func, select
+
+    from auth_svc.controllers import auth_controller
+    from auth_svc.database.database import SessionLocal, engine, init_db
+    from auth_svc.models import auth_model
+    from auth_svc.schemas import auth_schema
+
+    init_db()
+    password_hash = auth_controller.hash_password(PASSWORD)
+    counter = RoundTripCounter(engine)
+
+    print(f"MAX_SESSIONS_PER_USER={auth_controller.MAX_SESSIONS_PER_USER}\n")
+    print(f"{'existing sessions':>18} {'statements/login':>17} {'commits/login':>14} "
+          f"{'sql ms/login':>13} {'sessions after':>15}")
+
+    for preexisting in args.preexisting_sessions:
+        user_name = f"bench_user_{preexisting}"
+        now = datetime.now(timezone.utc)
+        with SessionLocal() as db:
+            db.add(
+                auth_model.Users(
+                    user_name=user_name,
+                    first_name="Bench",
+                    last_name="User",
+                    email=f"{user_name}@example.com",
+                    password_hash=password_hash,
+                    phone="9999999999",
+                )
+            )
+            db.add_all(
+                auth_model.UserSessions(
+                    user_name=user_name,
+                    refresh_token=f"token-{i}",
+                    expires_at=now + timedelta(days=7, seconds=-i),
+                )
+                for i in range(preexisting)
+            )
+            db.commit()
+
+        credentials = auth_schema.UserLogin(user_name=user_name, password=PASSWORD)
+        statements = commits = 0
+        seconds = 0.0
+        for _ in range(args.logins):
+            with SessionLocal() as db:
+                counter.reset()
+                auth_controller.login_user(credentials, db)
+                statements += counter.statements
+                commits += counter.commits
+                seconds += counter.seconds
+
+        with SessionLocal() as db:
+            remaining = db.scalar(
+                select(func.count())
+                .select_from(auth_model.UserSessions)
+                .where(auth_model.UserSessions.user_name == user_name)
+            )
+        print(
+            f"{preexisting:>18} {statements / args.logins:>17.1f} {commits / args.logins:>14.1f} "
+            f"{seconds / args.logins * 1000:>13.2f} {remaining:>15}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Seed the auth and inventory databases used by the benchmark harness.
+
+Users are written with SQLAlchemy Core executemany; the inventory comes from
+the deterministic generator in inventory_svc/app/v1/scripts/generate_data.py.
+Both go into tables the services have already created on startup.
+"""
+from datetime import date, datetime
+
+from bcrypt import gensalt, hashpw
+from sqlalchemy import create_engine, insert, select
+
+from auth_svc.models import auth_model
+from inventory_svc.app.v1.models import inventory_model as models
+from inventory_svc.app.v1.scripts.generate_data import GeneratorConfig, destination_ids, generate, hotel_ids
+
+SCALES = {
+    # destinations, hotels per destination, rooms per hotel, days of rates
+    "small": (20, 10, 3, 365),
+    "medium": (100, 20, 5, 365),
+    "large": (500, 40, 8, 365),
+}
+BENCH_PASSWORD = "benchmark-password"
+BATCH_SIZE = 10_000
+
+
+def _sync_url(url: str) -> str:
+    return url.replace("+aiosqlite", "").replace("+asyncpg", "+psycopg2")
+
+
+def _insert_batches(conn, table, rows) -> None:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.execute(insert(table), batch)
+            batch = []
+    if batch:
+        conn.execute(insert(table), batch)
+
+
+def seed_users(auth_db_url: str, count: int) -> list[str]:
+    # One hash for everyone: seeding shouldn't pay bcrypt per user
+    password_hash = hashpw(BENCH_PASSWORD.encode("utf-8"), gensalt(rounds=10)).decode("utf-8")
+    now = datetime.utcnow()
+    user_names = [f"bench_user_{i}" for i in range(count)]
+
+    engine = create_engine(_sync_url(auth_db_url))
+    with engine.begin() as conn:
+        _insert_batches(
+            conn,
+            auth_model.Users.__table__,
+            (
+                {
+                    "user_name": name,
+                    "first_name": "Bench",
+                    "last_name": str(i),
+                    "email": f"{name}@example.com",
+                    "password_hash": password_hash,
+                    "phone": "9999999999",
+                    "created_at": now,
+                    "updated_at": now,
+                    "role": "user",
+                }
+                for i, name in enumerate(user_names)
+            ),
+        )
+    engine.dispose()
+    return user_names
+
+
+def seed_inventory(inventory_db_url: str, scale: str, seed: int = 42, processes: int = 4) -> dict[str, list]:
+    destinations, hotels_per_destination, rooms_per_hotel, days = SCALES[scale]
+    config = GeneratorConfig(
+        seed=seed,
+        destinations=destinations,
+        hotels_per_destination=hotels_per_destination,
+        rooms_per_hotel=rooms_per_hotel,
+        days=days,
+        start_date=date.today(),
+    )
+    # The service has already created the tables on startup
+    generate(inventory_db_url, config, processes=processes, create_schema=False)
+
+    engine = create_engine(_sync_url(inventory_db_url))
+    with engine.connect() as conn:
+        countries = sorted(conn.scalars(select(models.Destination.country).distinct()))
+    engine.dispose()
+
+    return {
+        "destination_ids": [str(i) for i in destination_ids(config)],
+        "countries": countries,
+        "hotel_ids": [str(i) for i in hotel_ids(config)],
+    }
@@ -0,0 +1,127 @@
+"""Build, startup and query cost of the similar-destination index.
+
+Vectorizes --sizes synthetic destinations (descriptions drawn from a Zipf
+vocabulary, a few tags, a country and region), writes the index, then times
+loading it memory-mapped (what the service does at startup) against reading
+it fully into memory, and a top-10 query against scoring every destination
+in a Python loop:
+
+    cd backend
+    python -m benchmarks.similar_destinations --sizes 1000 10000 100000
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+
+from inventory_svc.app.v1.utils.destination_vectors import (
+    DIMENSIONS,
+    SimilarityIndex,
+    compute_idf,
+    description_buckets,
+    featurize,
+    save_index,
+)
+
+COUNTRIES = ["India", "Nepal", "Bhutan", "Sri Lanka", "Maldives", "Thailand", "Vietnam", "Indonesia", "Japan", "Greece"]
+REGIONS = ["North", "South", "East", "West", "Central"]
+TAGS = ["beach", "mountain", "heritage", "wildlife", "nightlife", "trekking", "spiritual", "food", "island", "desert"]
+
+
+def _destinations(rng: random.Random, count: int, vocabulary: list[str]) -> list[SimpleNamespace]:
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    return [
+        SimpleNamespace(
+            destination_id=uuid.UUID(int=rng.getrandbits(128), version=4),
+            description=" ".join(rng.choices(vocabulary, weights, k=rng.randint(20, 60))),
+            tags={tag: 1 for tag in rng.sample(TAGS, rng.randint(1, 4))},
+            country=rng.choice(COUNTRIES),
+            region=rng.choice(REGIONS),
+        )
+        for _ in range(count)
+    ]
+
+
+def _python_top_k(vectors: list[list[float]], query: list[float], k: int) -> list[int]:
+    scores = [sum(a * b for a, b in zip(row, query)) for row in vectors]
+    return sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[:k]
+
+
+def bench(args) -> dict:
+    rng = random.Random(args.seed)
+    vocabulary = ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(4, 9))) for _ in range(args.vocabulary)]
+    results = {}
+    print(f"{'size':>8} {'build s':>8} {'MB':>7} {'mmap load ms':>13} {'full load ms':>13} {'query us':>9} {'python query us':>16}")
+    for size in args.sizes:
+        destinations = _destinations(rng, size, vocabulary)
+        path = tempfile.mkdtemp()
+
+        started = time.perf_counter()
+        idf = compute_idf(description_buckets(destinations), size)
+        vectors = np.empty((size, DIMENSIONS), dtype=np.float32)
+        for i, destination in enumerate(destinations):
+            vectors[i] = featurize(destination, idf)
+        save_index(path, [d.destination_id for d in destinations], vectors, idf, 0)
+        build = time.perf_counter() - started
+
+        loads = {}
+        for mode in ("r", None):
+            started = time.perf_counter()
+            index = SimilarityIndex(path)
+            index.load(mmap_mode=mode)
+            loads[mode] = (time.perf_counter() - started) * 1000
+
+        index = SimilarityIndex(path)
+        index.load()
+        queries = [d.destination_id for d in rng.sample(destinations, min(args.queries, size))]
+        started = time.perf_counter()
+        for destination_id in queries:
+            index.most_similar(index.vector(destination_id), 10, exclude=destination_id)
+        query = (time.perf_counter() - started) / len(queries) * 1e6
+
+        # Capped: the loop is orders of magnitude slower
+        rows = vectors[: min(size, 2000)].tolist()
+        started = time.perf_counter()
+        for row in rows[:5]:
+            _python_top_k(rows, row, 10)
+        python_query = (time.perf_counter() - started) / 5 * 1e6 * size / len(rows)
+
+        megabytes = vectors.nbytes / 1e6
+        results[str(size)] = {
+            "build_s": round(build, 2),
+            "vectors_mb": round(megabytes, 1),
+            "mmap_load_ms": round(loads["r"], 2),
+            "full_load_ms": round(loads[None], 2),
+            "query_us": round(query, 1),
+            "python_query_us_estimated": round(python_query, 1),
+        }
+        print(
+            f"{size:>8} {build:>8.2f} {megabytes:>7.1f} {loads['r']:>13.2f} {loads[None]:>13.2f} "
+            f"{query:>9.1f} {python_query:>16.0f}"
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="Destinations indexed")
+    parser.add_argument("--vocabulary", type=int, default=5000, help="Distinct description words")
+    parser.add_argument("--queries", type=int, default=200, help="Top-10 queries timed per size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = bench(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
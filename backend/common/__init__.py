@@ -0,0 +1,6 @@
+"""Code shared by the gateway and the services.
+
+Imported as the top-level `common` package, so it must sit next to the
+service packages on sys.path: run the services from backend/, and have each
+image copy common/ alongside its own package (see auth_svc/Dockerfile).
+"""
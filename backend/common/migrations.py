@@ -0,0 +1,78 @@
+"""Additive schema upgrades for tables that already exist.
+
+create_all creates missing tables but never alters an existing one, so a
+column or enum value added to a model later has to be applied to old
+databases separately. Each helper reads the live schema first and only adds
+what is missing, so a service can run its upgrade steps on every start.
+Tables that don't exist yet are skipped: create_all makes them complete.
+"""
+import logging
+
+from sqlalchemy import Column, Enum, Table, inspect, literal, text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+# Any fixed key will do; it only has to be the same in every worker
+UPGRADE_LOCK_KEY = 0x7472_6176_656C
+
+
+def lock_upgrades(connection: Connection) -> None:
+    """Make workers that start together run their upgrade steps one at a time.
+
+    On Postgres this takes a transaction-level advisory lock, released at
+    commit, so the next worker inspects a schema that is already upgraded.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": UPGRADE_LOCK_KEY})
+
+
+def _column_ddl(connection: Connection, column: Column) -> str:
+    dialect = connection.dialect
+    ddl = f"{dialect.identifier_preparer.quote(column.name)} {column.type.compile(dialect=dialect)}"
+    default = column.default
+    if default is not None and default.is_scalar:
+        # Existing rows get the model's default rather than NULL
+        value = literal(default.arg, column.type).compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+        ddl += f" DEFAULT {value}"
+    if not column.nullable:
+        ddl += " NOT NULL"
+    return ddl
+
+
+def add_missing_columns(connection: Connection, table: Table, *names: str) -> list[str]:
+    """ALTER TABLE ... ADD COLUMN for each of `names` the table lacks; returns the ones added."""
+    inspector = inspect(connection)
+    if not inspector.has_table(table.name):
+        return []
+    existing = {column["name"] for column in inspector.get_columns(table.name)}
+    added = []
+    for name in names:
+        if name in existing:
+            continue
+        table_name = connection.dialect.identifier_preparer.format_table(table)
+        connection.exec_driver_sql(f"ALTER TABLE {table_name} ADD COLUMN {_column_ddl(connection, table.c[name])}")
+        logger.info("Added column %s.%s", table.name, name)
+        added.append(name)
+    return added
+
+
+def create_missing_indexes(connection: Connection, table: Table) -> None:
+    inspector = inspect(connection)
+    if not inspector.has_table(table.name):
+        return
+    existing = {index["name"] for index in inspector.get_indexes(table.name)}
+    for index in table.indexes:
+        if index.name not in existing:
+            index.create(connection)
+            logger.info("Created index %s", index.name)
+
+
+def add_enum_values(connection: Connection, enum: Enum, *values: str) -> None:
+    # Only Postgres has a type to alter; elsewhere the values are plain strings
+    if connection.dialect.name != "postgresql":
+        return
+    if connection.execute(text("SELECT 1 FROM pg_type WHERE typname = :name"), {"name": enum.name}).first() is None:
+        return
+    for value in values:
+        connection.exec_driver_sql(f"ALTER TYPE {enum.name} ADD VALUE IF NOT EXISTS '{value}'")
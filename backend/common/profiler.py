@@ -0,0 +1,146 @@
+"""Per-request SQL profiling: slow-query log, N+1 warnings and an optional
+X-Query-Summary header. Shared by every service with a database; queries
+reach it through telemetry.instrument_engine, which times each one once.
+"""
+import logging
+import os
+import re
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger(__name__ + ".slow_queries")
+
+SQL_PROFILER_ENABLED = os.getenv("SQL_PROFILER_ENABLED", "True").lower() in ("true", "1", "t")
+SLOW_QUERY_THRESHOLD = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200)) / 1000
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 5))
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_POSITIONAL_PARAM = re.compile(r"\$\d+|%\(\w+\)s|%s|:\w+")
+_PARAM_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normalise a statement so executions that differ only in literals or
+    IN-list length share a fingerprint."""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _POSITIONAL_PARAM.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PARAM_LIST.sub("(?+)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+@dataclass
+class QueryStat:
+    count: int = 0
+    total_time: float = 0.0
+    rows: int = 0
+
+
+@dataclass
+class RequestQueryProfile:
+    route: str
+    queries: dict[str, QueryStat] = field(default_factory=dict)
+    total_time: float = 0.0
+    slowest: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(stat.count for stat in self.queries.values())
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> dict[str, QueryStat]:
+        return {fp: stat for fp, stat in self.queries.items() if stat.count >= threshold}
+
+    def summary(self) -> str:
+        return (
+            f"queries={self.count};total_ms={self.total_time * 1000:.2f};"
+            f"slowest_ms={self.slowest * 1000:.2f};repeated={len(self.repeated())}"
+        )
+
+
+current_profile: ContextVar[RequestQueryProfile | None] = ContextVar("current_profile", default=None)
+_request_scope: ContextVar[dict | None] = ContextVar("request_scope", default=None)
+
+
+def _calling_route() -> str:
+    scope = _request_scope.get()
+    if scope is None:
+        return "-"
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+
+
+def _rows_returned(cursor) -> int | None:
+    # SELECT rowcount is -1 on most drivers; the async adapters buffer the
+    # result set, which gives us the count without consuming it
+    if cursor.rowcount is not None and cursor.rowcount >= 0:
+        return cursor.rowcount
+    buffered = getattr(cursor, "_rows", None)
+    return len(buffered) if buffered is not None else None
+
+
+def record_query(cursor, statement: str, duration: float) -> None:
+    fp = fingerprint(statement)
+    rows = _rows_returned(cursor)
+
+    if duration >= SLOW_QUERY_THRESHOLD:
+        slow_query_logger.warning(
+            "Slow query %.1f ms rows=%s route=%s: %s",
+            duration * 1000, rows, _calling_route(), fp,
+        )
+
+    profile = current_profile.get()
+    if profile is None:
+        return
+    stat = profile.queries.get(fp)
+    if stat is None:
+        stat = profile.queries[fp] = QueryStat()
+    stat.count += 1
+    stat.total_time += duration
+    stat.rows += rows or 0
+    profile.total_time += duration
+    profile.slowest = max(profile.slowest, duration)
+
+
+class QueryProfilerMiddleware:
+    """Collects the queries each request runs and warns about N+1 patterns.
+
+    With `expose_header` on (debug mode) the per-request summary is returned
+    in an X-Query-Summary response header.
+    """
+
+    def __init__(self, app, expose_header: bool = False):
+        self.app = app
+        self.expose_header = expose_header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not SQL_PROFILER_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestQueryProfile(route=scope["path"])
+        profile_token = current_profile.set(profile)
+        scope_token = _request_scope.set(scope)
+
+        async def send_with_summary(message):
+            if message["type"] == "http.response.start" and self.expose_header:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-query-summary", profile.summary().encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_summary)
+        finally:
+            route = _calling_route()
+            for fp, stat in profile.repeated().items():
+                logger.warning(
+                    "Possible N+1: %d executions (%.1f ms) in %s: %s",
+                    stat.count, stat.total_time * 1000, route, fp,
+                )
+            current_profile.reset(profile_token)
+            _request_scope.reset(scope_token)
@@ -0,0 +1,54 @@
+"""Environment helpers shared by the services' config modules and launchers."""
+import os
+
+import uvicorn
+
+# Smallest pool a worker gets: one steady connection plus one for overflow
+MIN_CONNECTIONS_PER_WORKER = 2
+
+
+def env_flag(name: str, default: str = "False") -> bool:
+    return os.getenv(name, default).lower() in ("true", "1", "t")
+
+
+def default_workers(max_connections: int) -> int:
+    """One worker per CPU, but no more than max_connections can give a minimum pool each."""
+    return max(1, min(os.cpu_count() or 1, max_connections // MIN_CONNECTIONS_PER_WORKER))
+
+
+def split_connections(max_connections: int, workers: int) -> tuple[int, int]:
+    """Split one worker's share of max_connections into (pool_size, max_overflow).
+
+    Raises RuntimeError rather than handing out more connections than the
+    budget when there are too many workers to share it.
+    """
+    per_worker = max_connections // workers
+    if per_worker < MIN_CONNECTIONS_PER_WORKER:
+        raise RuntimeError(
+            f"DB_MAX_CONNECTIONS={max_connections} can't give {workers} workers "
+            f"{MIN_CONNECTIONS_PER_WORKER} connections each; lower WEB_CONCURRENCY or raise DB_MAX_CONNECTIONS"
+        )
+    pool_size = max(1, per_worker * 2 // 3)
+    return pool_size, per_worker - pool_size
+
+
+def serve(app: str, default_port: int, max_connections: int) -> None:
+    """Run `app` (an import path like "auth_svc.main:app") under uvicorn workers.
+
+    WEB_CONCURRENCY sets the worker count (default: one per CPU, capped so
+    each worker gets at least two of max_connections) and is exported to the
+    workers, which split the budget between their pools. The caller imports
+    its config module first so .env is loaded before the getenv calls here.
+    """
+    workers = int(os.getenv("WEB_CONCURRENCY") or default_workers(max_connections))
+    # Fail here, not once per worker, when an explicit count can't fit the budget
+    split_connections(max_connections, workers)
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+
+    uvicorn.run(
+        app,
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", default_port)),
+        workers=workers,
+        log_level=os.getenv("LOG_LEVEL", "info"),
+    )
@@ -0,0 +1,223 @@
+"""Request IDs, latency histograms, /metrics rendering and optional tracing.
+
+One copy for every service; each passes its own name to setup_tracing().
+
+The histograms live in process memory, so under several uvicorn workers
+/metrics reports only the worker that answered the scrape. Run one worker
+per scrape target (WEB_CONCURRENCY=1) when the numbers have to be complete.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+REQUEST_ID_HEADER = "X-Request-ID"
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram, one series per label tuple."""
+
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...], buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [per-bucket counts (+Inf last), sum, count]
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(s[0]), s[1], s[2]) for labels, s in self._series.items()]
+        for labels, counts, total, count in snapshot:
+            base = ",".join(f'{k}="{v}"' for k, v in zip(self.label_names, labels))
+            sep = "," if base else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {total}")
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests",
+    ("method", "route", "status"),
+)
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds",
+    "Time spent in individual request stages",
+    ("stage",),
+)
+
+
+def render_metrics() -> str:
+    return "\n".join(REQUEST_SECONDS.render() + STAGE_SECONDS.render()) + "\n"
+
+
+_tracer = None
+
+
+def setup_tracing(service_name: str) -> None:
+    """Export spans to an OTLP collector when OTEL_EXPORTER_OTLP_ENDPOINT is set
+    and the OpenTelemetry SDK is installed."""
+    global _tracer
+    if not OTEL_EXPORTER_OTLP_ENDPOINT or _tracer is not None:
+        return
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("OTEL_EXPORTER_OTLP_ENDPOINT is set but opentelemetry-sdk is not installed")
+        return
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(
+        BatchSpanProcessor(OTLPSpanExporter(endpoint=f"{OTEL_EXPORTER_OTLP_ENDPOINT}/v1/traces"))
+    )
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer(service_name)
+
+
+def inject_trace_headers(headers: dict) -> dict:
+    request_id = request_id_var.get()
+    if request_id:
+        headers[REQUEST_ID_HEADER] = request_id
+    if _tracer is not None:
+        from opentelemetry.propagate import inject
+
+        inject(headers)
+    return headers
+
+
+@contextmanager
+def stage_timer(stage: str):
+    span = _tracer.start_as_current_span(stage) if _tracer is not None else None
+    if span is not None:
+        span.__enter__()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage)
+        if span is not None:
+            span.__exit__(None, None, None)
+
+
+def instrument_engine(engine) -> None:
+    """Time every query once, for the db_query stage and the SQL profiler.
+
+    Works for both sync engines and AsyncEngine.sync_engine.
+    """
+    # Imported here so the gateway, which has no database, doesn't load SQLAlchemy
+    from sqlalchemy import event
+
+    from .profiler import SQL_PROFILER_ENABLED, record_query
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        context._query_started_at = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - context._query_started_at
+        STAGE_SECONDS.observe(duration, "db_query")
+        if SQL_PROFILER_ENABLED:
+            record_query(cursor, statement, duration)
+
+
+class TimedJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        with stage_timer("serialization"):
+            return super().render(content)
+
+
+class TelemetryMiddleware:
+    """Assigns each request an ID (reusing the caller's X-Request-ID), echoes
+    it on the response and records request latency."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:128]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        status_code = 500
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-request-id", request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        span = None
+        if _tracer is not None:
+            from opentelemetry.propagate import extract
+
+            headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+            span = _tracer.start_as_current_span(
+                f"{scope['method']} {scope['path']}",
+                context=extract(headers),
+                attributes={"http.request_id": request_id},
+            )
+            span.__enter__()
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            route = scope.get("route")
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            )
+            if span is not None:
+                span.__exit__(None, None, None)
+            request_id_var.reset(token)
@@ -0,0 +1,66 @@
+"""Settings shared across the inventory service.
+
+Import this before anything that reads os.environ at import time: it loads
+.env exactly once for the whole process.
+"""
+import os
+
+from dotenv import load_dotenv
+
+from common.settings import env_flag, split_connections
+
+load_dotenv()
+
+DEBUG = env_flag("DEBUG")
+# Production applies migrations instead; set False to skip creating the
+# database and tables on startup
+AUTO_CREATE_SCHEMA = env_flag("AUTO_CREATE_SCHEMA", "True")
+
+# Worker processes serving this service (exported by the serve entry point)
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", 1)))
+# Connections the service may hold across all of its workers
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", 30))
+
+
+def pool_limits() -> tuple[int, int]:
+    """Split this worker's share of DB_MAX_CONNECTIONS into (pool_size, max_overflow)."""
+    return split_connections(DB_MAX_CONNECTIONS, WEB_CONCURRENCY)
+
+# How the service reaches Postgres: "direct" caches prepared statements per
+# connection; "pgbouncer" (transaction pooling) gives every statement a unique
+# name and caches nothing, since the next transaction may land on another
+# server connection; "pgbouncer-prepared" is for PgBouncer >= 1.21 with
+# max_prepared_statements set, which tracks prepared statements itself
+DB_POOLER_MODE = os.getenv("DB_POOLER_MODE", "direct")
+if DB_POOLER_MODE not in ("direct", "pgbouncer", "pgbouncer-prepared"):
+    raise RuntimeError("DB_POOLER_MODE must be direct, pgbouncer or pgbouncer-prepared")
+# Prepared statements kept per connection when caching is allowed
+STATEMENT_CACHE_SIZE = int(os.getenv("STATEMENT_CACHE_SIZE", 500))
+
+# Most IDs one batch lookup (GET /hotels/batch, /destinations/batch) accepts
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", 100))
+
+# Change feed (GET /changes): rows fetched per query while streaming. Change
+# IDs become visible in commit order (see database/change_log.py), so the
+# feed serves everything committed
+CHANGE_FEED_PAGE_SIZE = int(os.getenv("CHANGE_FEED_PAGE_SIZE", 1000))
+
+# Rows fetched per server-side cursor round-trip (and encoded per chunk) by
+# exports
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 5000))
+
+# Exchange rates (FxRate) are quoted against this currency. Each worker keeps
+# an in-memory snapshot and reloads it in the background this often
+FX_BASE_CURRENCY = os.getenv("FX_BASE_CURRENCY", "INR")
+FX_REFRESH_SECONDS = float(os.getenv("FX_REFRESH_SECONDS", 60.0))
+# Shared secret the rate feed presents in X-Internal-Token; PUT /fx/rates is
+# refused while it is unset
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+# Longest stay GET /hotels/{id}/quote prices
+QUOTE_MAX_NIGHTS = int(os.getenv("QUOTE_MAX_NIGHTS", 30))
+
+# Similar-destination index written by scripts/build_similar_index.py and
+# mapped by every worker; workers check for a newer build this often
+SIMILAR_INDEX_DIR = os.getenv("SIMILAR_INDEX_DIR", "similar_index")
+SIMILAR_INDEX_RELOAD_SECONDS = float(os.getenv("SIMILAR_INDEX_RELOAD_SECONDS", 30.0))
+SIMILAR_MAX_K = int(os.getenv("SIMILAR_MAX_K", 50))
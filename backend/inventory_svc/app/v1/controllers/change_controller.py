@@ -0,0 +1,55 @@
+import json
+from typing import AsyncIterator
+
+from sqlalchemy import select
+
+from ..config import CHANGE_FEED_PAGE_SIZE
+from ..database.db import AsyncSessionLocal
+from ..models.inventory_model import ChangeLog
+
+
+def _line(content: dict) -> bytes:
+    return json.dumps(content, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+async def stream_changes(since: int, limit: int, entities: list[str] | None = None) -> AsyncIterator[bytes]:
+    """NDJSON lines of the changes after cursor `since`, oldest first.
+
+    Ends with a checkpoint line carrying the cursor to resume from, which is
+    also returned when nothing new has been committed.
+    """
+    cursor = since
+    sent = 0
+    # Its own session: the response body is produced after the endpoint returns
+    async with AsyncSessionLocal() as db:
+        while sent < limit:
+            page_size = min(CHANGE_FEED_PAGE_SIZE, limit - sent)
+            query = (
+                select(ChangeLog)
+                .where(ChangeLog.change_id > cursor)
+                .order_by(ChangeLog.change_id)
+                .limit(page_size)
+            )
+            if entities:
+                query = query.where(ChangeLog.entity.in_(entities))
+            rows = (await db.execute(query)).scalars().all()
+            for row in rows:
+                yield _line(
+                    {
+                        "cursor": row.change_id,
+                        "entity": row.entity,
+                        "entity_id": str(row.entity_id),
+                        "operation": row.operation,
+                        "changed_at": row.changed_at.isoformat(),
+                        "data": row.data,
+                    }
+                )
+            sent += len(rows)
+            if rows:
+                cursor = rows[-1].change_id
+            # Rows stay loaded in the identity map otherwise
+            db.expunge_all()
+            if len(rows) < page_size:
+                yield _line({"checkpoint": cursor, "has_more": False})
+                return
+    yield _line({"checkpoint": cursor, "has_more": True})
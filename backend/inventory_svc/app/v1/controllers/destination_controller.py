@@ -1,7 +1,9 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
 from ..schemas import inventory_schema as schemas
 from ..models import inventory_model as models
+from ..utils.projection import column_loader
 
 async def create_destination(destination: schemas.DestinationCreate, db: AsyncSession):
     new_destination = models.Destination(
@@ -17,15 +19,26 @@ async def create_destination(destination: schemas.DestinationCreate, db: AsyncSe
     await db.refresh(new_destination)
     return new_destination
 
-async def get_destination(destination_id: str, db: AsyncSession):
-    result = await db.get(models.Destination, destination_id)
+def _destination_loaders(fields: list[str] | None) -> list:
+    return [] if fields is None else [column_loader(models.Destination, fields)]
+
+async def get_destination(destination_id: UUID, db: AsyncSession, fields: list[str] | None = None):
+    result = await db.get(models.Destination, destination_id, options=_destination_loaders(fields))
     return result
 
+async def get_destinations(destination_ids: list[UUID], db: AsyncSession, fields: list[str] | None = None):
+    result = await db.execute(
+        select(models.Destination)
+        .where(models.Destination.destination_id.in_(destination_ids))
+        .options(*_destination_loaders(fields))
+    )
+    return result.scalars().all()
+
 async def get_all_destinations(db: AsyncSession):
     result = await db.execute(select(models.Destination))
     return result.scalars().all()
 
-async def update_destination(destination_id: str, destination: schemas.DestinationCreate, db: AsyncSession):
+async def update_destination(destination_id: UUID, destination: schemas.DestinationCreate, db: AsyncSession):
     existing_destination = await db.get(models.Destination, destination_id)
     if not existing_destination:
         return None
@@ -37,7 +50,7 @@ async def update_destination(destination_id: str, destination: schemas.Destinati
     await db.refresh(existing_destination)
     return existing_destination
 
-async def delete_destination(destination_id: str, db: AsyncSession):
+async def delete_destination(destination_id: UUID, db: AsyncSession):
     existing_destination = await db.get(models.Destination, destination_id)
     if not existing_destination:
         return None
@@ -46,8 +59,8 @@ async def delete_destination(destination_id: str, db: AsyncSession):
     await db.commit()
     return True
 
-async def get_filtered_destinations(filters: dict, db: AsyncSession):
-    query = select(models.Destination)
+async def get_filtered_destinations(filters: dict, db: AsyncSession, fields: list[str] | None = None):
+    query = select(models.Destination).options(*_destination_loaders(fields))
     for field, value in filters.items():
         column = getattr(models.Destination, field)
         # Use case-insensitive comparison for string values
@@ -0,0 +1,69 @@
+from typing import AsyncIterator
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..config import EXPORT_BATCH_SIZE
+from ..models.inventory_model import Destination, Hotel, Room, RoomAvailability, RoomRate
+from ..utils.export_formats import ENCODERS, Encoder
+
+EXPORT_TABLES = {
+    "destinations": Destination,
+    "hotels": Hotel,
+    "rooms": Room,
+    "rates": RoomRate,
+    "availability": RoomAvailability,
+}
+
+
+def export_query(table: str, destination_id: UUID | None = None):
+    model = EXPORT_TABLES[table]
+    query = select(model.__table__)
+    if destination_id is None:
+        return query
+
+    hotel_ids = select(Hotel.hotel_id).where(Hotel.destination_id == destination_id)
+    if model is Destination:
+        return query.where(Destination.destination_id == destination_id)
+    if model is Hotel:
+        return query.where(Hotel.destination_id == destination_id)
+    if model is Room or model is RoomRate:
+        return query.where(model.hotel_id.in_(hotel_ids))
+    room_ids = select(Room.room_id).where(Room.hotel_id.in_(hotel_ids))
+    return query.where(RoomAvailability.room_id.in_(room_ids))
+
+
+def create_encoder(table: str, format: str) -> Encoder:
+    # Raises RuntimeError up front when the format's library is missing
+    return ENCODERS[format](EXPORT_TABLES[table].__table__.columns)
+
+
+async def stream_export(
+    engine: AsyncEngine,
+    table: str,
+    encoder: Encoder,
+    destination_id: UUID | None = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """Encoded chunks of one table, read through a server-side cursor.
+
+    A single SELECT, so the export is one consistent snapshot however long it
+    takes to stream, and only one batch of rows is held at a time. The
+    gateway relays /api/v1/inventory/export/* the same way, chunk by chunk,
+    so the memory bound holds through it too.
+    """
+    header = encoder.begin()
+    if header:
+        yield header
+    async with engine.connect() as conn:
+        result = await conn.stream(
+            export_query(table, destination_id).execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            chunk = encoder.encode(rows)
+            if chunk:
+                yield chunk
+    footer = encoder.finish()
+    if footer:
+        yield footer
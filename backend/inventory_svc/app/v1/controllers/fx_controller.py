@@ -0,0 +1,16 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.inventory_model import FxRate
+
+async def upsert_rates(rates: dict[str, float], db: AsyncSession):
+    # A handful of currencies at a time, so a read-modify-write is fine
+    existing = {
+        fx_rate.currency: fx_rate
+        for fx_rate in (await db.execute(select(FxRate).where(FxRate.currency.in_(rates)))).scalars()
+    }
+    for currency, rate in rates.items():
+        if currency in existing:
+            existing[currency].rate = rate
+        else:
+            db.add(FxRate(currency=currency, rate=rate))
+    await db.commit()
@@ -1,8 +1,11 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from uuid import UUID
+from datetime import date, datetime, time
+from sqlalchemy.orm import joinedload, selectinload
 from ..schemas import hotel_schema as schemas
-from ..models.inventory_model import Hotel, Destination
+from ..models.inventory_model import Hotel, Destination, RoomRate
+from ..utils.projection import column_loader
 
 async def create_hotel(hotel: schemas.HotelCreate, db: AsyncSession):
     new_hotel = Hotel(
@@ -10,6 +13,7 @@ async def create_hotel(hotel: schemas.HotelCreate, db: AsyncSession):
         destination_id = hotel.destination_id,
         address = hotel.address,
         price_per_night = hotel.price_per_night,
+        currency = hotel.currency,
         latitude = hotel.latitude,
         longitude = hotel.longitude
     )
@@ -18,8 +22,37 @@ async def create_hotel(hotel: schemas.HotelCreate, db: AsyncSession):
     await db.refresh(new_hotel)
     return new_hotel
 
-async def get_hotel(hotel_id: str, db: AsyncSession):
+def _hotel_loaders(fields: list[str] | None, destination_loader) -> list:
+    # The destination is only fetched when it's part of the response
+    if fields is None:
+        return [destination_loader(Hotel.destination)]
+    loaders = [column_loader(Hotel, fields)]
+    if "destination" in fields:
+        loaders.append(destination_loader(Hotel.destination))
+    return loaders
+
+async def get_hotel(hotel_id: UUID, db: AsyncSession, fields: list[str] | None = None):
     # Eager load the destination relationship to avoid lazy loading issues
-    query = select(Hotel).where(Hotel.hotel_id == hotel_id).options(selectinload(Hotel.destination))
+    query = select(Hotel).where(Hotel.hotel_id == hotel_id).options(*_hotel_loaders(fields, selectinload))
+    result = await db.execute(query)
+    return result.scalar_one_or_none()
+
+async def get_hotels(hotel_ids: list[UUID], db: AsyncSession, fields: list[str] | None = None):
+    # Many-to-one, so joining the destination keeps it to a single query
+    query = select(Hotel).where(Hotel.hotel_id.in_(hotel_ids)).options(*_hotel_loaders(fields, joinedload))
+    result = await db.execute(query)
+    return result.scalars().all()
+
+async def get_room_rates(hotel_id: UUID, check_in: date, check_out: date, db: AsyncSession):
+    # One row per room and night, grouped by room for the quote's per-room sums
+    query = (
+        select(RoomRate.room_id, RoomRate.base_price, RoomRate.currency, RoomRate.refundable)
+        .where(
+            RoomRate.hotel_id == hotel_id,
+            RoomRate.date >= datetime.combine(check_in, time.min),
+            RoomRate.date < datetime.combine(check_out, time.min),
+        )
+        .order_by(RoomRate.room_id, RoomRate.date)
+    )
     result = await db.execute(query)
-    return result.scalar_one_or_none()
\ No newline at end of file
+    return result.all()
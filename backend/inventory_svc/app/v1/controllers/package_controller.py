@@ -0,0 +1,73 @@
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+from sqlalchemy.orm import selectinload
+from ..schemas import package_schema as schemas
+from ..models.inventory_model import Destination, PackageItineraryItem, TourPackage
+
+async def create_package(package: schemas.PackageCreate, db: AsyncSession):
+    # None for an unknown destination, rather than a foreign key error at commit
+    if await db.get(Destination, package.destination_id) is None:
+        return None
+    new_package = TourPackage(
+        destination_id = package.destination_id,
+        name = package.name,
+        description = package.description,
+        price = package.price,
+        currency = package.currency,
+        duration_days = package.duration_days,
+        theme = package.theme,
+        itinerary_items = [
+            PackageItineraryItem(day_number=item.day_number, title=item.title, description=item.description)
+            for item in sorted(package.itinerary, key=lambda item: item.day_number)
+        ],
+    )
+    db.add(new_package)
+    await db.commit()
+    return new_package
+
+async def get_package(package_id: UUID, db: AsyncSession):
+    # The itinerary comes back in one extra query, already ordered by day
+    query = (
+        select(TourPackage)
+        .where(TourPackage.package_id == package_id)
+        .options(selectinload(TourPackage.itinerary_items))
+    )
+    result = await db.execute(query)
+    return result.scalar_one_or_none()
+
+async def search_packages(
+    db: AsyncSession,
+    limit: int,
+    destination_id: UUID | None = None,
+    theme: str | None = None,
+    min_price: float | None = None,
+    max_price: float | None = None,
+    min_days: int | None = None,
+    max_days: int | None = None,
+    after: tuple[float, UUID] | None = None,
+):
+    """One page of packages, cheapest first, starting after the keyset `after`.
+
+    Returns up to limit + 1 rows so the caller can tell whether another page
+    follows. Itineraries for the whole page arrive in a single IN query.
+    """
+    query = select(TourPackage).options(selectinload(TourPackage.itinerary_items))
+    if destination_id is not None:
+        query = query.where(TourPackage.destination_id == destination_id)
+    if theme is not None:
+        query = query.where(TourPackage.theme == theme)
+    if min_price is not None:
+        query = query.where(TourPackage.price >= min_price)
+    if max_price is not None:
+        query = query.where(TourPackage.price <= max_price)
+    if min_days is not None:
+        query = query.where(TourPackage.duration_days >= min_days)
+    if max_days is not None:
+        query = query.where(TourPackage.duration_days <= max_days)
+    if after is not None:
+        query = query.where(tuple_(TourPackage.price, TourPackage.package_id) > after)
+
+    query = query.order_by(TourPackage.price, TourPackage.package_id).limit(limit + 1)
+    result = await db.execute(query)
+    return result.scalars().all()
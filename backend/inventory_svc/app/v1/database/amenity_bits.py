@@ -0,0 +1,60 @@
+"""Keeps Amenity.bit_index and Hotel.amenity_bits in step with hotel_amenity.
+
+Runs before every ORM flush of the service's sessions: new amenities get the
+next free bit (on Postgres under an advisory lock held to commit, so two
+transactions can't both take max + 1), and hotels whose amenities changed - through hotel.amenities
+or amenity.hotels - get their bitset recomputed, which also bumps updated_at
+so the search index re-reads them. A deleted amenity leaves its bit set on
+its hotels; bits are never reused and searches only accept live amenities,
+so it matches nothing.
+
+Anything that writes hotel_amenity without the ORM relationships (bulk Core
+inserts, raw SQL) must set amenity_bits and updated_at itself, as the data
+generator does, or the search index won't see the change.
+"""
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from ..models.inventory_model import Amenity, Hotel
+from ..utils.amenity_index import encode_amenity_bits
+from .change_log import InventorySession
+
+# Any fixed key will do; transactions adding amenities take turns on it
+BIT_INDEX_LOCK_KEY = 0x616D_656E_6974
+
+
+def _changed_collection(obj, key: str):
+    state = inspect(obj)
+    # Only a loaded, modified collection can have changed
+    if key in state.dict:
+        return state.attrs[key].history
+    return None
+
+
+@event.listens_for(InventorySession, "before_flush")
+def maintain_amenity_bits(session: Session, flush_context, instances) -> None:
+    new_amenities = [obj for obj in session.new if isinstance(obj, Amenity) and obj.bit_index is None]
+    if new_amenities:
+        if session.get_bind().dialect.name == "postgresql":
+            # Held until commit, so the next transaction's max sees these bits
+            session.execute(select(func.pg_advisory_xact_lock(BIT_INDEX_LOCK_KEY)))
+        next_bit = session.execute(select(func.coalesce(func.max(Amenity.bit_index), -1))).scalar_one() + 1
+        for amenity in new_amenities:
+            amenity.bit_index = next_bit
+            next_bit += 1
+
+    hotels = set()
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Hotel):
+            history = _changed_collection(obj, "amenities")
+            if history is not None and history.has_changes():
+                hotels.add(obj)
+        elif isinstance(obj, Amenity):
+            # The backref has queued the change on each hotel's collection
+            history = _changed_collection(obj, "hotels")
+            if history is not None:
+                hotels.update(history.added)
+                hotels.update(history.deleted)
+
+    for hotel in hotels - set(session.deleted):
+        hotel.amenity_bits = encode_amenity_bits(amenity.bit_index for amenity in hotel.amenities)
@@ -0,0 +1,79 @@
+"""Records inserts, updates and deletes of mirrored entities in ChangeLog.
+
+Hooked into every ORM flush of the service's sessions, so a change and its
+log row commit or roll back together. Bulk Core writes (the data generator,
+seeding) bypass the ORM and are not recorded.
+
+change_id must become visible in order, or a feed reader could pass a
+cursor before a lower ID commits and never see it. So a transaction takes a
+lock before its first log row and holds it until commit: on Postgres a
+transaction-scoped advisory lock, on SQLite the database write lock it
+already holds. Writers that record changes therefore commit one at a time.
+"""
+from datetime import date, datetime
+from uuid import UUID
+
+from sqlalchemy import event, func, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from ..models.inventory_model import ChangeLog, Destination, Hotel, Room, RoomAvailability, RoomRate
+
+TRACKED_MODELS = (Destination, Hotel, Room, RoomRate, RoomAvailability)
+# pg_advisory_xact_lock key serializing change-log writers
+CHANGE_LOG_LOCK_ID = 0x6368616E6765  # "change"
+
+
+class InventorySession(Session):
+    """Sync session behind the service's AsyncSessions; carries the change-log hook."""
+
+
+def _json_value(value):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+
+def _change(obj, operation: str, changed_at: datetime) -> dict:
+    state = inspect(obj)
+    mapper = state.mapper
+    data = None
+    if operation != "delete":
+        # Only what's already in memory: the flush has just written these
+        data = {
+            attr.key: _json_value(state.dict[attr.key])
+            for attr in mapper.column_attrs
+            if attr.key in state.dict
+        }
+    return {
+        "entity": mapper.local_table.name,
+        "entity_id": mapper.primary_key_from_instance(obj)[0],
+        "operation": operation,
+        "data": data,
+        "changed_at": changed_at,
+    }
+
+
+@event.listens_for(InventorySession, "after_flush")
+def record_changes(session: Session, flush_context) -> None:
+    changed_at = datetime.utcnow()
+    changes = [
+        _change(obj, operation, changed_at)
+        for objects, operation in (
+            (session.new, "insert"),
+            (session.dirty, "update"),
+            (session.deleted, "delete"),
+        )
+        for obj in objects
+        if isinstance(obj, TRACKED_MODELS)
+        and (operation != "update" or session.is_modified(obj, include_collections=False))
+    ]
+    if changes:
+        connection = session.connection()
+        if connection.dialect.name == "postgresql":
+            # Released at commit; re-taking it on a later flush is a no-op
+            connection.execute(select(func.pg_advisory_xact_lock(CHANGE_LOG_LOCK_ID)))
+        connection.execute(insert(ChangeLog.__table__), changes)
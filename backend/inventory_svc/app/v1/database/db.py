@@ -1,24 +1,33 @@
 from typing import AsyncGenerator
 from pathlib import Path
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from dotenv import load_dotenv
+import logging
 import os
-import asyncpg
 from urllib.parse import urlparse
+from uuid import uuid4
+from sqlalchemy.pool import NullPool
+from ..config import AUTO_CREATE_SCHEMA, DB_POOLER_MODE, STATEMENT_CACHE_SIZE, pool_limits
 from ..models.inventory_model import Base
+from common.telemetry import instrument_engine
+from .change_log import InventorySession
+from . import amenity_bits  # noqa: F401  (registers the flush hook)
+from .migrations import upgrade
 
-# Load environment variables from .env file
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 BASE_DIR = Path(__file__).resolve().parent
 
 DATABASE_CONN_STRING = os.getenv("AUTH_DATABASE_URL", f"sqlite+aiosqlite:///{BASE_DIR}/auth_db.db")
-DEBUG = os.getenv("DEBUG", "False").lower() in ("true", "1", "t")
+# Echo every statement only when asked; DEBUG alone gets the per-request
+# query summary from the profiler instead
+SQL_ECHO = os.getenv("SQL_ECHO", "False").lower() in ("true", "1", "t")
 
 async def ensure_database_exists() -> None:
     """Create the database if it doesn't exist (for PostgreSQL only)"""
     if not DATABASE_CONN_STRING.startswith("postgresql"):
         return
+    # Only needed for this one-off admin connection; the engine loads its own driver
+    import asyncpg
     
     # Parse the database URL
     parsed = urlparse(DATABASE_CONN_STRING.replace("postgresql+asyncpg://", "postgresql://"))
@@ -39,52 +48,81 @@ async def ensure_database_exists() -> None:
             if not exists:
                 # Create the database
                 await conn.execute(f'CREATE DATABASE "{database_name}"')
-                print(f"Database '{database_name}' created successfully")
+                logger.info("Database '%s' created successfully", database_name)
             else:
-                print(f"Database '{database_name}' already exists")
+                logger.info("Database '%s' already exists", database_name)
         finally:
             await conn.close()
     except Exception as e:
-        print(f"Error ensuring database exists: {e}")
+        logger.error("Error ensuring database exists: %s", e)
         raise
 
-# Ensure database exists before creating engine (for PostgreSQL)
-if DATABASE_CONN_STRING.startswith("postgresql"):
-    import asyncio
-    try:
-        asyncio.get_running_loop()
-    except RuntimeError:
-        # No event loop running, create one
-        asyncio.run(ensure_database_exists())
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4().hex}__"
+
+
+def asyncpg_connect_args(pooler_mode: str = DB_POOLER_MODE, cache_size: int = STATEMENT_CACHE_SIZE) -> dict:
+    """asyncpg connect arguments for the given DB_POOLER_MODE."""
+    connect_args = {
+        "server_settings": {"application_name": "inventory_service"},
+        "command_timeout": 60,
+    }
+    if pooler_mode == "pgbouncer":
+        # Statements can't outlive the transaction's server connection, so
+        # cache nothing and never reuse a name another client may hold
+        cache_size = 0
+    if pooler_mode != "direct":
+        connect_args["prepared_statement_name_func"] = _unique_statement_name
+    # asyncpg's own cache plus the dialect's cache of prepared statements
+    connect_args["statement_cache_size"] = cache_size
+    connect_args["prepared_statement_cache_size"] = cache_size
+    return connect_args
+
 
+def engine_options(database_url: str = DATABASE_CONN_STRING, pooler_mode: str = DB_POOLER_MODE) -> dict:
+    if not database_url.startswith("postgresql"):
+        pool_size, max_overflow = pool_limits()
+        return {"pool_size": pool_size, "max_overflow": max_overflow, "pool_timeout": 30}
+    options = {"connect_args": asyncpg_connect_args(pooler_mode)}
+    if pooler_mode == "pgbouncer":
+        # PgBouncer does the pooling; a local pool would only pin server
+        # connections and pile up statements that can't be reused
+        options["poolclass"] = NullPool
+    else:
+        pool_size, max_overflow = pool_limits()
+        options.update(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=30)
+    return options
+
+
+# Creating the engine doesn't connect; all database work waits for init_db
 engine = create_async_engine(
     DATABASE_CONN_STRING,
-    echo=DEBUG,
+    echo=SQL_ECHO,
     pool_pre_ping=True,
-    pool_size=20,
-    max_overflow=10,
     pool_recycle=3600,  # Recycle connections after 1 hour
-    pool_timeout=30,
-    connect_args={
-        "server_settings": {"application_name": "inventory_service"},
-        "command_timeout": 60,
-        "statement_cache_size": 0  # Disable prepared statement cache for asyncpg
-    } if DATABASE_CONN_STRING.startswith("postgresql") else {},
-    future=True
+    future=True,
+    **engine_options(),
 )
+instrument_engine(engine.sync_engine)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=InventorySession,
     expire_on_commit=False,
     autoflush=False
 )
 
 async def init_db() -> None:
-    # Ensure database exists (if not already done)
+    # With migrations in charge of the schema there is nothing to bootstrap
+    if not AUTO_CREATE_SCHEMA:
+        return
     await ensure_database_exists()
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    # create_all leaves existing tables alone
+    async with engine.begin() as conn:
+        await conn.run_sync(upgrade)
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
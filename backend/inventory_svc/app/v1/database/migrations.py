@@ -0,0 +1,91 @@
+"""Brings an existing inventory database up to the current models.
+
+Runs after create_all when AUTO_CREATE_SCHEMA is on. Deployments that manage
+the schema themselves run it once per release:
+
+    cd backend
+    python -m inventory_svc.app.v1.database.migrations
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import bindparam, func, inspect, select, update
+from sqlalchemy.engine import Connection
+
+from common.migrations import add_missing_columns, create_missing_indexes, lock_upgrades
+
+from ..models.inventory_model import Amenity, Hotel, TourPackage, hotel_amenities
+from ..utils.amenity_index import encode_amenity_bits
+
+logger = logging.getLogger(__name__)
+
+
+def _backfill_amenity_bits(connection: Connection) -> None:
+    # Amenities from before bit_index existed (or inserted without the ORM)
+    # get the next free bits, and their hotels' bitsets are rebuilt
+    amenity, hotel = Amenity.__table__, Hotel.__table__
+    unassigned = connection.execute(
+        select(amenity.c.amenity_id)
+        .where(amenity.c.bit_index.is_(None))
+        .order_by(amenity.c.created_at, amenity.c.amenity_id)
+    ).scalars().all()
+    if not unassigned:
+        return
+
+    next_bit = connection.execute(select(func.coalesce(func.max(amenity.c.bit_index), -1))).scalar_one() + 1
+    connection.execute(
+        update(amenity).where(amenity.c.amenity_id == bindparam("b_amenity_id")).values(bit_index=bindparam("b_bit")),
+        [{"b_amenity_id": amenity_id, "b_bit": next_bit + i} for i, amenity_id in enumerate(unassigned)],
+    )
+
+    affected = select(hotel_amenities.c.hotel_id).where(hotel_amenities.c.amenity_id.in_(unassigned))
+    rows = connection.execute(
+        select(hotel_amenities.c.hotel_id, amenity.c.bit_index)
+        .join(amenity, amenity.c.amenity_id == hotel_amenities.c.amenity_id)
+        .where(hotel_amenities.c.hotel_id.in_(affected))
+    )
+    bits = defaultdict(list)
+    for hotel_id, bit_index in rows:
+        bits[hotel_id].append(bit_index)
+    if bits:
+        # A new updated_at makes the running search indexes re-read them
+        now = datetime.utcnow()
+        connection.execute(
+            update(hotel)
+            .where(hotel.c.hotel_id == bindparam("b_hotel_id"))
+            .values(amenity_bits=bindparam("b_bits"), updated_at=now),
+            [{"b_hotel_id": hotel_id, "b_bits": encode_amenity_bits(indexes)} for hotel_id, indexes in bits.items()],
+        )
+    logger.info("Assigned bits to %d amenities and rebuilt %d hotels' amenity bits", len(unassigned), len(bits))
+
+
+def upgrade(connection: Connection) -> None:
+    lock_upgrades(connection)
+    amenity, hotel = Amenity.__table__, Hotel.__table__
+
+    # Amenity search (bitsets kept by database/amenity_bits.py)
+    add_missing_columns(connection, hotel, "amenity_bits")
+    if add_missing_columns(connection, amenity, "bit_index"):
+        # create_all names the column's unique constraint the same way
+        connection.exec_driver_sql("CREATE UNIQUE INDEX amenity_bit_index_key ON amenity (bit_index)")
+    create_missing_indexes(connection, hotel)
+    if inspect(connection).has_table(amenity.name):
+        _backfill_amenity_bits(connection)
+
+    # Prices quoted in other currencies; existing rows were all in INR
+    add_missing_columns(connection, hotel, "currency")
+    add_missing_columns(connection, TourPackage.__table__, "currency")
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    from .db import engine
+
+    async def main() -> None:
+        async with engine.begin() as connection:
+            await connection.run_sync(upgrade)
+        await engine.dispose()
+
+    asyncio.run(main())
@@ -1,13 +1,30 @@
+import asyncio
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
-from .routes import inventory_routes, hotel_routes
-from .database.db import init_db, dispose_engine
+from .config import DEBUG
+from .routes import inventory_routes, hotel_routes, change_routes, export_routes, fx_routes, package_routes
+from .database.db import AsyncSessionLocal, init_db, dispose_engine
+from .utils.amenity_index import amenity_index
+from .utils.destination_vectors import similar_destinations
+from .utils.fx import fx_rates
+from common.profiler import QueryProfilerMiddleware
+from common.telemetry import TelemetryMiddleware, TimedJSONResponse, render_metrics, setup_tracing
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Initialize database tables once
+    setup_tracing("inventory_service")
+    # Startup: Create the database and tables unless AUTO_CREATE_SCHEMA is off
     await init_db()
+    # Vectors are mapped, not read, so this stays cheap as the index grows
+    similar_destinations.load()
+    refresh_amenity_index = asyncio.create_task(amenity_index.run(AsyncSessionLocal))
+    refresh_fx_rates = asyncio.create_task(fx_rates.run(AsyncSessionLocal))
+    reload_similar_destinations = asyncio.create_task(similar_destinations.run())
     yield
+    refresh_amenity_index.cancel()
+    refresh_fx_rates.cancel()
+    reload_similar_destinations.cancel()
     # Shutdown: Dispose of the engine
     await dispose_engine()
 
@@ -17,12 +34,24 @@ app = FastAPI(
     version="0.1.0",
     contact={"name": "Vikas Bhapri", "email": "vikasbhapri@gmail.com"},
     root_path="/api/v1/inventory",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse
 )
 
+app.add_middleware(QueryProfilerMiddleware, expose_header=DEBUG)
+app.add_middleware(TelemetryMiddleware)
+
 app.include_router(inventory_routes.router)
 app.include_router(hotel_routes.router)
+app.include_router(package_routes.router)
+app.include_router(change_routes.router)
+app.include_router(export_routes.router)
+app.include_router(fx_routes.router)
 
 @app.get("/")
 async def hello_world():
-    return {"message": "Welcome to the Travel Guru Inventory Service!"}
\ No newline at end of file
+    return {"message": "Welcome to the Travel Guru Inventory Service!"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return render_metrics()
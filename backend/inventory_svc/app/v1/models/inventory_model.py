@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, Float, ForeignKey, Text, DateTime, UniqueConstraint, JSON, Table, Column
+from sqlalchemy import BigInteger, Integer, String, Float, ForeignKey, Text, DateTime, UniqueConstraint, JSON, Table, Column, Index, LargeBinary
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -39,12 +39,22 @@ class Hotel(Base):
     longitude: Mapped[float] = mapped_column()
     created_at: Mapped[str] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[str] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Little-endian bitset of the hotel's amenities' bit_index values, kept in
+    # step with hotel_amenity on flush (database/amenity_bits.py)
+    amenity_bits: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    # ISO 4217 code price_per_night is quoted in
+    currency: Mapped[str] = mapped_column(String(3), nullable=False, default='INR')
 
     destination = relationship("Destination", back_populates="hotels")
     rooms = relationship("Room", back_populates="hotel", cascade="all, delete-orphan")
     amenities = relationship("Amenity", secondary=hotel_amenities, back_populates="hotels")
     pricing_rules = relationship("PricingRule", back_populates="hotel", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # The amenity search index re-reads hotels by updated_at every few seconds
+        Index('ix_hotel_updated_at', 'updated_at'),
+    )
+
 class Room(Base):
     room_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     hotel_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('hotel.hotel_id'), nullable=False)
@@ -67,6 +77,8 @@ class Amenity(Base):
     icon_url: Mapped[str] = mapped_column()
     created_at: Mapped[str] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[str] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Position of this amenity in Hotel.amenity_bits; assigned once, never reused
+    bit_index: Mapped[int | None] = mapped_column(Integer, nullable=True, unique=True)
 
     hotels = relationship("Hotel", secondary=hotel_amenities, back_populates="amenities")
 
@@ -91,9 +103,22 @@ class TourPackage(Base):
     theme: Mapped[str] = mapped_column()
     created_at: Mapped[str] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[str] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    currency: Mapped[str] = mapped_column(String(3), nullable=False, default='INR')
 
     destination = relationship("Destination", back_populates="packages")
-    itinerary_items = relationship("PackageItineraryItem", back_populates="package", cascade="all, delete-orphan")
+    itinerary_items = relationship(
+        "PackageItineraryItem",
+        back_populates="package",
+        cascade="all, delete-orphan",
+        order_by="PackageItineraryItem.day_number",
+    )
+
+    # Search pages through packages cheapest first, keyed on (price, package_id)
+    __table_args__ = (
+        Index('ix_tourpackage_destination_price', 'destination_id', 'price', 'package_id'),
+        Index('ix_tourpackage_theme_price', 'theme', 'price', 'package_id'),
+        Index('ix_tourpackage_price', 'price', 'package_id'),
+    )
 
 class PackageItineraryItem(Base):
     item_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -105,6 +130,10 @@ class PackageItineraryItem(Base):
 
     package = relationship("TourPackage", back_populates="itinerary_items")
 
+    __table_args__ = (
+        Index('ix_packageitineraryitem_package_day', 'package_id', 'day_number'),
+    )
+
 class RoomAvailability(Base):
     availability_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     room_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('room.room_id'), nullable=False)
@@ -137,6 +166,8 @@ class RoomRate(Base):
 
     __table_args__ = (
         UniqueConstraint('room_id', 'date', name='uq_room_rate_date'),
+        # Quotes read every room's rates of one hotel over a date range
+        Index('ix_roomrate_hotel_date', 'hotel_id', 'date'),
     )
 
 class PricingRule(Base):
@@ -159,3 +190,26 @@ class Media(Base):
     url: Mapped[str] = mapped_column(nullable=False)
     caption: Mapped[str] = mapped_column()
     created_at: Mapped[str] = mapped_column(DateTime, default=datetime.utcnow)
+
+class ChangeLog(Base):
+    # Append-only; written in the same transaction as the change it records
+    # (see database/change_log.py) and read back in change_id order by /changes
+    change_id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    entity: Mapped[str] = mapped_column(String(64), nullable=False)
+    entity_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    operation: Mapped[str] = mapped_column(String(8), nullable=False)
+    data: Mapped[dict] = mapped_column(JSON(none_as_null=True), nullable=True)
+    changed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_changelog_entity_change_id', 'entity', 'change_id'),
+    )
+
+class FxRate(Base):
+    # Units of `currency` one unit of FX_BASE_CURRENCY buys; loaded into each
+    # worker's snapshot by utils/fx.py rather than joined into queries
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+    rate: Mapped[float] = mapped_column(nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from ..controllers import change_controller as change_ctrl
+from ..database.change_log import TRACKED_MODELS
+
+router = APIRouter(
+    prefix="/changes",
+    tags=["Changes"]
+)
+
+CHANGE_ENTITIES = [model.__tablename__ for model in TRACKED_MODELS]
+
+@router.get("/")
+async def get_changes(
+    since: int = Query(0, ge=0, description="Cursor from a previous change or checkpoint line; 0 replays everything"),
+    limit: int = Query(10_000, ge=1, le=100_000),
+    entity: list[str] | None = Query(None, description=f"Only these entities: {', '.join(CHANGE_ENTITIES)}"),
+):
+    unknown = sorted(set(entity or ()) - set(CHANGE_ENTITIES))
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown entities: {', '.join(unknown)}")
+    # NDJSON, one change per line, then {"checkpoint": <cursor>, "has_more": ...};
+    # resume with ?since=<checkpoint>. Never cached: the feed moves constantly
+    return StreamingResponse(
+        change_ctrl.stream_changes(since, limit, entity),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-store"},
+    )
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from uuid import UUID
+from ..controllers import export_controller as export_ctrl
+from ..database.db import engine
+from ..utils.export_formats import ENCODERS
+
+router = APIRouter(
+    prefix="/export",
+    tags=["Export"]
+)
+
+@router.get("/{table}")
+async def export_table(
+    table: str,
+    format: str = Query("ndjson", description=f"One of: {', '.join(ENCODERS)}"),
+    destination_id: UUID | None = Query(None, description="Only rows belonging to this destination"),
+):
+    if table not in export_ctrl.EXPORT_TABLES:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown table: {table}")
+    if format not in ENCODERS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown format: {format}")
+    try:
+        encoder = export_ctrl.create_encoder(table, format)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return StreamingResponse(
+        export_ctrl.stream_export(engine, table, encoder, destination_id),
+        media_type=encoder.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{table}.{encoder.extension}"',
+            "Cache-Control": "no-store",
+        },
+    )
@@ -0,0 +1,52 @@
+import hmac
+import re
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import FX_BASE_CURRENCY, INTERNAL_API_TOKEN
+from ..schemas import fx_schema as schemas
+from ..schemas.inventory_schema import ResponseWrapper
+from ..database.db import get_async_session
+from ..controllers import fx_controller as fx_ctrl
+from ..utils.cache_events import publish_invalidation, set_cache_headers
+from ..utils.fx import fx_rates
+
+router = APIRouter(
+    prefix="/fx",
+    tags=["Exchange Rates"]
+)
+
+def _rates_view(snapshot) -> dict:
+    return {"base": FX_BASE_CURRENCY, "version": snapshot.version, "as_of": snapshot.as_of, "rates": snapshot.as_dict()}
+
+def require_internal_token(x_internal_token: str | None = Header(None)) -> None:
+    # Rates reprice every hotel and package, so only the rate feed sets them
+    if not INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Rate updates are not configured")
+    if not x_internal_token or not hmac.compare_digest(x_internal_token.encode(), INTERNAL_API_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+@router.get("/rates", status_code=status.HTTP_200_OK, response_model=ResponseWrapper[schemas.GetFxRates])
+async def get_rates(response: Response):
+    # Served from this worker's snapshot, not the table
+    snapshot = fx_rates.for_currency(FX_BASE_CURRENCY)
+    set_cache_headers(response, ["fx"])
+    return {"status": "success", "data": _rates_view(snapshot)}
+
+@router.put(
+    "/rates",
+    status_code=status.HTTP_200_OK,
+    response_model=ResponseWrapper[schemas.GetFxRates],
+    dependencies=[Depends(require_internal_token)],
+)
+async def update_rates(payload: schemas.FxRatesUpdate, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_session)):
+    rates = {currency.upper(): rate for currency, rate in payload.rates.items()}
+    invalid = sorted(c for c in rates if not re.fullmatch(r"[A-Z]{3}", c))
+    if invalid:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid rates: {', '.join(invalid)}")
+    if FX_BASE_CURRENCY in rates:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{FX_BASE_CURRENCY} is the base currency; its rate is always 1")
+    await fx_ctrl.upsert_rates(rates, db)
+    # This worker switches now; the others on their next refresh
+    snapshot = await fx_rates.refresh(db)
+    background_tasks.add_task(publish_invalidation, ["fx"])
+    return {"status": "success", "data": _rates_view(snapshot)}
@@ -1,23 +1,157 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+from datetime import date
+import numpy as np
+from ..config import FX_BASE_CURRENCY, QUOTE_MAX_NIGHTS
 from ..schemas import hotel_schema as schemas
-from ..schemas.inventory_schema import ResponseWrapper
+from ..schemas.inventory_schema import BatchResponseWrapper, GetDestination, ResponseWrapper
 from ..database.db import get_async_session
 from ..controllers import hotel_controller as hotel_ctrl
+from ..utils.amenity_index import amenity_index
+from ..utils.batch import batch_ids, in_request_order
+from ..utils.cache_events import publish_invalidation, set_cache_headers
+from ..utils.fx import CURRENCY_QUERY, fx_rates
+from ..utils.keyset import decode_cursor, encode_cursor
+from ..utils.projection import FIELDS_QUERY, parse_fields, project, projected_response
 
 router = APIRouter(
     prefix="/hotels",
     tags=["Hotels"]
 )
 
+# ?fields= may pick anything GetHotel returns; the IDs back the cache tags
+HOTEL_FIELDS = tuple(schemas.GetHotel.model_fields)
+HOTEL_REQUIRED_FIELDS = ("hotel_id", "destination_id")
+HOTEL_NESTED_FIELDS = {
+    "destination": lambda destination: GetDestination.model_validate(destination).model_dump(mode="json")
+    if destination is not None else None,
+}
+
+def _hotel_tags(hotel) -> list[str]:
+    # The embedded destination means destination changes must evict this too
+    return [f"hotel:{hotel.hotel_id}", f"destination:{hotel.destination_id}"]
+
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def create_hotel(hotel: schemas.HotelCreate, db: AsyncSession = Depends(get_async_session)):
+async def create_hotel(hotel: schemas.HotelCreate, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_session)):
     result = await hotel_ctrl.create_hotel(hotel, db)
+    background_tasks.add_task(publish_invalidation, ["hotels"])
     return {"status": "success", "data": result}
 
+# Declared before /{hotel_id} so "search" isn't parsed as an ID
+@router.get("/search", status_code=status.HTTP_200_OK, response_model=schemas.HotelSearchPage)
+async def search_hotels(
+    response: Response,
+    amenities: list[UUID] = Query([], description="Hotels must have all of these; repeat for each amenity"),
+    destination_id: UUID | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    currency: str | None = CURRENCY_QUERY,
+    db: AsyncSession = Depends(get_async_session)
+):
+    after = None
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        try:
+            after = UUID(last_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    # Matching runs on the in-memory bitset index; only the page is read from the database
+    amenity_index.ensure_loaded()
+    unknown = [str(a) for a in amenities if a not in amenity_index.amenity_bits]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown amenities: {', '.join(unknown)}")
+    ids, total = amenity_index.search(
+        [amenity_index.amenity_bits[a] for a in amenities], destination_id, after, limit + 1
+    )
+    page_ids = ids[:limit]
+    # Hotels deleted since the index last refreshed simply drop out here
+    found, _ = in_request_order(page_ids, await hotel_ctrl.get_hotels(page_ids, db), "hotel_id")
+    next_cursor = encode_cursor(page_ids[-1]) if len(ids) > limit else None
+    page = {"status": "success", "data": found, "total": total, "next_cursor": next_cursor}
+    if currency:
+        page["data"] = [schemas.GetPricedHotel.model_validate(hotel) for hotel in found]
+        page["display_currency"] = currency.upper()
+        page["fx_version"] = fx_rates.set_display_prices(page["data"], "price_per_night", currency.upper())
+    # "fx" is purged when rates change
+    set_cache_headers(response, ["hotels", "fx"] if currency else ["hotels"])
+    return page
+
+# Declared before /{hotel_id} so "batch" isn't parsed as an ID
+@router.get("/batch", status_code=status.HTTP_200_OK, response_model=BatchResponseWrapper[schemas.GetHotel])
+async def get_hotels(response: Response, ids: list[UUID] = Depends(batch_ids), fields: str | None = FIELDS_QUERY, db: AsyncSession = Depends(get_async_session)):
+    projection = parse_fields(fields, HOTEL_FIELDS, HOTEL_REQUIRED_FIELDS)
+    rows = await hotel_ctrl.get_hotels(ids, db, projection)
+    found, missing = in_request_order(ids, rows, "hotel_id")
+    tags = {tag for hotel in found for tag in _hotel_tags(hotel)}
+    if missing:
+        # A hotel created later under a missing ID must evict this response
+        tags.add("hotels")
+    if projection is not None:
+        return projected_response(
+            {
+                "status": "success",
+                "data": [project(hotel, projection, HOTEL_NESTED_FIELDS) for hotel in found],
+                "missing": [str(i) for i in missing],
+            },
+            sorted(tags),
+        )
+    set_cache_headers(response, sorted(tags))
+    return {"status": "success", "data": found, "missing": missing}
+
 @router.get("/{hotel_id}", status_code=status.HTTP_200_OK, response_model=ResponseWrapper[schemas.GetHotel])
-async def get_hotel(hotel_id: str, db: AsyncSession = Depends(get_async_session)):
-    result = await hotel_ctrl.get_hotel(hotel_id, db)
+async def get_hotel(hotel_id: UUID, response: Response, fields: str | None = FIELDS_QUERY, db: AsyncSession = Depends(get_async_session)):
+    projection = parse_fields(fields, HOTEL_FIELDS, HOTEL_REQUIRED_FIELDS)
+    result = await hotel_ctrl.get_hotel(hotel_id, db, projection)
     if not result:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hotel not found")
+    if projection is not None:
+        return projected_response(
+            {"status": "success", "data": project(result, projection, HOTEL_NESTED_FIELDS)},
+            _hotel_tags(result),
+        )
+    set_cache_headers(response, _hotel_tags(result))
     return {"status": "success", "data": result}
+
+@router.get("/{hotel_id}/quote", status_code=status.HTTP_200_OK, response_model=schemas.HotelQuote)
+async def quote_hotel(
+    hotel_id: UUID,
+    response: Response,
+    check_in: date,
+    check_out: date,
+    currency: str = Query(FX_BASE_CURRENCY, min_length=3, max_length=3),
+    db: AsyncSession = Depends(get_async_session)
+):
+    nights = (check_out - check_in).days
+    if not 1 <= nights <= QUOTE_MAX_NIGHTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"check_out must be 1 to {QUOTE_MAX_NIGHTS} nights after check_in",
+        )
+    currency = currency.upper()
+    snapshot = fx_rates.for_currency(currency)
+    rows = await hotel_ctrl.get_room_rates(hotel_id, check_in, check_out, db)
+
+    quotes = []
+    if rows:
+        # Every nightly rate converted in one pass, then summed per room
+        room_ids, prices, currencies, refundable = zip(*rows)
+        converted = snapshot.convert(prices, currencies, currency)
+        starts = [0] + [i for i in range(1, len(room_ids)) if room_ids[i] != room_ids[i - 1]]
+        counts = np.diff(starts + [len(room_ids)])
+        totals = np.add.reduceat(converted, starts)
+        all_refundable = np.logical_and.reduceat(np.array(refundable, dtype=bool), starts)
+        for start, count, total, is_refundable in zip(starts, counts.tolist(), totals.tolist(), all_refundable.tolist()):
+            # Rooms missing a night's rate, or priced in a currency without a rate, can't be quoted
+            if count == nights and not np.isnan(total):
+                quotes.append({
+                    "room_id": room_ids[start],
+                    "nights": nights,
+                    "total": round(total, 2),
+                    "nightly_average": round(total / nights, 2),
+                    "refundable": is_refundable,
+                })
+
+    set_cache_headers(response, [f"hotel:{hotel_id}", "fx"])
+    return {"status": "success", "data": quotes, "currency": currency, "fx_version": snapshot.version}
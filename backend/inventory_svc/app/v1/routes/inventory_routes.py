@@ -1,17 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
 from ..schemas import inventory_schema as schemas
 from ..database.db import get_async_session
 from ..controllers import destination_controller as dest_ctrl
+from ..utils.batch import batch_ids, in_request_order
+from ..utils.cache_events import publish_invalidation, set_cache_headers
+from ..utils.projection import FIELDS_QUERY, parse_fields, project, projected_response
+from ..utils.destination_vectors import featurize, similar_destinations
+from ..config import SIMILAR_MAX_K
+from ..models.inventory_model import Destination
 
 router = APIRouter(
     prefix="/destinations",
     tags=["Destinations"]
 )
 
+# Destinations are returned with every column, so ?fields= may pick any of them
+DESTINATION_FIELDS = tuple(Destination.__table__.columns.keys())
+DESTINATION_REQUIRED_FIELDS = ("destination_id",)
+
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def create_destination(destination: schemas.DestinationCreate, db: AsyncSession = Depends(get_async_session)):
+async def create_destination(destination: schemas.DestinationCreate, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_session)):
     result = await dest_ctrl.create_destination(destination, db)
+    background_tasks.add_task(publish_invalidation, ["destinations"])
     return {"status": "success", "data": result}
 
 # @router.get("/", status_code=status.HTTP_200_OK)
@@ -19,37 +31,106 @@ async def create_destination(destination: schemas.DestinationCreate, db: AsyncSe
 #     result = await dest_ctrl.get_all_destinations(db)
 #     return {"status": "success", "data": result}
 
+# Declared before /{destination_id} so "batch" isn't parsed as an ID
+@router.get("/batch", status_code=status.HTTP_200_OK)
+async def get_destinations(response: Response, ids: list[UUID] = Depends(batch_ids), fields: str | None = FIELDS_QUERY, db: AsyncSession = Depends(get_async_session)):
+    projection = parse_fields(fields, DESTINATION_FIELDS, DESTINATION_REQUIRED_FIELDS)
+    rows = await dest_ctrl.get_destinations(ids, db, projection)
+    found, missing = in_request_order(ids, rows, "destination_id")
+    tags = {f"destination:{destination.destination_id}" for destination in found}
+    if missing:
+        # A destination created later under a missing ID must evict this response
+        tags.add("destinations")
+    if projection is not None:
+        return projected_response(
+            {
+                "status": "success",
+                "data": [project(destination, projection) for destination in found],
+                "missing": [str(i) for i in missing],
+            },
+            sorted(tags),
+        )
+    set_cache_headers(response, sorted(tags))
+    return {"status": "success", "data": found, "missing": missing}
+
 @router.get("/{destination_id}", status_code=status.HTTP_200_OK)
-async def get_destination(destination_id: str, db: AsyncSession = Depends(get_async_session)):
-    result = await dest_ctrl.get_destination(destination_id, db)
+async def get_destination(destination_id: UUID, response: Response, fields: str | None = FIELDS_QUERY, db: AsyncSession = Depends(get_async_session)):
+    projection = parse_fields(fields, DESTINATION_FIELDS, DESTINATION_REQUIRED_FIELDS)
+    result = await dest_ctrl.get_destination(destination_id, db, projection)
     if not result:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Destination not found")
+    if projection is not None:
+        return projected_response(
+            {"status": "success", "data": project(result, projection)},
+            [f"destination:{result.destination_id}"],
+        )
+    set_cache_headers(response, [f"destination:{result.destination_id}"])
     return {"status": "success", "data": result}
 
+@router.get("/{destination_id}/similar", status_code=status.HTTP_200_OK)
+async def get_similar_destinations(destination_id: UUID, response: Response, k: int = Query(10, ge=1, le=SIMILAR_MAX_K), db: AsyncSession = Depends(get_async_session)):
+    if not similar_destinations.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Similar-destination index has not been built",
+            headers={"Retry-After": "60"},
+        )
+    vector = similar_destinations.vector(destination_id)
+    if vector is None:
+        # Created since the last build: vectorized now against the index's IDF
+        destination = await dest_ctrl.get_destination(destination_id, db)
+        if not destination:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Destination not found")
+        vector = featurize(destination, similar_destinations.idf)
+    neighbours = similar_destinations.most_similar(vector, k, exclude=destination_id)
+
+    ids = [neighbour_id for neighbour_id, _ in neighbours]
+    # Deleted since the last build: left out, so a page may come back short of k
+    found, _ = in_request_order(ids, await dest_ctrl.get_destinations(ids, db), "destination_id")
+    scores = dict(neighbours)
+    data = [schemas.SimilarDestination.model_validate(destination) for destination in found]
+    for item in data:
+        item.similarity = round(scores[item.destination_id], 4)
+    # "similar" is purged by each index build
+    tags = {f"destination:{destination_id}", "similar", *(f"destination:{item.destination_id}" for item in data)}
+    set_cache_headers(response, sorted(tags))
+    return {"status": "success", "data": data}
+
 @router.patch("/{destination_id}", status_code=status.HTTP_200_OK)
-async def update_destination(destination_id: str, destination: schemas.DestinationCreate, db: AsyncSession = Depends(get_async_session)):
+async def update_destination(destination_id: UUID, destination: schemas.DestinationCreate, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_session)):
     result = await dest_ctrl.update_destination(destination_id, destination, db)
     if not result:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Destination not found")
+    background_tasks.add_task(publish_invalidation, [f"destination:{result.destination_id}", "destinations"])
     return {"status": "success", "data": result}
 
 @router.delete("/{destination_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_destination(destination_id: str, db: AsyncSession = Depends(get_async_session)):
+async def delete_destination(destination_id: UUID, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_session)):
     result = await dest_ctrl.delete_destination(destination_id, db)
     if not result:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Destination not found")
+    background_tasks.add_task(publish_invalidation, [f"destination:{destination_id}", "destinations"])
     return {"status": "success", "message": "Destination deleted successfully"}
 
 @router.get("/", status_code=status.HTTP_200_OK)
 async def get_filtered_destinations(
+    response: Response,
     country: str | None = None,
     region: str | None = None,
+    fields: str | None = FIELDS_QUERY,
     db: AsyncSession = Depends(get_async_session)
 ):
+    projection = parse_fields(fields, DESTINATION_FIELDS, DESTINATION_REQUIRED_FIELDS)
     filters = {}
     if country:
         filters["country"] = country
     if region:
         filters["region"] = region
-    result = await dest_ctrl.get_filtered_destinations(filters, db)
+    result = await dest_ctrl.get_filtered_destinations(filters, db, projection)
+    if projection is not None:
+        return projected_response(
+            {"status": "success", "data": [project(destination, projection) for destination in result]},
+            ["destinations"],
+        )
+    set_cache_headers(response, ["destinations"])
     return {"status": "success", "data": result}
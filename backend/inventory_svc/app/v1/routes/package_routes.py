@@ -0,0 +1,67 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+from ..schemas import package_schema as schemas
+from ..schemas.inventory_schema import ResponseWrapper
+from ..database.db import get_async_session
+from ..controllers import package_controller as package_ctrl
+from ..utils.cache_events import publish_invalidation, set_cache_headers
+from ..utils.fx import CURRENCY_QUERY, fx_rates
+from ..utils.keyset import decode_cursor, encode_cursor
+
+router = APIRouter(
+    prefix="/packages",
+    tags=["Packages"]
+)
+
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=ResponseWrapper[schemas.GetPackage])
+async def create_package(package: schemas.PackageCreate, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_session)):
+    result = await package_ctrl.create_package(package, db)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Destination not found")
+    background_tasks.add_task(publish_invalidation, ["packages"])
+    return {"status": "success", "data": result}
+
+@router.get("/", status_code=status.HTTP_200_OK, response_model=schemas.PackagePage)
+async def search_packages(
+    response: Response,
+    destination_id: UUID | None = None,
+    theme: str | None = None,
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+    min_days: int | None = Query(None, ge=1),
+    max_days: int | None = Query(None, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    currency: str | None = CURRENCY_QUERY,
+    db: AsyncSession = Depends(get_async_session)
+):
+    after = None
+    if cursor:
+        price, package_id = decode_cursor(cursor, 2)
+        try:
+            after = (float(price), UUID(package_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    rows = await package_ctrl.search_packages(
+        db, limit, destination_id, theme, min_price, max_price, min_days, max_days, after
+    )
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].price, page[-1].package_id) if len(rows) > limit else None
+    result = {"status": "success", "data": page, "next_cursor": next_cursor}
+    if currency:
+        result["data"] = [schemas.GetPricedPackage.model_validate(package) for package in page]
+        result["display_currency"] = currency.upper()
+        result["fx_version"] = fx_rates.set_display_prices(result["data"], "price", currency.upper())
+    # "fx" is purged when rates change
+    set_cache_headers(response, ["packages", "fx"] if currency else ["packages"])
+    return result
+
+@router.get("/{package_id}", status_code=status.HTTP_200_OK, response_model=ResponseWrapper[schemas.GetPackage])
+async def get_package(package_id: UUID, response: Response, db: AsyncSession = Depends(get_async_session)):
+    result = await package_ctrl.get_package(package_id, db)
+    if not result:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Package not found")
+    set_cache_headers(response, [f"package:{result.package_id}"])
+    return {"status": "success", "data": result}
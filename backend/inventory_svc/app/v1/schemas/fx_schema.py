@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Annotated
+
+class FxRatesUpdate(BaseModel):
+    # Units of each currency one unit of the base currency buys
+    rates: dict[str, Annotated[float, Field(gt=0, allow_inf_nan=False)]] = Field(min_length=1)
+
+class GetFxRates(BaseModel):
+    base: str
+    version: str
+    as_of: datetime | None = None
+    rates: dict[str, float]
@@ -1,13 +1,14 @@
-from pydantic import BaseModel, field_serializer
+from pydantic import BaseModel, Field, field_serializer
 from uuid import UUID
 from datetime import datetime
 from .inventory_schema import GetDestination
 
 class HotelCreate(BaseModel):
     name: str
-    destination_id: str
+    destination_id: UUID
     address: str
     price_per_night: float
+    currency: str = Field("INR", pattern="^[A-Z]{3}$")
     latitude: float
     longitude: float
 
@@ -17,6 +18,7 @@ class GetHotel(BaseModel):
     destination_id: UUID
     address: str
     price_per_night: float
+    currency: str
     latitude: float
     longitude: float
     created_at: datetime
@@ -31,4 +33,37 @@ class GetHotel(BaseModel):
         return value.isoformat()
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class GetPricedHotel(GetHotel):
+    # price_per_night in the page's display_currency, when one was asked for
+    display_price: float | None = None
+
+class HotelSearchPage(BaseModel):
+    status: str
+    data: list[GetPricedHotel]
+    # Hotels matching the filters across all pages
+    total: int
+    # Pass back as ?cursor= for the next page; None on the last one
+    next_cursor: str | None = None
+    display_currency: str | None = None
+    # Version of the exchange rates behind display_price
+    fx_version: str | None = None
+
+class RoomQuote(BaseModel):
+    room_id: UUID
+    nights: int
+    total: float
+    nightly_average: float
+    # Every night of the stay is refundable
+    refundable: bool
+
+    @field_serializer('room_id')
+    def serialize_uuid(self, value: UUID) -> str:
+        return str(value)
+
+class HotelQuote(BaseModel):
+    status: str
+    data: list[RoomQuote]
+    currency: str
+    fx_version: str
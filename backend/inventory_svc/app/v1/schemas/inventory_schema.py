@@ -9,6 +9,11 @@ class ResponseWrapper(BaseModel, Generic[T]):
     status: str
     data: T
 
+class BatchResponseWrapper(BaseModel, Generic[T]):
+    status: str
+    data: list[T]
+    missing: list[UUID] = []
+
 class AllDestinations(BaseModel):
     destination_id: str
     name: str
@@ -43,4 +48,8 @@ class GetDestination(BaseModel):
         return value.isoformat()
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class SimilarDestination(GetDestination):
+    # Cosine similarity to the destination asked about
+    similarity: float | None = None
\ No newline at end of file
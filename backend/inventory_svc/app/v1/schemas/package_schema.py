@@ -0,0 +1,62 @@
+from pydantic import BaseModel, Field, field_serializer
+from uuid import UUID
+from datetime import datetime
+
+class ItineraryItemCreate(BaseModel):
+    day_number: int = Field(ge=1)
+    title: str
+    description: str = ""
+
+class PackageCreate(BaseModel):
+    destination_id: UUID
+    name: str
+    description: str = ""
+    price: float = Field(ge=0)
+    currency: str = Field("INR", pattern="^[A-Z]{3}$")
+    duration_days: int = Field(ge=1)
+    theme: str
+    itinerary: list[ItineraryItemCreate] = []
+
+class GetItineraryItem(BaseModel):
+    day_number: int
+    title: str
+    description: str
+
+    class Config:
+        from_attributes = True
+
+class GetPackage(BaseModel):
+    package_id: UUID
+    destination_id: UUID
+    name: str
+    description: str
+    price: float
+    currency: str
+    duration_days: int
+    theme: str
+    created_at: datetime
+    itinerary_items: list[GetItineraryItem]
+
+    @field_serializer('package_id', 'destination_id')
+    def serialize_uuid(self, value: UUID) -> str:
+        return str(value)
+
+    @field_serializer('created_at')
+    def serialize_datetime(self, value: datetime) -> str:
+        return value.isoformat()
+
+    class Config:
+        from_attributes = True
+
+class GetPricedPackage(GetPackage):
+    # price in the page's display_currency, when one was asked for
+    display_price: float | None = None
+
+class PackagePage(BaseModel):
+    status: str
+    data: list[GetPricedPackage]
+    # Pass back as ?cursor= for the next page; None on the last one
+    next_cursor: str | None = None
+    display_currency: str | None = None
+    # Version of the exchange rates behind display_price
+    fx_version: str | None = None
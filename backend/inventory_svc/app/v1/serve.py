@@ -0,0 +1,17 @@
+"""Run the inventory service with several uvicorn worker processes.
+
+    python -m inventory_svc.app.v1.serve
+
+See common.settings.serve for WEB_CONCURRENCY and the DB_MAX_CONNECTIONS split.
+"""
+from common.settings import serve
+
+from .config import DB_MAX_CONNECTIONS  # loads .env before serve() reads the environment
+
+
+def main() -> None:
+    serve("inventory_svc.app.v1.main:app", 8002, DB_MAX_CONNECTIONS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""In-memory amenity bitset index for hotel search.
+
+Holds every hotel's Hotel.amenity_bits as a (words, hotels) uint64 matrix,
+sorted by hotel_id, so "has pool AND wifi AND parking" is one AND/compare per
+64-amenity word over contiguous arrays instead of joins over hotel_amenity.
+Each worker keeps its own copy, and a background task (run) picks up changes
+by re-reading hotels whose updated_at moved; a periodic full rebuild drops
+deleted hotels. Searches only read the current arrays, so neither ever holds
+up a request.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from uuid import UUID
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.inventory_model import Amenity, Hotel
+
+logger = logging.getLogger(__name__)
+
+AMENITY_INDEX_REFRESH_SECONDS = float(os.getenv("AMENITY_INDEX_REFRESH_SECONDS", 2.0))
+AMENITY_INDEX_REBUILD_SECONDS = float(os.getenv("AMENITY_INDEX_REBUILD_SECONDS", 600.0))
+# updated_at is stamped at flush but visible at commit; re-read a window
+# behind the watermark so slow transactions aren't missed
+REFRESH_OVERLAP = timedelta(seconds=5)
+
+
+def encode_amenity_bits(bit_indexes) -> bytes | None:
+    value = 0
+    for bit in bit_indexes:
+        value |= 1 << bit
+    if not value:
+        return None
+    return value.to_bytes((value.bit_length() + 7) // 8, "little")
+
+
+def _hotel_id(key: bytes) -> UUID:
+    # numpy drops trailing NUL bytes when handing back S16 elements
+    return UUID(bytes=bytes(key).ljust(16, b"\0"))
+
+
+def _words(blob: bytes | None, count: int) -> np.ndarray:
+    return np.frombuffer((blob or b"").ljust(count * 8, b"\0"), dtype="<u8")
+
+
+class AmenityIndex:
+    def __init__(self):
+        self.ids = np.empty(0, dtype="S16")
+        self.bits = np.zeros((1, 0), dtype=np.uint64)
+        self.destinations = np.empty(0, dtype=np.int32)
+        self.destination_codes: dict[UUID, int] = {}
+        self.amenity_bits: dict[UUID, int] = {}
+        self.watermark: datetime | None = None
+        self.built_at = float("-inf")
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Re-read hotels changed since the last refresh, or all of them when a rebuild is due."""
+        now = time.monotonic()
+        full = self.watermark is None or now - self.built_at > AMENITY_INDEX_REBUILD_SECONDS
+        await self._load(db, full)
+        if full:
+            self.built_at = now
+        self.loaded = True
+
+    async def run(self, session_factory, interval: float = AMENITY_INDEX_REFRESH_SECONDS) -> None:
+        while True:
+            try:
+                async with session_factory() as db:
+                    await self.refresh(db)
+            except Exception:
+                logger.exception("Amenity index refresh failed; still serving the previous one")
+            await asyncio.sleep(interval)
+
+    def ensure_loaded(self) -> None:
+        if not self.loaded:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Amenity search index is not built yet",
+                headers={"Retry-After": "1"},
+            )
+
+    async def _load(self, db: AsyncSession, full: bool) -> None:
+        amenities = await db.execute(
+            select(Amenity.amenity_id, Amenity.bit_index).where(Amenity.bit_index.is_not(None))
+        )
+        self.amenity_bits = dict(amenities.all())
+
+        query = select(Hotel.hotel_id, Hotel.destination_id, Hotel.amenity_bits, Hotel.updated_at)
+        if not full:
+            query = query.where(Hotel.updated_at >= self.watermark - REFRESH_OVERLAP)
+        rows = (await db.execute(query)).all()
+
+        latest = max((row.updated_at for row in rows if row.updated_at), default=None)
+        if full:
+            # Off the event loop: at 500k hotels this is seconds of CPU. The
+            # old arrays keep serving until the new ones are swapped in
+            built = await asyncio.to_thread(self._build, rows)
+            self.ids, self.destinations, self.bits, self.destination_codes = built
+            self.watermark = latest or datetime.min + REFRESH_OVERLAP
+            logger.info("Amenity index built with %d hotels", len(rows))
+        elif rows:
+            self._merge(rows)
+            self.watermark = max(self.watermark, latest or self.watermark)
+
+    def _destination_code(self, destination_id: UUID) -> int:
+        return self.destination_codes.setdefault(destination_id, len(self.destination_codes))
+
+    def _word_count(self, rows) -> int:
+        widest = max((len(row.amenity_bits or b"") for row in rows), default=0)
+        return max(1, (widest + 7) // 8)
+
+    def _build(self, rows) -> tuple[np.ndarray, np.ndarray, np.ndarray, dict[UUID, int]]:
+        """New (ids, destinations, bits, destination_codes); touches nothing on self."""
+        words = self._word_count(rows)
+        codes: dict[UUID, int] = {}
+        ids = np.array([row.hotel_id.bytes for row in rows], dtype="S16")
+        destinations = np.array(
+            [codes.setdefault(row.destination_id, len(codes)) for row in rows], dtype=np.int32
+        )
+        buffer = b"".join((row.amenity_bits or b"").ljust(words * 8, b"\0") for row in rows)
+        bits = np.frombuffer(buffer, dtype="<u8").reshape(len(rows), words)
+
+        order = np.argsort(ids, kind="stable")
+        # One contiguous row per 64-amenity word keeps the filter scans sequential
+        return ids[order], destinations[order], np.ascontiguousarray(bits[order].T), codes
+
+    def _merge(self, rows) -> None:
+        words = max(self.bits.shape[0], self._word_count(rows))
+        if words > self.bits.shape[0]:
+            self.bits = np.vstack(
+                [self.bits, np.zeros((words - self.bits.shape[0], len(self.ids)), dtype=np.uint64)]
+            )
+
+        added = []
+        for row in rows:
+            key = row.hotel_id.bytes
+            position = int(np.searchsorted(self.ids, key))
+            if position < len(self.ids) and _hotel_id(self.ids[position]) == row.hotel_id:
+                self.bits[:, position] = _words(row.amenity_bits, words)
+                self.destinations[position] = self._destination_code(row.destination_id)
+            else:
+                added.append(row)
+        if not added:
+            return
+
+        ids = np.concatenate([self.ids, np.array([row.hotel_id.bytes for row in added], dtype="S16")])
+        destinations = np.concatenate(
+            [self.destinations, np.array([self._destination_code(row.destination_id) for row in added], dtype=np.int32)]
+        )
+        bits = np.hstack([self.bits, np.stack([_words(row.amenity_bits, words) for row in added], axis=1)])
+        order = np.argsort(ids, kind="stable")
+        self.ids, self.destinations, self.bits = ids[order], destinations[order], np.ascontiguousarray(bits[:, order])
+
+    def search(
+        self,
+        bit_indexes: list[int],
+        destination_id: UUID | None = None,
+        after: UUID | None = None,
+        limit: int = 20,
+    ) -> tuple[list[UUID], int]:
+        """Hotel IDs (in hotel_id order, after `after`) that have every amenity
+        bit, and how many hotels match in total."""
+        matches = np.ones(len(self.ids), dtype=bool)
+        mask = [0] * self.bits.shape[0]
+        for bit in bit_indexes:
+            if bit // 64 >= len(mask):
+                # No hotel has ever had this amenity
+                return [], 0
+            mask[bit // 64] |= 1 << (bit % 64)
+        for word, word_mask in enumerate(mask):
+            if word_mask:
+                word_mask = np.uint64(word_mask)
+                matches &= (self.bits[word] & word_mask) == word_mask
+        if destination_id is not None:
+            code = self.destination_codes.get(destination_id)
+            if code is None:
+                return [], 0
+            matches &= self.destinations == code
+
+        positions = np.flatnonzero(matches)
+        total = len(positions)
+        if after is not None:
+            start = np.searchsorted(self.ids, after.bytes, side="right")
+            positions = positions[np.searchsorted(positions, start):]
+        return [_hotel_id(key) for key in self.ids[positions[:limit]]], total
+
+
+amenity_index = AmenityIndex()
@@ -0,0 +1,22 @@
+from uuid import UUID
+
+from fastapi import HTTPException, Query, status
+
+from ..config import BATCH_MAX_IDS
+
+
+def batch_ids(ids: list[UUID] = Query(..., description="Repeat for each ID: ?ids=...&ids=...")) -> list[UUID]:
+    """Deduplicated IDs of a batch lookup, in the order they were asked for."""
+    unique = list(dict.fromkeys(ids))
+    if len(unique) > BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BATCH_MAX_IDS} ids per request",
+        )
+    return unique
+
+
+def in_request_order(ids: list[UUID], rows, key: str) -> tuple[list, list[UUID]]:
+    """Match rows back to the requested ids: (found rows in order, missing ids)."""
+    by_id = {getattr(row, key): row for row in rows}
+    return [by_id[i] for i in ids if i in by_id], [i for i in ids if i not in by_id]
@@ -0,0 +1,35 @@
+import logging
+import os
+
+import httpx
+from fastapi import Response
+
+from common.telemetry import inject_trace_headers
+
+logger = logging.getLogger(__name__)
+
+CACHE_MAX_AGE = int(os.getenv("CACHE_MAX_AGE", 60))
+GATEWAY_PURGE_URL = os.getenv(
+    "GATEWAY_PURGE_URL", "http://localhost:8000/api/v1/inventory/_cache/purge"
+)
+CACHE_PURGE_TOKEN = os.getenv("CACHE_PURGE_TOKEN")
+
+
+def set_cache_headers(response: Response, tags: list[str], max_age: int = CACHE_MAX_AGE) -> None:
+    # Cache-Tag tells the gateway which purge events should evict this response
+    response.headers["Cache-Control"] = f"public, max-age={max_age}"
+    response.headers["Cache-Tag"] = ",".join(tags)
+
+
+async def publish_invalidation(tags: list[str]) -> None:
+    if not GATEWAY_PURGE_URL or not tags:
+        return
+
+    headers = {"X-Internal-Token": CACHE_PURGE_TOKEN} if CACHE_PURGE_TOKEN else {}
+    inject_trace_headers(headers)
+    try:
+        async with httpx.AsyncClient(timeout=2.0) as client:
+            await client.post(GATEWAY_PURGE_URL, json={"tags": tags}, headers=headers)
+    except httpx.HTTPError as e:
+        # Cached copies still expire after CACHE_MAX_AGE
+        logger.warning("Failed to publish cache invalidation for %s: %s", tags, e)
@@ -0,0 +1,251 @@
+"""Feature vectors and the similarity index behind "destinations like this".
+
+Each destination becomes one L2-normalised float32 vector made of hashed
+blocks: sublinear TF-IDF over its description, plus its tags, country and
+region. Similarity is the dot product, so top-k for one destination is one
+matrix-vector product over the index. Hashing keeps the width fixed, so a
+new tag or country needs no refit and the index can be updated in place.
+
+The index is written by scripts/build_similar_index.py as .npy files and
+mapped read-only at startup, so loading doesn't read the vectors in and
+every worker shares the same pages. Each build writes a new version and
+then swaps meta.json; the previous two versions' files stay on disk for
+workers that are mid-load. Running workers pick up a new build from a
+background task (run), which reads it off the event loop.
+"""
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import time
+import zlib
+from collections import Counter
+from uuid import UUID
+
+import numpy as np
+
+from ..config import SIMILAR_INDEX_DIR, SIMILAR_INDEX_RELOAD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Hashed width and weight of each block; weights are relative importance
+# in the final cosine
+FEATURE_BLOCKS = {
+    "description": (512, 1.0),
+    "tags": (256, 1.0),
+    "country": (256, 0.5),
+    "region": (64, 0.25),
+}
+DIMENSIONS = sum(width for width, _ in FEATURE_BLOCKS.values())
+STOPWORDS = frozenset(
+    "and are but for from has have its not our the their there this was were with you your into over".split()
+)
+TOKEN = re.compile(r"[a-z]{3,}")
+INDEX_FILE = re.compile(r"(?:ids|vectors|idf)-([0-9a-f]+)\.npy")
+# Versions older than the one just written whose files are kept, so a worker
+# that read the previous meta.json can still open what it names
+PREVIOUS_VERSIONS_KEPT = 2
+# meta.json re-reads when the files it names vanish mid-load
+LOAD_ATTEMPTS = 3
+
+
+def tokenize(text: str | None) -> list[str]:
+    return [token for token in TOKEN.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+def _bucket(block: str, feature: str, width: int) -> tuple[int, float]:
+    # Stable across processes (unlike hash()); one bit of the hash picks the
+    # sign so colliding features tend to cancel rather than add up
+    h = zlib.crc32(f"{block}:{feature}".encode("utf-8"))
+    return (h >> 1) % width, 1.0 if h & 1 else -1.0
+
+
+def _hashed(block: str, counts: dict[str, float], width: int) -> np.ndarray:
+    vector = np.zeros(width, dtype=np.float32)
+    for feature, value in counts.items():
+        index, sign = _bucket(block, feature, width)
+        vector[index] += sign * value
+    return vector
+
+
+def description_buckets(destinations) -> np.ndarray:
+    """Document frequency of each description bucket, for compute_idf()."""
+    width = FEATURE_BLOCKS["description"][0]
+    df = np.zeros(width, dtype=np.int64)
+    for destination in destinations:
+        buckets = {_bucket("description", token, width)[0] for token in set(tokenize(destination.description))}
+        df[list(buckets)] += 1
+    return df
+
+
+def compute_idf(df: np.ndarray, documents: int) -> np.ndarray:
+    return (np.log((1 + documents) / (1 + df)) + 1).astype(np.float32)
+
+
+def featurize(destination, idf: np.ndarray) -> np.ndarray:
+    """One destination's vector; `destination` needs description, tags, country and region."""
+    width, _ = FEATURE_BLOCKS["description"]
+    terms = {term: 1 + math.log(count) for term, count in Counter(tokenize(destination.description)).items()}
+    blocks = {
+        "description": _hashed("description", terms, width) * idf,
+        "tags": _hashed("tags", {str(tag).lower(): 1.0 for tag in (destination.tags or {})}, FEATURE_BLOCKS["tags"][0]),
+        "country": _hashed("country", {destination.country.lower(): 1.0} if destination.country else {}, FEATURE_BLOCKS["country"][0]),
+        "region": _hashed("region", {destination.region.lower(): 1.0} if destination.region else {}, FEATURE_BLOCKS["region"][0]),
+    }
+    parts = []
+    for name, (_, weight) in FEATURE_BLOCKS.items():
+        block = blocks[name]
+        norm = np.linalg.norm(block)
+        parts.append(block * (math.sqrt(weight) / norm) if norm else block)
+    vector = np.concatenate(parts)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _uuid(key: bytes) -> UUID:
+    # numpy drops trailing NUL bytes when handing back S16 elements
+    return UUID(bytes=bytes(key).ljust(16, b"\0"))
+
+
+def save_index(path: str, ids: list[UUID], vectors: np.ndarray, idf: np.ndarray, change_cursor: int) -> dict:
+    """Writes a new version of the index; readers switch when meta.json is replaced."""
+    os.makedirs(path, exist_ok=True)
+    version = f"{time.time_ns():x}"
+    files = {"ids": f"ids-{version}.npy", "vectors": f"vectors-{version}.npy", "idf": f"idf-{version}.npy"}
+    np.save(os.path.join(path, files["ids"]), np.array([i.bytes for i in ids], dtype="S16"))
+    np.save(os.path.join(path, files["vectors"]), np.ascontiguousarray(vectors, dtype=np.float32))
+    np.save(os.path.join(path, files["idf"]), idf.astype(np.float32))
+    meta = {
+        "version": version,
+        "dimensions": DIMENSIONS,
+        "count": len(ids),
+        "change_cursor": change_cursor,
+        "built_at": time.time(),
+        "files": files,
+    }
+    tmp = os.path.join(path, f"meta-{version}.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(path, "meta.json"))
+    _remove_old_versions(path, version)
+    return meta
+
+
+def _remove_old_versions(path: str, current: str) -> None:
+    # Newer versions belong to builds still writing; workers mapping a removed
+    # version keep its pages until they reload
+    files: dict[int, list[str]] = {}
+    for name in os.listdir(path):
+        match = INDEX_FILE.fullmatch(name)
+        if match:
+            files.setdefault(int(match.group(1), 16), []).append(name)
+    older = sorted(version for version in files if version < int(current, 16))
+    for version in older[: max(0, len(older) - PREVIOUS_VERSIONS_KEPT)]:
+        for name in files[version]:
+            try:
+                os.remove(os.path.join(path, name))
+            except FileNotFoundError:
+                pass  # another build got there first
+
+
+class SimilarityIndex:
+    def __init__(self, path: str = SIMILAR_INDEX_DIR):
+        self.path = path
+        self.meta: dict | None = None
+        self.ids = np.empty(0, dtype="S16")
+        self.positions: dict[UUID, int] = {}
+        self.vectors = np.zeros((0, DIMENSIONS), dtype=np.float32)
+        self.idf = np.ones(FEATURE_BLOCKS["description"][0], dtype=np.float32)
+        self._meta_mtime = None
+        # A build with other feature settings, already reported
+        self._rejected_mtime = None
+
+    @property
+    def ready(self) -> bool:
+        return self.meta is not None
+
+    def _read(self, mmap_mode: str | None = "r") -> tuple | None:
+        meta_path = os.path.join(self.path, "meta.json")
+        for _ in range(LOAD_ATTEMPTS):
+            try:
+                mtime = os.stat(meta_path).st_mtime_ns
+                with open(meta_path) as f:
+                    meta = json.load(f)
+            except FileNotFoundError:
+                return None
+            if meta["dimensions"] != DIMENSIONS:
+                self._rejected_mtime = mtime
+                logger.error(
+                    "Similarity index %s at %s was built with other feature settings; rebuild it with --full",
+                    meta["version"], self.path,
+                )
+                return None
+
+            files = {name: os.path.join(self.path, file) for name, file in meta["files"].items()}
+            try:
+                ids = np.load(files["ids"])
+                vectors = np.load(files["vectors"], mmap_mode=mmap_mode)
+                idf = np.load(files["idf"])
+            except FileNotFoundError:
+                # Superseded and removed since we read meta.json; read the new one
+                continue
+            positions = {_uuid(key): i for i, key in enumerate(ids)}
+            return meta, mtime, ids, vectors, idf, positions
+        return None
+
+    def _apply(self, loaded: tuple) -> None:
+        # Plain attribute swaps with no await in between, so a request sees
+        # either the old index or the new one
+        self.meta, self._meta_mtime, self.ids, self.vectors, self.idf, self.positions = loaded
+
+    def load(self, mmap_mode: str | None = "r") -> bool:
+        """(Re)loads the index from disk; False if none could be loaded, in
+        which case whatever was loaded before stays in use."""
+        loaded = self._read(mmap_mode)
+        if loaded is None:
+            return False
+        self._apply(loaded)
+        return True
+
+    def _read_if_changed(self) -> tuple | None:
+        try:
+            mtime = os.stat(os.path.join(self.path, "meta.json")).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime in (self._meta_mtime, self._rejected_mtime):
+            return None
+        return self._read()
+
+    async def run(self, interval: float = SIMILAR_INDEX_RELOAD_SECONDS) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                loaded = await asyncio.to_thread(self._read_if_changed)
+            except Exception:
+                logger.exception("Similarity index reload failed; keeping %s", (self.meta or {}).get("version"))
+                continue
+            if loaded is not None:
+                self._apply(loaded)
+
+    def vector(self, destination_id: UUID) -> np.ndarray | None:
+        position = self.positions.get(destination_id)
+        return None if position is None else self.vectors[position]
+
+    def most_similar(self, vector: np.ndarray, k: int, exclude: UUID | None = None) -> list[tuple[UUID, float]]:
+        """The k destinations closest to `vector`, best first, with their cosine similarity."""
+        if not len(self.ids):
+            return []
+        scores = self.vectors @ vector
+        if exclude is not None and exclude in self.positions:
+            scores[self.positions[exclude]] = -np.inf
+        k = min(k, len(scores) - (exclude in self.positions))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(_uuid(self.ids[i]), float(scores[i])) for i in top]
+
+
+similar_destinations = SimilarityIndex()
@@ -0,0 +1,191 @@
+"""Incremental encoders for bulk exports.
+
+Each encoder turns batches of Core rows into bytes as they arrive, so an
+export holds one batch in memory no matter how large the table is. Parquet
+and Arrow need pyarrow (pip install pyarrow).
+"""
+import csv
+import io
+import json
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from uuid import UUID
+
+from sqlalchemy import JSON, Boolean, DateTime, Float, Integer, LargeBinary, Uuid
+
+
+def _kind(column) -> str:
+    column_type = column.type
+    if isinstance(column_type, Uuid):
+        return "uuid"
+    if isinstance(column_type, DateTime):
+        return "datetime"
+    if isinstance(column_type, JSON):
+        return "json"
+    if isinstance(column_type, Boolean):
+        return "bool"
+    if isinstance(column_type, Integer):
+        return "int"
+    if isinstance(column_type, Float):
+        return "float"
+    if isinstance(column_type, LargeBinary):
+        return "bytes"
+    return "str"
+
+
+def _json_default(value):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.hex()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class Encoder(ABC):
+    def __init__(self, columns):
+        self.names = [column.name for column in columns]
+        self.kinds = [_kind(column) for column in columns]
+        self.rows = 0
+
+    def begin(self) -> bytes:
+        return b""
+
+    @abstractmethod
+    def encode(self, rows) -> bytes:
+        """Bytes for one batch of rows."""
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class NdjsonEncoder(Encoder):
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def encode(self, rows) -> bytes:
+        self.rows += len(rows)
+        dumps = json.JSONEncoder(default=_json_default, separators=(",", ":")).encode
+        return "".join(dumps(dict(zip(self.names, row))) + "\n" for row in rows).encode("utf-8")
+
+
+class CsvEncoder(Encoder):
+    media_type = "text/csv"
+    extension = "csv"
+
+    def _cell(self, kind: str, value):
+        if value is None:
+            return ""
+        if kind == "json":
+            return json.dumps(value, default=_json_default)
+        if kind == "datetime":
+            return value.isoformat()
+        if kind == "bytes":
+            return value.hex()
+        return value
+
+    def begin(self) -> bytes:
+        return self._write([self.names])
+
+    def encode(self, rows) -> bytes:
+        self.rows += len(rows)
+        return self._write([self._cell(kind, value) for kind, value in zip(self.kinds, row)] for row in rows)
+
+    def _write(self, rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+
+class _Drain(io.RawIOBase):
+    """Write-only file that hands back whatever pyarrow wrote since the last take()."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class _ArrowEncoder(Encoder):
+    def __init__(self, columns):
+        super().__init__(columns)
+        try:
+            import pyarrow
+        except ImportError:
+            raise RuntimeError(f"{self.extension} exports need pyarrow (pip install pyarrow)") from None
+        self.pa = pyarrow
+        arrow_types = {
+            "uuid": pyarrow.string(),
+            "datetime": pyarrow.timestamp("us"),
+            "json": pyarrow.string(),
+            "bool": pyarrow.bool_(),
+            "int": pyarrow.int64(),
+            "float": pyarrow.float64(),
+            "bytes": pyarrow.binary(),
+            "str": pyarrow.string(),
+        }
+        self.schema = pyarrow.schema(
+            [(name, arrow_types[kind]) for name, kind in zip(self.names, self.kinds)]
+        )
+        self.sink = _Drain()
+
+    def _record_batch(self, rows):
+        arrays = []
+        for kind, field, values in zip(self.kinds, self.schema, zip(*rows)):
+            if kind == "uuid":
+                values = [None if v is None else str(v) for v in values]
+            elif kind == "json":
+                values = [None if v is None else json.dumps(v, default=_json_default) for v in values]
+            arrays.append(self.pa.array(values, type=field.type))
+        return self.pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+    def encode(self, rows) -> bytes:
+        if not rows:
+            return b""
+        self.rows += len(rows)
+        self.writer.write_batch(self._record_batch(rows))
+        return self.sink.take()
+
+    def finish(self) -> bytes:
+        self.writer.close()
+        return self.sink.take()
+
+
+class ParquetEncoder(_ArrowEncoder):
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def begin(self) -> bytes:
+        import pyarrow.parquet as pq
+
+        # One row group per batch; the footer is written by finish()
+        self.writer = pq.ParquetWriter(self.sink, self.schema, compression="zstd")
+        return self.sink.take()
+
+
+class ArrowStreamEncoder(_ArrowEncoder):
+    media_type = "application/vnd.apache.arrow.stream"
+    extension = "arrows"
+
+    def begin(self) -> bytes:
+        self.writer = self.pa.ipc.new_stream(self.sink, self.schema)
+        return self.sink.take()
+
+
+ENCODERS = {
+    "ndjson": NdjsonEncoder,
+    "csv": CsvEncoder,
+    "parquet": ParquetEncoder,
+    "arrow": ArrowStreamEncoder,
+}
@@ -0,0 +1,115 @@
+"""Exchange rates held in memory as versioned snapshots.
+
+Each worker loads the FxRate table into an immutable FxSnapshot and a
+background task swaps in a fresh one every FX_REFRESH_SECONDS. Requests only
+read the current snapshot, so converting a page of prices is one numpy
+multiply with no database round-trip, and a refresh never blocks them. The
+version is a digest of the rates themselves, so workers holding the same
+rates report the same version.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime
+
+import numpy as np
+from fastapi import HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import FX_BASE_CURRENCY, FX_REFRESH_SECONDS
+from ..models.inventory_model import FxRate
+
+logger = logging.getLogger(__name__)
+
+CURRENCY_QUERY = Query(
+    None,
+    min_length=3,
+    max_length=3,
+    description="ISO 4217 code to also show prices in, e.g. USD; adds display_price",
+)
+
+
+class FxSnapshot:
+    def __init__(self, rates: dict[str, float], as_of: datetime | None = None):
+        rates = {**rates, FX_BASE_CURRENCY: 1.0}
+        currencies = sorted(rates)
+        self.codes = {currency: i for i, currency in enumerate(currencies)}
+        # A trailing NaN: currencies without a rate look up index -1
+        self.rates = np.array([rates[c] for c in currencies] + [np.nan], dtype=np.float64)
+        self.as_of = as_of
+        digest = hashlib.blake2b(json.dumps([[c, rates[c]] for c in currencies]).encode(), digest_size=8)
+        self.version = digest.hexdigest()
+
+    def __contains__(self, currency: str) -> bool:
+        return currency in self.codes
+
+    def as_dict(self) -> dict[str, float]:
+        return {currency: float(self.rates[i]) for currency, i in self.codes.items()}
+
+    def convert(self, amounts, currencies, to: str) -> np.ndarray:
+        """amounts[i] from currencies[i] (or one currency for all) into `to`,
+        rounded to two places; NaN where a source currency has no rate."""
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if isinstance(currencies, str):
+            source = self.rates[self.codes.get(currencies, -1)]
+        else:
+            codes = np.fromiter((self.codes.get(c, -1) for c in currencies), dtype=np.intp, count=len(amounts))
+            source = self.rates[codes]
+        return np.round(amounts * (self.rates[self.codes[to]] / source), 2)
+
+
+class FxRates:
+    def __init__(self):
+        self.snapshot = FxSnapshot({})
+        self.loaded = False
+
+    async def refresh(self, db: AsyncSession) -> FxSnapshot:
+        rows = (await db.execute(select(FxRate.currency, FxRate.rate, FxRate.updated_at))).all()
+        snapshot = FxSnapshot(
+            {row.currency: row.rate for row in rows},
+            max((row.updated_at for row in rows), default=None),
+        )
+        if snapshot.version != self.snapshot.version:
+            # Swapped whole, so a request sees either the old rates or the new
+            self.snapshot = snapshot
+            logger.info("FX rates %s loaded (%d currencies)", snapshot.version, len(snapshot.codes))
+        self.loaded = True
+        return self.snapshot
+
+    async def run(self, session_factory, interval: float = FX_REFRESH_SECONDS) -> None:
+        while True:
+            try:
+                async with session_factory() as db:
+                    await self.refresh(db)
+            except Exception:
+                logger.exception("FX rate refresh failed; keeping rates %s", self.snapshot.version)
+            await asyncio.sleep(interval)
+
+    def for_currency(self, currency: str) -> FxSnapshot:
+        """The current snapshot, or a 4xx/5xx if it can't convert into `currency`."""
+        if not self.loaded:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Exchange rates are not loaded yet",
+                headers={"Retry-After": "1"},
+            )
+        snapshot = self.snapshot
+        if currency not in snapshot:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"No exchange rate for {currency}")
+        return snapshot
+
+    def set_display_prices(self, items, price_field: str, currency: str) -> str:
+        """Sets display_price on each response model in a page to its price in
+        `currency`; returns the version of the rates used."""
+        snapshot = self.for_currency(currency)
+        prices = snapshot.convert(
+            [getattr(item, price_field) for item in items], [item.currency for item in items], currency
+        )
+        for item, price in zip(items, prices.tolist()):
+            item.display_price = None if np.isnan(price) else price
+        return snapshot.version
+
+
+fx_rates = FxRates()
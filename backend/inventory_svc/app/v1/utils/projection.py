@@ -0,0 +1,47 @@
+from fastapi import HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import load_only
+
+from .cache_events import set_cache_headers
+from common.telemetry import TimedJSONResponse
+
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated attributes to return, e.g. name,price_per_night. IDs are always included.",
+)
+
+
+def parse_fields(fields: str | None, allowed, required=()) -> list[str] | None:
+    """The ?fields= projection as a list (with `required` first), or None for the full representation."""
+    if not fields:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(requested) - set(allowed))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+    return list(dict.fromkeys([*required, *requested]))
+
+
+def column_loader(model, fields: list[str]):
+    # Only the projected columns are SELECTed; touching any other raises
+    # instead of quietly lazy-loading it
+    columns = [getattr(model, name) for name in fields if name in model.__table__.columns]
+    return load_only(*columns, raiseload=True)
+
+
+def project(row, fields: list[str], nested: dict | None = None) -> dict:
+    nested = nested or {}
+    return {
+        name: nested[name](getattr(row, name)) if name in nested else jsonable_encoder(getattr(row, name))
+        for name in fields
+    }
+
+
+def projected_response(content: dict, tags: list[str]) -> TimedJSONResponse:
+    # Returned as-is, so the cache headers go on this response directly
+    response = TimedJSONResponse(content)
+    set_cache_headers(response, tags)
+    return response
@@ -0,0 +1,93 @@
+"""The amenity bitset index and the flush hook that feeds it.
+
+    cd backend
+    python -m unittest tests.test_amenity_index
+"""
+import tempfile
+import unittest
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from inventory_svc.app.v1.database import amenity_bits  # noqa: F401  (registers the flush hook)
+from inventory_svc.app.v1.database.change_log import InventorySession
+from inventory_svc.app.v1.models.base import Base
+from inventory_svc.app.v1.models.inventory_model import Amenity, Destination, Hotel
+from inventory_svc.app.v1.utils.amenity_index import AmenityIndex
+
+
+def _amenity(name: str) -> Amenity:
+    return Amenity(name=name, category="general", icon_url="")
+
+
+def _hotel(destination: Destination, name: str) -> Hotel:
+    return Hotel(
+        destination=destination, name=name, address="", rating=4.0, price_per_night=100.0, latitude=0.0, longitude=0.0
+    )
+
+
+class AmenityIndexTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{self.directory.name}/inventory.db")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.sessions = async_sessionmaker(
+            bind=self.engine, class_=AsyncSession, sync_session_class=InventorySession, expire_on_commit=False
+        )
+        async with self.sessions() as db:
+            destination = Destination(name="Goa", country="India", region="West", description="", image_url="", tags=[])
+            self.pool, self.wifi = _amenity("Pool"), _amenity("Wifi")
+            self.beach = _hotel(destination, "Beach")
+            self.city = _hotel(destination, "City")
+            self.beach.amenities = [self.pool, self.wifi]
+            self.city.amenities = [self.wifi]
+            db.add_all([self.beach, self.city])
+            await db.commit()
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        self.directory.cleanup()
+
+    async def search(self, index: AmenityIndex, *amenities: Amenity) -> list:
+        ids, _ = index.search([index.amenity_bits[a.amenity_id] for a in amenities])
+        return sorted(ids)
+
+    async def test_search_waits_for_the_first_build(self):
+        index = AmenityIndex()
+        with self.assertRaises(HTTPException) as raised:
+            index.ensure_loaded()
+        self.assertEqual(raised.exception.status_code, 503)
+
+        async with self.sessions() as db:
+            await index.refresh(db)
+        index.ensure_loaded()
+        self.assertEqual(await self.search(index, self.wifi), sorted([self.beach.hotel_id, self.city.hotel_id]))
+        self.assertEqual(await self.search(index, self.pool, self.wifi), [self.beach.hotel_id])
+
+    async def test_changes_made_from_the_amenity_side_reach_the_index(self):
+        index = AmenityIndex()
+        async with self.sessions() as db:
+            await index.refresh(db)
+
+        async with self.sessions() as db:
+            pool = (
+                await db.execute(
+                    select(Amenity).where(Amenity.amenity_id == self.pool.amenity_id).options(selectinload(Amenity.hotels))
+                )
+            ).scalar_one()
+            city = await db.get(Hotel, self.city.hotel_id)
+            beach = await db.get(Hotel, self.beach.hotel_id)
+            pool.hotels.append(city)
+            pool.hotels.remove(beach)
+            await db.commit()
+
+        async with self.sessions() as db:
+            await index.refresh(db)
+        self.assertEqual(await self.search(index, self.pool), [self.city.hotel_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""The /changes feed serves a change as soon as it commits.
+
+    cd backend
+    python -m unittest tests.test_change_feed
+"""
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from inventory_svc.app.v1.controllers import change_controller
+from inventory_svc.app.v1.database.change_log import InventorySession
+from inventory_svc.app.v1.models.inventory_model import ChangeLog, Destination
+
+
+class ChangeFeedTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{self.directory.name}/inventory.db")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(
+                Destination.metadata.create_all, tables=[Destination.__table__, ChangeLog.__table__]
+            )
+        self.sessions = async_sessionmaker(
+            bind=self.engine, class_=AsyncSession, sync_session_class=InventorySession, expire_on_commit=False
+        )
+        patcher = mock.patch.object(change_controller, "AsyncSessionLocal", self.sessions)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        self.directory.cleanup()
+
+    async def changes(self, since: int) -> list[dict]:
+        return [json.loads(line) async for line in change_controller.stream_changes(since, 100)]
+
+    async def test_committed_changes_are_served_immediately(self):
+        async with self.sessions() as db:
+            db.add(Destination(name="Lisbon", country="Portugal", region="Lisboa", description="", image_url="", tags=[]))
+            await db.commit()
+
+        *changes, checkpoint = await self.changes(0)
+        self.assertEqual([(c["entity"], c["operation"]) for c in changes], [("destination", "insert")])
+        self.assertEqual(checkpoint, {"checkpoint": changes[0]["cursor"], "has_more": False})
+
+        async with self.sessions() as db:
+            db.add(Destination(name="Porto", country="Portugal", region="Norte", description="", image_url="", tags=[]))
+            await db.commit()
+        *changes, checkpoint = await self.changes(checkpoint["checkpoint"])
+        self.assertEqual([c["data"]["name"] for c in changes], ["Porto"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""CompressionMiddleware on a relayed inventory export.
+
+    cd backend
+    python -m unittest tests.test_compression
+"""
+import asyncio
+import gzip
+import unittest
+from unittest import mock
+
+import httpx
+from fastapi import FastAPI
+
+from api_gateway.middleware.compression import ENCODERS, CompressionMiddleware
+from api_gateway.routes import inventory_proxy
+
+ROWS = [b'{"hotel_id": "h%d", "price": %d}\n' % (i, i * 10) for i in range(5000)]
+
+
+def _inventory_export(request: httpx.Request) -> httpx.Response:
+    # A streamed body, as the service's StreamingResponse arrives over the wire
+    async def batches():
+        for start in range(0, len(ROWS), 500):
+            yield b"".join(ROWS[start:start + 500])
+
+    return httpx.Response(
+        200, headers={"Content-Type": "application/x-ndjson", "Cache-Control": "no-store"}, content=batches()
+    )
+
+
+def _decompress(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "br":
+        import brotli
+
+        return brotli.decompress(body)
+    import zstandard
+
+    return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+
+
+class StreamingCompressionTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        upstream = inventory_proxy.inventory_upstream
+        client = httpx.AsyncClient(base_url=upstream.base_url, transport=httpx.MockTransport(_inventory_export))
+        patcher = mock.patch.object(upstream, "_client", client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        auth = inventory_proxy.auth_upstream
+        auth_client = httpx.AsyncClient(
+            base_url=auth.base_url, transport=httpx.MockTransport(lambda request: httpx.Response(200, json={}))
+        )
+        patcher = mock.patch.object(auth, "_client", auth_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        gateway = FastAPI()
+        gateway.include_router(inventory_proxy.router)
+        self.app = CompressionMiddleware(gateway)
+
+    async def _get(self, path: str, accept_encoding: str) -> tuple[dict, list[bytes]]:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [
+                (b"host", b"gateway.test"),
+                (b"accept-encoding", accept_encoding.encode()),
+                (b"authorization", b"Bearer token"),
+            ],
+            "client": ("127.0.0.1", 1234),
+            "server": ("gateway.test", 80),
+        }
+        start, chunks = None, []
+        received = False
+
+        async def receive():
+            nonlocal received
+            if received:
+                await asyncio.Event().wait()
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return {name.decode(): value.decode() for name, value in start["headers"]}, chunks
+
+    async def test_export_is_compressed_chunk_by_chunk(self):
+        for encoding in ENCODERS:
+            with self.subTest(encoding=encoding):
+                headers, chunks = await self._get("/api/v1/inventory/export/rates", encoding)
+                self.assertEqual(headers["content-encoding"], encoding)
+                self.assertNotIn("content-length", headers)
+                # One flushed piece per upstream batch, not one body at the end
+                self.assertGreater(len([chunk for chunk in chunks if chunk]), 5)
+                body = b"".join(chunks)
+                self.assertEqual(_decompress(body, encoding), b"".join(ROWS))
+                self.assertLess(len(body), len(b"".join(ROWS)) / 3)
+
+    async def test_identity_when_nothing_is_accepted(self):
+        headers, chunks = await self._get("/api/v1/inventory/export/rates", "identity")
+        self.assertNotIn("content-encoding", headers)
+        self.assertEqual(b"".join(chunks), b"".join(ROWS))
+
+
+if __name__ == "__main__":
+    unittest.main()
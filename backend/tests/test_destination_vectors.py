@@ -0,0 +1,109 @@
+"""Similarity index versions on disk while builds and workers overlap.
+
+    cd backend
+    python -m unittest tests.test_destination_vectors
+"""
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+import uuid
+from unittest import mock
+
+import numpy as np
+
+from inventory_svc.app.v1.utils import destination_vectors
+from inventory_svc.app.v1.utils.destination_vectors import DIMENSIONS, SimilarityIndex, save_index
+
+
+class IndexVersionsTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = directory.name
+        self.idf = np.ones(destination_vectors.FEATURE_BLOCKS["description"][0], dtype=np.float32)
+
+    def save(self, count: int, cursor: int = 0) -> dict:
+        ids = [uuid.uuid4() for _ in range(count)]
+        return save_index(self.path, ids, np.ones((count, DIMENSIONS), dtype=np.float32), self.idf, cursor)
+
+    def versions_on_disk(self) -> set[str]:
+        return {name.split("-")[1][:-4] for name in os.listdir(self.path) if name.endswith(".npy")}
+
+    def test_keeps_the_previous_versions_and_newer_builds(self):
+        metas = [self.save(i + 1) for i in range(4)]
+        # A build that started after the next one and hasn't swapped meta.json yet
+        in_progress = f"{int(metas[-1]['version'], 16) + 10**15:x}"
+        np.save(os.path.join(self.path, f"ids-{in_progress}.npy"), np.empty(0, dtype="S16"))
+
+        latest = self.save(5)
+        self.assertEqual(
+            self.versions_on_disk(), {metas[2]["version"], metas[3]["version"], latest["version"], in_progress}
+        )
+
+    def test_reader_of_a_superseded_meta_reads_the_new_one(self):
+        self.save(2)
+        latest = self.save(3)
+        real_load = np.load
+        calls = []
+
+        def vanished_once(path, *args, **kwargs):
+            calls.append(path)
+            if len(calls) == 1:
+                raise FileNotFoundError(path)
+            return real_load(path, *args, **kwargs)
+
+        index = SimilarityIndex(self.path)
+        with mock.patch.object(destination_vectors.np, "load", side_effect=vanished_once):
+            self.assertTrue(index.load())
+        self.assertEqual(index.meta["version"], latest["version"])
+        self.assertEqual(len(index.ids), 3)
+
+    def test_keeps_the_loaded_index_when_files_stay_missing(self):
+        index = SimilarityIndex(self.path)
+        loaded = self.save(2)
+        self.assertTrue(index.load())
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump({**loaded, "files": {"ids": "gone.npy", "vectors": "gone.npy", "idf": "gone.npy"}}, f)
+
+        self.assertFalse(index.load())
+        self.assertEqual(index.meta["version"], loaded["version"])
+        self.assertEqual(len(index.ids), 2)
+
+    def test_keeps_the_loaded_index_on_a_build_with_other_settings(self):
+        index = SimilarityIndex(self.path)
+        loaded = self.save(2)
+        self.assertTrue(index.load())
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump({**loaded, "dimensions": DIMENSIONS + 1}, f)
+
+        with self.assertLogs(destination_vectors.logger, "ERROR"):
+            self.assertFalse(index.load())
+        self.assertEqual(index.meta["version"], loaded["version"])
+        self.assertEqual(len(index.ids), 2)
+
+
+class BackgroundReloadTest(unittest.IsolatedAsyncioTestCase):
+    async def test_run_switches_to_a_new_build(self):
+        with tempfile.TemporaryDirectory() as path:
+            idf = np.ones(destination_vectors.FEATURE_BLOCKS["description"][0], dtype=np.float32)
+            save_index(path, [uuid.uuid4()], np.ones((1, DIMENSIONS), dtype=np.float32), idf, 0)
+            index = SimilarityIndex(path)
+            self.assertTrue(index.load())
+
+            latest = save_index(path, [uuid.uuid4(), uuid.uuid4()], np.ones((2, DIMENSIONS), dtype=np.float32), idf, 0)
+            reload = asyncio.create_task(index.run(interval=0.01))
+            try:
+                for _ in range(100):
+                    if index.meta["version"] == latest["version"]:
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                reload.cancel()
+            self.assertEqual(index.meta["version"], latest["version"])
+            self.assertEqual(len(index.positions), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+"""EmailDispatcher against a local aiosmtpd server and a SQLite outbox.
+
+    cd backend
+    python -m unittest tests.test_email_dispatcher
+"""
+import asyncio
+import socket
+import tempfile
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from unittest import mock
+
+from aiosmtpd.controller import Controller
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from auth_svc.controllers.email_dispatcher import EmailDispatcher
+from auth_svc.models.auth_model import EmailOutbox
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class RecordingHandler:
+    """aiosmtpd handler that keeps each message's recipients and body."""
+
+    def __init__(self):
+        self.messages: list[tuple[list[str], bytes]] = []
+        self.connections = 0
+        self.reject_rcpt = False
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if self.reject_rcpt:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((list(envelope.rcpt_tos), envelope.content))
+        return "250 Message accepted for delivery"
+
+
+class EmailDispatcherTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        engine = create_engine(f"sqlite:///{self.directory.name}/outbox.db", connect_args={"check_same_thread": False})
+        EmailOutbox.metadata.create_all(engine, tables=[EmailOutbox.__table__])
+        self.engine = engine
+        self.session_factory = sessionmaker(bind=engine)
+        self.smtp = RecordingHandler()
+        self.controller = Controller(self.smtp, hostname="127.0.0.1", port=_free_port())
+        self.controller.start()
+        self.dispatchers: list[EmailDispatcher] = []
+        sender = mock.patch("auth_svc.controllers.password_reset.FROM_ADDR", "noreply@example.com")
+        sender.start()
+        self.addCleanup(sender.stop)
+
+    async def asyncTearDown(self):
+        for dispatcher in self.dispatchers:
+            await dispatcher.stop()
+        self.controller.stop()
+        self.engine.dispose()
+        self.directory.cleanup()
+
+    def dispatcher(self, **kwargs) -> EmailDispatcher:
+        dispatcher = EmailDispatcher(
+            session_factory=self.session_factory,
+            hostname="127.0.0.1",
+            port=self.controller.port,
+            username=None,
+            password=None,
+            **kwargs,
+        )
+        self.dispatchers.append(dispatcher)
+        return dispatcher
+
+    def add_email(self, to: str = "traveller@example.com", **columns) -> uuid.UUID:
+        email_id = uuid.uuid4()
+        with self.session_factory() as db:
+            db.add(
+                EmailOutbox(
+                    email_id=email_id, to_address=to, subject="Reset your password", body_text="Your code is 123456", **columns
+                )
+            )
+            db.commit()
+        return email_id
+
+    def row(self, email_id: uuid.UUID) -> EmailOutbox:
+        with self.session_factory() as db:
+            return db.get(EmailOutbox, email_id)
+
+    async def wait_for(self, email_id: uuid.UUID, *statuses: str) -> EmailOutbox:
+        for _ in range(200):
+            row = self.row(email_id)
+            if row.status in statuses:
+                return row
+            await asyncio.sleep(0.01)
+        self.fail(f"email {email_id} stayed {row.status}")
+
+    async def test_delivers_queued_email_over_smtp(self):
+        dispatcher = self.dispatcher()
+        await dispatcher.start()
+        email_id = self.add_email()
+        dispatcher.enqueue(email_id)
+
+        row = await self.wait_for(email_id, "sent")
+        self.assertEqual(row.attempts, 1)
+        self.assertIsNone(row.claim_id)
+        self.assertIsNotNone(row.sent_at)
+        [(recipients, body)] = self.smtp.messages
+        self.assertEqual(recipients, ["traveller@example.com"])
+        self.assertIn(b"Your code is 123456", body)
+
+    async def test_reuses_the_connection_across_emails(self):
+        dispatcher = self.dispatcher(pool_size=1)
+        await dispatcher.start()
+        email_ids = [self.add_email(f"user{i}@example.com") for i in range(3)]
+        for email_id in email_ids:
+            dispatcher.enqueue(email_id)
+            await self.wait_for(email_id, "sent")
+
+        self.assertEqual(len(self.smtp.messages), 3)
+        self.assertEqual(self.smtp.connections, 1)
+
+    async def test_workers_starting_together_send_each_pending_email_once(self):
+        email_ids = [self.add_email(f"user{i}@example.com") for i in range(10)]
+        # One dispatcher per worker process, each queueing every pending row at boot
+        for _ in range(4):
+            await self.dispatcher(batch_size=3).start()
+
+        for email_id in email_ids:
+            await self.wait_for(email_id, "sent")
+        await asyncio.sleep(0.05)
+        sent_to = sorted(recipients[0] for recipients, _ in self.smtp.messages)
+        self.assertEqual(sent_to, sorted(f"user{i}@example.com" for i in range(10)))
+
+    async def test_skips_rows_claimed_by_another_dispatcher(self):
+        email_id = self.add_email(
+            status="sending", claim_id="other", claimed_until=datetime.utcnow() + timedelta(minutes=5)
+        )
+        dispatcher = self.dispatcher()
+        await dispatcher.start()
+        dispatcher.enqueue(email_id)
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(self.smtp.messages, [])
+        self.assertEqual(self.row(email_id).claim_id, "other")
+
+    async def test_reclaims_rows_whose_claim_lapsed(self):
+        email_id = self.add_email(
+            status="sending", claim_id="crashed", claimed_until=datetime.utcnow() - timedelta(seconds=1)
+        )
+        await self.dispatcher().start()
+
+        await self.wait_for(email_id, "sent")
+        self.assertEqual(len(self.smtp.messages), 1)
+
+    async def test_failed_delivery_is_retried_then_given_up(self):
+        self.smtp.reject_rcpt = True
+        dispatcher = self.dispatcher(max_attempts=2, retry_backoff=0.05)
+        await dispatcher.start()
+        email_id = self.add_email()
+        dispatcher.enqueue(email_id)
+
+        row = await self.wait_for(email_id, "failed")
+        self.assertEqual(row.attempts, 2)
+        self.assertIn("No such user", row.last_error)
+        self.assertIsNone(row.claim_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
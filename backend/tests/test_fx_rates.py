@@ -0,0 +1,38 @@
+"""Validation and access control on PUT /fx/rates.
+
+    cd backend
+    python -m unittest tests.test_fx_rates
+"""
+import unittest
+from unittest import mock
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from inventory_svc.app.v1.routes import fx_routes
+from inventory_svc.app.v1.schemas.fx_schema import FxRatesUpdate
+
+
+class FxRatesUpdateTest(unittest.TestCase):
+    def test_rates_must_be_finite_and_positive(self):
+        for rate in (0, -1.5, float("inf"), float("nan")):
+            with self.subTest(rate=rate), self.assertRaises(ValidationError):
+                FxRatesUpdate(rates={"USD": rate})
+        self.assertEqual(FxRatesUpdate(rates={"USD": 0.012}).rates, {"USD": 0.012})
+
+    def test_updates_need_the_internal_token(self):
+        with mock.patch.object(fx_routes, "INTERNAL_API_TOKEN", None):
+            with self.assertRaises(HTTPException) as raised:
+                fx_routes.require_internal_token("anything")
+            self.assertEqual(raised.exception.status_code, 503)
+
+        with mock.patch.object(fx_routes, "INTERNAL_API_TOKEN", "s3cret"):
+            for token in (None, "guess"):
+                with self.subTest(token=token), self.assertRaises(HTTPException) as raised:
+                    fx_routes.require_internal_token(token)
+                self.assertEqual(raised.exception.status_code, 403)
+            fx_routes.require_internal_token("s3cret")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""The gateway's inventory proxy against an in-process stand-in for the service.
+
+    cd backend
+    python -m unittest tests.test_inventory_proxy
+"""
+import unittest
+from unittest import mock
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from api_gateway.routes import inventory_proxy
+
+EXPORT_CHUNKS = [b'{"row": %d}\n' % i for i in range(1000)]
+
+
+def _inventory_app(calls: list[str]) -> FastAPI:
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def count(request, call_next):
+        calls.append(request.url.path)
+        return await call_next(request)
+
+    @app.get("/export/{table}")
+    async def export(table: str):
+        async def rows():
+            for chunk in EXPORT_CHUNKS:
+                yield chunk
+
+        return StreamingResponse(
+            rows(),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="{table}.ndjson"', "Cache-Control": "no-store"},
+        )
+
+    @app.post("/hotels")
+    async def create_hotel():
+        return {"status": "success"}
+
+    @app.get("/hotels/{hotel_id}")
+    async def hotel(hotel_id: str):
+        if hotel_id == "missing":
+            raise HTTPException(status_code=404, detail="Hotel not found")
+        return {"status": "success", "data": {"hotel_id": hotel_id}}
+
+    return app
+
+
+def _validate_user(request: httpx.Request) -> httpx.Response:
+    if request.headers.get("authorization") == "Bearer good":
+        return httpx.Response(200, json={"message": "User is valid"})
+    return httpx.Response(401, json={"detail": "Could not validate credentials"})
+
+
+class InventoryProxyTest(unittest.TestCase):
+    def setUp(self):
+        self.calls: list[str] = []
+        upstream = inventory_proxy.inventory_upstream
+        client = httpx.AsyncClient(
+            base_url=upstream.base_url, transport=httpx.ASGITransport(app=_inventory_app(self.calls))
+        )
+        patcher = mock.patch.object(upstream, "_client", client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        auth = inventory_proxy.auth_upstream
+        auth_client = httpx.AsyncClient(base_url=auth.base_url, transport=httpx.MockTransport(_validate_user))
+        patcher = mock.patch.object(auth, "_client", auth_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        inventory_proxy.response_cache.purge_tags([])
+
+        gateway = FastAPI()
+        gateway.include_router(inventory_proxy.router)
+        self.client = TestClient(gateway)
+
+    def test_export_is_relayed_with_its_headers(self):
+        response = self.client.get(
+            "/api/v1/inventory/export/hotels", params={"format": "ndjson"}, headers={"Authorization": "Bearer good"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"".join(EXPORT_CHUNKS))
+        self.assertEqual(response.headers["content-disposition"], 'attachment; filename="hotels.ndjson"')
+        self.assertEqual(response.headers["x-cache"], "BYPASS")
+        self.assertNotIn("etag", response.headers)
+        self.assertEqual(self.calls, ["/export/hotels"])
+
+    def test_export_requires_a_valid_token(self):
+        missing = self.client.get("/api/v1/inventory/export/hotels")
+        invalid = self.client.get("/api/v1/inventory/export/hotels", headers={"Authorization": "Bearer forged"})
+        self.assertEqual((missing.status_code, invalid.status_code), (401, 401))
+        self.assertEqual(self.calls, [])
+
+    def test_writes_require_a_valid_token(self):
+        missing = self.client.post("/api/v1/inventory/hotels", json={})
+        invalid = self.client.post("/api/v1/inventory/hotels", json={}, headers={"Authorization": "Bearer forged"})
+        valid = self.client.post("/api/v1/inventory/hotels", json={}, headers={"Authorization": "Bearer good"})
+        self.assertEqual((missing.status_code, invalid.status_code, valid.status_code), (401, 401, 200))
+        self.assertEqual(self.calls, ["/hotels"])
+
+    def test_error_responses_get_no_etag(self):
+        response = self.client.get("/api/v1/inventory/hotels/missing")
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("etag", response.headers)
+
+        response = self.client.get("/api/v1/inventory/hotels/h1")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("etag", response.headers)
+
+    def test_purge_is_refused_without_a_configured_token(self):
+        with mock.patch.object(inventory_proxy, "CACHE_PURGE_TOKEN", None):
+            response = self.client.post("/api/v1/inventory/_cache/purge", json={"tags": ["hotels"]})
+        self.assertEqual(response.status_code, 503)
+
+    def test_purge_requires_the_token(self):
+        with mock.patch.object(inventory_proxy, "CACHE_PURGE_TOKEN", "s3cret"):
+            missing = self.client.post("/api/v1/inventory/_cache/purge", json={"tags": ["hotels"]})
+            wrong = self.client.post(
+                "/api/v1/inventory/_cache/purge", json={"tags": ["hotels"]}, headers={"X-Internal-Token": "guess"}
+            )
+            right = self.client.post(
+                "/api/v1/inventory/_cache/purge", json={"tags": ["hotels"]}, headers={"X-Internal-Token": "s3cret"}
+            )
+        self.assertEqual((missing.status_code, wrong.status_code, right.status_code), (403, 403, 200))
+
+
+if __name__ == "__main__":
+    unittest.main()
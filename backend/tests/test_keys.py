@@ -0,0 +1,62 @@
+"""KeyRing.decode on tokens with a hostile header.
+
+    cd backend
+    python -m unittest tests.test_keys
+"""
+import base64
+import json
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("JWT_SECRETS", "test:not-a-real-secret")
+
+from fastapi import HTTPException  # noqa: E402
+
+from auth_svc.controllers import auth_controller  # noqa: E402
+from auth_svc.routes import auth_routes  # noqa: E402
+from auth_svc.utils.keys import JoseBackend, KeyRing, PyJWTBackend, TokenError  # noqa: E402
+
+
+def _segment(value: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).rstrip(b"=").decode()
+
+
+def _token(header: dict) -> str:
+    return f"{_segment(header)}.{_segment({'sub': 'traveller'})}.c2lnbmF0dXJl"
+
+
+class MalformedKidTest(unittest.TestCase):
+    def test_non_string_kid_is_an_invalid_token(self):
+        for backend in (JoseBackend(), PyJWTBackend()):
+            ring = KeyRing([("k1", "HS256", "secret")], "k1", backend=backend)
+            for kid in (["k1"], {"k": 1}, 7):
+                with self.subTest(backend=backend.name, kid=kid), self.assertRaises(TokenError):
+                    ring.decode(_token({"alg": "HS256", "typ": "JWT", "kid": kid}))
+
+    def test_non_string_kid_is_a_401(self):
+        with self.assertRaises(HTTPException) as raised:
+            auth_controller.get_current_user(_token({"alg": "HS256", "typ": "JWT", "kid": ["k1"]}), db=None)
+        self.assertEqual(raised.exception.status_code, 401)
+
+
+class JwksTest(unittest.TestCase):
+    def _jwks(self, token: str | None) -> dict:
+        ring = KeyRing([("k1", "HS256", "secret")], "k1")
+        with mock.patch.object(auth_routes, "key_ring", ring):
+            return auth_routes.jwks(auth_routes.Response(), x_internal_token=token)
+
+    def test_shared_secrets_need_the_internal_token(self):
+        with mock.patch.object(auth_routes, "INTERNAL_API_TOKEN", "s3cret"):
+            self.assertEqual(self._jwks(None)["keys"], [])
+            self.assertEqual(self._jwks("guess")["keys"], [])
+            self.assertEqual(len(self._jwks("s3cret")["keys"]), 1)
+
+    def test_nothing_is_internal_without_a_configured_token(self):
+        with mock.patch.object(auth_routes, "INTERNAL_API_TOKEN", None):
+            self.assertEqual(self._jwks("")["keys"], [])
+            self.assertEqual(self._jwks(None)["keys"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
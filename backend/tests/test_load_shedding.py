@@ -0,0 +1,42 @@
+"""LoadSheddingMiddleware's latency samples for streamed responses.
+
+    cd backend
+    python -m unittest tests.test_load_shedding
+"""
+import asyncio
+import unittest
+
+from api_gateway.middleware.load_shedding import AdaptiveConcurrencyLimiter, LoadSheddingMiddleware
+
+
+async def _slow_stream(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    for _ in range(3):
+        await asyncio.sleep(0.05)
+        await send({"type": "http.response.body", "body": b"row\n", "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+
+class StreamedResponseTest(unittest.IsolatedAsyncioTestCase):
+    async def test_latency_stops_at_the_response_head(self):
+        limiter = AdaptiveConcurrencyLimiter(target_latency=0.1, smoothing=1.0)
+        middleware = LoadSheddingMiddleware(_slow_stream, limiter)
+        in_flight = []
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            in_flight.append(limiter.in_flight)
+
+        await middleware({"type": "http", "path": "/api/v1/inventory/export"}, receive, send)
+
+        self.assertLess(limiter.latency, 0.05)
+        self.assertFalse(limiter.overloaded)
+        # The slot is held for the whole body and given back afterwards
+        self.assertEqual(in_flight, [1] * 5)
+        self.assertEqual(limiter.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Schema upgrades on databases created by older versions of the models.
+
+    cd backend
+    python -m unittest tests.test_migrations
+"""
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine, inspect, text
+
+from auth_svc.database import migrations as auth_migrations
+from inventory_svc.app.v1.database import migrations as inventory_migrations
+from inventory_svc.app.v1.utils.amenity_index import encode_amenity_bits
+
+HOTEL_ID = "11" * 16
+POOL_ID, WIFI_ID = "aa" * 16, "bb" * 16
+
+
+class AuthMigrationsTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.engine = create_engine(f"sqlite:///{directory.name}/auth.db")
+        self.addCleanup(self.engine.dispose)
+
+    def test_adds_the_outbox_claim_columns(self):
+        with self.engine.begin() as connection:
+            # email_outbox as the first dispatcher release created it
+            connection.exec_driver_sql(
+                "CREATE TABLE email_outbox (email_id CHAR(32) PRIMARY KEY, to_address VARCHAR NOT NULL,"
+                " subject VARCHAR NOT NULL, body_text TEXT, body_html TEXT, status VARCHAR(7) NOT NULL,"
+                " attempts INTEGER NOT NULL, last_error TEXT, next_attempt_at TIMESTAMP NOT NULL,"
+                " created_at TIMESTAMP NOT NULL, sent_at TIMESTAMP)"
+            )
+            connection.exec_driver_sql(
+                "INSERT INTO email_outbox VALUES ('a', 'x@example.com', 's', 'b', NULL, 'pending', 0, NULL,"
+                " '2026-01-01', '2026-01-01', NULL)"
+            )
+        for _ in range(2):
+            with self.engine.begin() as connection:
+                auth_migrations.upgrade(connection)
+
+        columns = {column["name"] for column in inspect(self.engine).get_columns("email_outbox")}
+        self.assertLessEqual({"claim_id", "claimed_until"}, columns)
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.execute(text("SELECT claim_id FROM email_outbox")).all(), [(None,)])
+
+
+class InventoryMigrationsTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.engine = create_engine(f"sqlite:///{directory.name}/inventory.db")
+        self.addCleanup(self.engine.dispose)
+        with self.engine.begin() as connection:
+            # Hotels and amenities from before amenity search
+            connection.exec_driver_sql(
+                "CREATE TABLE amenity (amenity_id CHAR(32) PRIMARY KEY, name VARCHAR NOT NULL, category VARCHAR,"
+                " icon_url VARCHAR, created_at TIMESTAMP, updated_at TIMESTAMP)"
+            )
+            connection.exec_driver_sql(
+                "CREATE TABLE hotel (hotel_id CHAR(32) PRIMARY KEY, destination_id CHAR(32) NOT NULL,"
+                " name VARCHAR NOT NULL, address VARCHAR NOT NULL, rating FLOAT, price_per_night FLOAT,"
+                " latitude FLOAT, longitude FLOAT, created_at TIMESTAMP, updated_at TIMESTAMP)"
+            )
+            connection.exec_driver_sql(
+                "CREATE TABLE tourpackage (package_id CHAR(32) PRIMARY KEY, destination_id CHAR(32) NOT NULL,"
+                " name VARCHAR NOT NULL, description TEXT, price FLOAT NOT NULL, duration_days INTEGER NOT NULL,"
+                " theme VARCHAR, created_at TIMESTAMP, updated_at TIMESTAMP)"
+            )
+            connection.exec_driver_sql(
+                f"INSERT INTO tourpackage VALUES ('{'33' * 16}', '{'22' * 16}', 'Coast', '', 100.0, 3, 'beach',"
+                " '2026-01-01', '2026-01-01')"
+            )
+            connection.exec_driver_sql(
+                "CREATE TABLE hotel_amenity (hotel_id CHAR(32), amenity_id CHAR(32), PRIMARY KEY (hotel_id, amenity_id))"
+            )
+            connection.exec_driver_sql(
+                f"INSERT INTO amenity VALUES ('{WIFI_ID}', 'Wifi', '', '', '2026-01-02', '2026-01-02'),"
+                f" ('{POOL_ID}', 'Pool', '', '', '2026-01-01', '2026-01-01')"
+            )
+            connection.exec_driver_sql(
+                f"INSERT INTO hotel VALUES ('{HOTEL_ID}', '{'22' * 16}', 'Beach', '', 4.0, 100.0, 0, 0,"
+                " '2026-01-01', '2026-01-01')"
+            )
+            connection.exec_driver_sql(f"INSERT INTO hotel_amenity VALUES ('{HOTEL_ID}', '{WIFI_ID}')")
+
+    def upgrade(self) -> None:
+        for _ in range(2):
+            with self.engine.begin() as connection:
+                inventory_migrations.upgrade(connection)
+
+    def test_backfills_amenity_bits(self):
+        self.upgrade()
+
+        inspector = inspect(self.engine)
+        self.assertIn("amenity_bits", {column["name"] for column in inspector.get_columns("hotel")})
+        self.assertIn("ix_hotel_updated_at", {index["name"] for index in inspector.get_indexes("hotel")})
+        with self.engine.connect() as connection:
+            bits = dict(connection.execute(text("SELECT amenity_id, bit_index FROM amenity")).all())
+            self.assertEqual(bits, {POOL_ID: 0, WIFI_ID: 1})
+            hotel = connection.execute(text("SELECT amenity_bits, updated_at FROM hotel")).one()
+        self.assertEqual(hotel.amenity_bits, encode_amenity_bits([1]))
+        self.assertNotEqual(hotel.updated_at, "2026-01-01")
+
+    def test_existing_prices_are_in_inr(self):
+        self.upgrade()
+
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.execute(text("SELECT currency FROM hotel")).all(), [("INR",)])
+            self.assertEqual(connection.execute(text("SELECT currency FROM tourpackage")).all(), [("INR",)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""Creating a tour package against a real (SQLite) inventory schema.
+
+    cd backend
+    python -m unittest tests.test_packages
+"""
+import tempfile
+import unittest
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from inventory_svc.app.v1.controllers import package_controller
+from inventory_svc.app.v1.database.change_log import InventorySession
+from inventory_svc.app.v1.models.inventory_model import (
+    ChangeLog,
+    Destination,
+    PackageItineraryItem,
+    TourPackage,
+)
+from inventory_svc.app.v1.schemas.package_schema import PackageCreate
+
+
+class CreatePackageTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{self.directory.name}/inventory.db")
+        tables = [Destination.__table__, TourPackage.__table__, PackageItineraryItem.__table__, ChangeLog.__table__]
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Destination.metadata.create_all, tables=tables)
+        self.sessions = async_sessionmaker(
+            bind=self.engine, class_=AsyncSession, sync_session_class=InventorySession, expire_on_commit=False
+        )
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        self.directory.cleanup()
+
+    def _package(self, destination_id) -> PackageCreate:
+        return PackageCreate(destination_id=destination_id, name="Coast", price=100, duration_days=3, theme="beach")
+
+    async def test_unknown_destination_is_not_created(self):
+        async with self.sessions() as db:
+            self.assertIsNone(await package_controller.create_package(self._package(uuid.uuid4()), db))
+
+    async def test_known_destination(self):
+        async with self.sessions() as db:
+            destination = Destination(
+                name="Lisbon", country="Portugal", region="Lisboa", description="", image_url="", tags=[]
+            )
+            db.add(destination)
+            await db.commit()
+            package = await package_controller.create_package(self._package(destination.destination_id), db)
+        self.assertEqual(package.destination_id, destination.destination_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""Refreshing one of several sessions a user holds.
+
+    cd backend
+    python -m unittest tests.test_refresh_token
+"""
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+os.environ.setdefault("JWT_SECRETS", "test:not-a-real-secret")
+
+from fastapi import HTTPException  # noqa: E402
+from sqlalchemy import create_engine, update  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from auth_svc.controllers import auth_controller  # noqa: E402
+from auth_svc.models.auth_model import Users, UserSessions  # noqa: E402
+from auth_svc.schemas.auth_schema import UserLogin  # noqa: E402
+
+USER = {"user_name": "traveller", "role": "user"}
+
+
+class RefreshTokenTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        engine = create_engine(f"sqlite:///{directory.name}/auth.db")
+        self.addCleanup(engine.dispose)
+        Users.metadata.create_all(engine, tables=[Users.__table__, UserSessions.__table__])
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        self.db.add(
+            Users(
+                user_name="traveller",
+                first_name="T",
+                last_name="R",
+                email="traveller@example.com",
+                password_hash=auth_controller.hash_password("correct horse"),
+            )
+        )
+        self.db.commit()
+        patcher = mock.patch.object(auth_controller, "MAX_SESSIONS_PER_USER", 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def login(self) -> str:
+        tokens = auth_controller.login_user(UserLogin(user_name="traveller", password="correct horse"), self.db)
+        return tokens["refresh_token"]
+
+    def test_each_device_keeps_its_own_refresh_token(self):
+        first, second = self.login(), self.login()
+        self.assertNotEqual(first, second)
+        self.assertEqual(auth_controller.refresh_token(USER, first, self.db)["refresh_token"], first)
+        self.assertEqual(auth_controller.refresh_token(USER, second, self.db)["refresh_token"], second)
+
+    def test_expired_session_is_refused_while_another_is_live(self):
+        first, second = self.login(), self.login()
+        self.db.execute(
+            update(UserSessions)
+            .where(UserSessions.refresh_token == first)
+            .values(expires_at=datetime.utcnow() - timedelta(minutes=1))
+        )
+        self.db.commit()
+
+        with self.assertRaises(HTTPException) as raised:
+            auth_controller.refresh_token(USER, first, self.db)
+        self.assertEqual(raised.exception.status_code, 401)
+        self.assertEqual(auth_controller.refresh_token(USER, second, self.db)["refresh_token"], second)
+
+    def test_unknown_token_is_refused(self):
+        self.login()
+        with self.assertRaises(HTTPException) as raised:
+            auth_controller.refresh_token(USER, "not-a-session", self.db)
+        self.assertEqual(raised.exception.status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
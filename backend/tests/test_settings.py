@@ -0,0 +1,33 @@
+"""Splitting a service's DB connection budget between its workers.
+
+    cd backend
+    python -m unittest tests.test_settings
+"""
+import unittest
+from unittest import mock
+
+from common.settings import default_workers, split_connections
+
+
+class SplitConnectionsTest(unittest.TestCase):
+    def test_workers_stay_within_the_budget(self):
+        for max_connections, workers in [(30, 1), (30, 4), (30, 15), (15, 7), (100, 9)]:
+            with self.subTest(max_connections=max_connections, workers=workers):
+                pool_size, max_overflow = split_connections(max_connections, workers)
+                self.assertGreaterEqual(pool_size, 1)
+                self.assertLessEqual((pool_size + max_overflow) * workers, max_connections)
+
+    def test_too_many_workers_is_an_error(self):
+        with self.assertRaises(RuntimeError):
+            split_connections(30, 16)
+
+    def test_default_workers_fit_the_budget(self):
+        with mock.patch("os.cpu_count", return_value=16):
+            self.assertEqual(default_workers(30), 15)
+            self.assertEqual(default_workers(15), 7)
+            self.assertEqual(default_workers(1), 1)
+            self.assertEqual(default_workers(100), 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
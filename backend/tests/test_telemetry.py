@@ -0,0 +1,39 @@
+"""instrument_engine feeding the db_query stage and the SQL profiler.
+
+    cd backend
+    python -m unittest tests.test_telemetry
+"""
+import unittest
+
+from sqlalchemy import create_engine, text
+
+from common import profiler
+from common.telemetry import STAGE_SECONDS, instrument_engine
+
+
+def _db_query_count() -> int:
+    series = STAGE_SECONDS._series.get(("db_query",))
+    return series[2] if series else 0
+
+
+class InstrumentEngineTest(unittest.TestCase):
+    def test_each_query_is_timed_once(self):
+        engine = create_engine("sqlite://")
+        instrument_engine(engine)
+        before = _db_query_count()
+        profile = profiler.RequestQueryProfile(route="/test")
+        token = profiler.current_profile.set(profile)
+        try:
+            with engine.connect() as connection:
+                for _ in range(3):
+                    connection.execute(text("SELECT 1"))
+        finally:
+            profiler.current_profile.reset(token)
+
+        self.assertEqual(_db_query_count() - before, 3)
+        self.assertEqual(profile.count, 3)
+        self.assertEqual(list(profile.queries), ["SELECT ?"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Upstream's circuit breaker when a half-open probe ends without an outcome.
+
+    cd backend
+    python -m unittest tests.test_upstream
+"""
+import asyncio
+import unittest
+
+import httpx
+from fastapi import HTTPException
+
+from api_gateway.utils.upstream import Upstream
+
+
+def _upstream(handler) -> Upstream:
+    upstream = Upstream("Test service", "http://upstream.test")
+    upstream._client = httpx.AsyncClient(base_url=upstream.base_url, transport=httpx.MockTransport(handler))
+    return upstream
+
+
+def _half_open(upstream: Upstream) -> None:
+    upstream.breaker.state = "open"
+    upstream.breaker.opened_at = -upstream.breaker.reset_timeout
+
+
+class HalfOpenProbeTest(unittest.IsolatedAsyncioTestCase):
+    async def test_cancelled_probe_releases_the_breaker(self):
+        started = asyncio.Event()
+
+        async def slow(request):
+            started.set()
+            await asyncio.sleep(10)
+            return httpx.Response(200)
+
+        upstream = _upstream(slow)
+        _half_open(upstream)
+        probe = asyncio.create_task(upstream.request("GET", "/slow", hedge=True))
+        await started.wait()
+        self.assertFalse(upstream.breaker.allow_request())
+        probe.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await probe
+
+        # Counted as a failed probe: open again, then one new probe after the timeout
+        self.assertEqual(upstream.breaker.state, "open")
+        _half_open(upstream)
+        self.assertTrue(upstream.breaker.allow_request())
+        await upstream.close()
+
+    async def test_non_transport_error_releases_the_breaker(self):
+        def redirect_loop(request):
+            return httpx.Response(302, headers={"Location": "/loop"})
+
+        upstream = _upstream(redirect_loop)
+        upstream._client.follow_redirects = True
+        upstream._client.max_redirects = 2
+        _half_open(upstream)
+        with self.assertRaises(HTTPException) as raised:
+            await upstream.request("GET", "/loop")
+        self.assertEqual(raised.exception.status_code, 502)
+        self.assertEqual(upstream.breaker.state, "open")
+        self.assertFalse(upstream.breaker._probe_in_flight)
+        await upstream.close()
+
+    async def test_successful_probe_closes_the_breaker(self):
+        upstream = _upstream(lambda request: httpx.Response(200, json={"ok": True}))
+        _half_open(upstream)
+        response = await upstream.request("GET", "/ok")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(upstream.breaker.state, "closed")
+        await upstream.close()
+
+    async def test_other_requests_do_not_release_a_probe_they_do_not_own(self):
+        upstream = _upstream(lambda request: httpx.Response(200))
+        _half_open(upstream)
+        owner = object()
+        self.assertTrue(upstream.breaker.allow_request(owner))
+        upstream.breaker.release(object())
+        self.assertTrue(upstream.breaker._probe_in_flight)
+        upstream.breaker.release(owner)
+        self.assertEqual(upstream.breaker.state, "open")
+        await upstream.close()
+
+
+if __name__ == "__main__":
+    unittest.main()